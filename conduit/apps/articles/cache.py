@@ -0,0 +1,214 @@
+"""
+Cache for the viewer-independent part of serialized articles.
+
+Each article and each author profile has a version token in the cache. The
+cached representation of an article is keyed on the article id together
+with both tokens, so changing an article, its tags or its author only needs
+a new token. Representations stored under old tokens are never read again
+and simply expire.
+
+Version tokens only work if every process sees them, so the cache is only
+used when `ARTICLE_REPRESENTATION_CACHE_ALIAS` names a cache that all of
+them share. Without one, articles are serialized in full every time.
+
+The fields that depend on who is asking (`favorited`, `favoritesCount` and
+`author.following`) are stored as `None` and filled in by
+`ArticleSerializer` on every request.
+"""
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from conduit.apps.core.utils import generate_random_string
+
+ARTICLE_VERSION_KEY = 'articles:{}:version'
+PROFILE_VERSION_KEY = 'profiles:{}:version'
+REPRESENTATION_KEY = 'articles:{}:{}:{}:representation'
+
+HITS_KEY = 'articles:representation:hits'
+MISSES_KEY = 'articles:representation:misses'
+
+VIEWER_FIELDS = ('favorited', 'favoritesCount')
+VIEWER_AUTHOR_FIELDS = ('following',)
+
+
+def get_cache():
+    """Returns the shared representation cache, or `None` if there is none."""
+    alias = getattr(settings, 'ARTICLE_REPRESENTATION_CACHE_ALIAS', None)
+
+    if alias is None:
+        return None
+
+    return caches[alias]
+
+
+def get_timeout():
+    return getattr(settings, 'ARTICLE_CACHE_TIMEOUT', 60 * 60)
+
+
+def _new_version():
+    return generate_random_string(size=12)
+
+
+def _get_versions(keys):
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    missing = dict(
+        (key, _new_version()) for key in keys if key not in versions
+    )
+
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+
+    return versions
+
+
+def _incr(key, delta):
+    if not delta:
+        return
+
+    cache = get_cache()
+
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def get_representations(articles):
+    """
+    Look up the cached representations of `articles`.
+
+    Returns a tuple `(cached, keys)`. `cached` maps the ids of the articles
+    that were found to their representation. `keys` maps every article id to
+    the key its representation should be stored under and is meant to be
+    passed on to `set_representations`. Both are empty when there is no
+    cache.
+
+    The versions are read before anything is looked up, so representations
+    stored under `keys` must be built from rows loaded after this call.
+    """
+    if get_cache() is None:
+        return {}, {}
+
+    version_keys = []
+
+    for article in articles:
+        version_keys.append(ARTICLE_VERSION_KEY.format(article.pk))
+        version_keys.append(PROFILE_VERSION_KEY.format(article.author_id))
+
+    versions = _get_versions(version_keys)
+
+    keys = dict(
+        (article.pk, REPRESENTATION_KEY.format(
+            article.pk,
+            versions[ARTICLE_VERSION_KEY.format(article.pk)],
+            versions[PROFILE_VERSION_KEY.format(article.author_id)],
+        ))
+        for article in articles
+    )
+
+    found = get_cache().get_many(keys.values())
+    cached = dict(
+        (pk, found[key]) for pk, key in keys.items() if key in found
+    )
+
+    _incr(HITS_KEY, len(cached))
+    _incr(MISSES_KEY, len(keys) - len(cached))
+
+    return cached, keys
+
+
+def set_representations(keys, representations):
+    """
+    Store freshly serialized `representations` (a dict of article id to
+    representation) under the keys returned by `get_representations`.
+    """
+    if not representations or get_cache() is None:
+        return
+
+    get_cache().set_many(dict(
+        (keys[pk], strip_viewer_fields(data))
+        for pk, data in representations.items()
+    ), get_timeout())
+
+
+def strip_viewer_fields(data):
+    data = OrderedDict(data)
+
+    for field in VIEWER_FIELDS:
+        data[field] = None
+
+    data['author'] = OrderedDict(data['author'])
+
+    for field in VIEWER_AUTHOR_FIELDS:
+        data['author'][field] = None
+
+    return data
+
+
+def _invalidate(version_keys):
+    cache = get_cache()
+
+    if cache is None or not version_keys:
+        return
+
+    cache.set_many(
+        dict((key, _new_version()) for key in version_keys), None
+    )
+
+
+def _invalidate_now_and_on_commit(version_keys):
+    # Until the transaction commits, other requests still read the old rows
+    # and could store them under the new versions. Changing the versions once
+    # more on commit makes sure nothing stored in the meantime is used.
+    version_keys = list(version_keys)
+    _invalidate(version_keys)
+
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _invalidate(version_keys))
+
+
+def invalidate_articles(article_ids):
+    _invalidate_now_and_on_commit(
+        ARTICLE_VERSION_KEY.format(pk) for pk in article_ids
+    )
+
+
+def invalidate_profiles(profile_ids):
+    _invalidate_now_and_on_commit(
+        PROFILE_VERSION_KEY.format(pk) for pk in profile_ids
+    )
+
+
+def get_stats():
+    """
+    Returns the hit and miss counters of the representation cache, or `None`
+    if there is no cache.
+    """
+    cache = get_cache()
+
+    if cache is None:
+        return None
+
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    lookups = hits + misses
+
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': float(hits) / lookups if lookups else None,
+    }
+
+
+def reset_stats():
+    cache = get_cache()
+
+    if cache is not None:
+        cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,271 @@
+"""
+Keeps `Category.path` and `Category.depth` up to date and serves the category
+tree from memory.
+
+A category's path lists the primary keys from its root down to itself, e.g.
+"1/5/12/", so the categories in a subtree are the ones whose path starts
+with the path of its root. Saving a category sets its path from its
+parent's. Moving a category to another parent rewrites the paths of all of
+its descendants with a single UPDATE.
+
+Like the tag directory, every process keeps the whole tree in memory,
+together with the number of articles in each category and in each subtree.
+It is rebuilt the next time it is read after a category changes or an
+article is added to, moved out of or removed from a category. A version in
+`ARTICLE_CACHE_ALIAS` tells other processes to rebuild their copy too, but
+only if that cache is shared between them, so every copy is also rebuilt
+once it is `CATEGORY_TREE_MAX_AGE` seconds old.
+"""
+import threading
+import time
+
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Concat, Substr
+
+from conduit.apps.core.routers import use_primary
+from conduit.apps.core.utils import generate_random_string
+
+from .models import Article, Category
+
+VERSION_KEY = 'categories:tree:version'
+
+CategoryNode = namedtuple('CategoryNode', (
+    'pk', 'name', 'slug', 'description', 'icon', 'is_active', 'parent_id',
+    'path', 'depth', 'article_count', 'subtree_article_count',
+))
+
+
+def get_cache():
+    return caches[getattr(settings, 'ARTICLE_CACHE_ALIAS', 'default')]
+
+
+def _get_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+
+    if version is None:
+        version = generate_random_string(size=12)
+
+        if not cache.add(VERSION_KEY, version, None):
+            version = cache.get(VERSION_KEY)
+
+    return version
+
+
+def get_path(parent_path, pk):
+    return '{}{}/'.format(parent_path, pk)
+
+
+def get_depth(path):
+    return path.count('/') - 1
+
+
+def prepare_path(category):
+    """
+    Called before `category` is saved. Sets its path and depth from its
+    parent's, and remembers the path it had so that its descendants can be
+    moved after it is saved. Raises `ValidationError` if its parent is the
+    category itself or one of its subcategories.
+    """
+    category._previous_path = None
+    category._parent_path = ''
+
+    if category.pk is not None:
+        category._previous_path = Category.objects.filter(
+            pk=category.pk
+        ).values_list('path', flat=True).first()
+
+    if category.parent_id is not None:
+        # Read the parent's path from the database rather than from
+        # `category.parent`, which may have been moved since it was loaded.
+        category._parent_path = Category.objects.filter(
+            pk=category.parent_id
+        ).values_list('path', flat=True).first() or ''
+
+    previous_path = category._previous_path
+
+    if previous_path and category._parent_path.startswith(previous_path):
+        raise ValidationError({'parent': [
+            'A category can not be moved under itself or one of its '
+            'subcategories.'
+        ]})
+
+    # A new category has no primary key yet, so its path is set once it
+    # has been inserted.
+    if category.pk is not None:
+        category.path = get_path(category._parent_path, category.pk)
+        category.depth = get_depth(category.path)
+
+
+def update_paths(category):
+    """
+    Called after `category` is saved. Sets the path of a new category, or
+    moves the descendants of one whose path changed.
+    """
+    previous_path = getattr(category, '_previous_path', None)
+    path = get_path(getattr(category, '_parent_path', ''), category.pk)
+
+    if category.path != path:
+        category.path = path
+        category.depth = get_depth(path)
+        Category.objects.filter(pk=category.pk).update(
+            path=category.path, depth=category.depth
+        )
+
+    if not previous_path or previous_path == path:
+        return
+
+    Category.objects.filter(
+        path__startswith=previous_path
+    ).exclude(pk=category.pk).update(
+        path=Concat(
+            Value(path), Substr('path', len(previous_path) + 1),
+            output_field=CharField()
+        ),
+        depth=F('depth') + get_depth(path) - get_depth(previous_path)
+    )
+
+
+def rebuild_paths():
+    """
+    Recompute the path and depth of every category from `parent`, for
+    categories that were created or moved without sending signals. Returns
+    the number of categories that changed.
+    """
+    rows = list(Category.objects.values_list('pk', 'parent_id', 'path'))
+    children = defaultdict(list)
+    ids = set(pk for pk, parent_id, path in rows)
+
+    for pk, parent_id, path in rows:
+        children[parent_id if parent_id in ids else None].append(pk)
+
+    paths = {}
+    stack = [(pk, '') for pk in children[None]]
+
+    while stack:
+        pk, parent_path = stack.pop()
+        paths[pk] = get_path(parent_path, pk)
+        stack.extend((child, paths[pk]) for child in children.get(pk, ()))
+
+    changed = 0
+
+    with transaction.atomic():
+        for pk, parent_id, path in rows:
+            # Categories in a loop of parents are never reached from a root.
+            # Treat them as roots.
+            new_path = paths.get(pk, get_path('', pk))
+
+            if new_path != path:
+                Category.objects.filter(pk=pk).update(
+                    path=new_path, depth=get_depth(new_path)
+                )
+                changed += 1
+
+    return changed
+
+
+class CategoryTree(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._built_at = None
+        self._nodes = {}
+        self._by_slug = {}
+
+        # The ids of the root categories and of the children of each
+        # category, in `Category.Meta.ordering` order.
+        self._children = {}
+
+    def _build(self):
+        counts = dict(
+            Article.objects.filter(category__isnull=False).order_by().values(
+                'category_id'
+            ).annotate(count=Count('id')).values_list('category_id', 'count')
+        )
+        rows = list(Category.objects.values_list(
+            'pk', 'name', 'slug', 'description', 'icon', 'is_active',
+            'parent_id', 'path', 'depth'
+        ))
+
+        # Add the articles of each category to all of its ancestors, which
+        # are listed in its path.
+        subtree_counts = defaultdict(int)
+
+        for row in rows:
+            for ancestor in row[7].split('/')[:-1]:
+                subtree_counts[int(ancestor)] += counts.get(row[0], 0)
+
+        nodes = dict(
+            (row[0], CategoryNode(
+                *row,
+                article_count=counts.get(row[0], 0),
+                subtree_article_count=subtree_counts[row[0]]
+            ))
+            for row in rows
+        )
+        children = defaultdict(list)
+
+        for row in rows:
+            parent_id = row[6] if row[6] in nodes else None
+            children[parent_id].append(row[0])
+
+        return (
+            nodes,
+            dict((node.slug, node) for node in nodes.values()),
+            dict(children),
+        )
+
+    def _is_fresh(self, version):
+        max_age = getattr(settings, 'CATEGORY_TREE_MAX_AGE', 60)
+
+        if version != self._version:
+            return False
+
+        return max_age is None or time.time() - self._built_at < max_age
+
+    def _refresh(self):
+        version = _get_version()
+
+        if self._is_fresh(version):
+            return
+
+        with self._lock:
+            if self._is_fresh(version):
+                return
+
+            # Like the tag directory, this is kept for a while, so it must
+            # not be built from a lagging replica.
+            with use_primary():
+                self._nodes, self._by_slug, self._children = self._build()
+            self._version = version
+            self._built_at = time.time()
+
+    def get_category(self, slug):
+        """Returns the `CategoryNode` with the given slug, or `None`."""
+        self._refresh()
+
+        return self._by_slug.get(slug)
+
+    def get_children(self, pk=None):
+        """
+        Returns the `CategoryNode`s of the children of the category with the
+        given primary key, or of the root categories if it is `None`.
+        """
+        self._refresh()
+
+        nodes = self._nodes
+
+        return [nodes[child] for child in self._children.get(pk, ())]
+
+    def invalidate(self):
+        self._version = None
+        get_cache().set(VERSION_KEY, generate_random_string(size=12), None)
+
+
+category_tree = CategoryTree()
@@ -0,0 +1,173 @@
+"""
+Write-behind counter for article views.
+
+Updating `Article.view_count` on every read would lock the article row (on
+SQLite, the whole database) for every request to a popular article. Instead
+views are added up in memory and written out in batches, either every
+`ARTICLE_VIEW_FLUSH_INTERVAL` seconds or as soon as
+`ARTICLE_VIEW_MAX_PENDING` views are waiting, whichever comes first.
+
+Views that have not been written out yet are lost if the process dies, so
+`ARTICLE_VIEW_MAX_PENDING` is also the most views a crash can lose per
+process. Setting `ARTICLE_VIEW_FLUSH_INTERVAL` to 0 writes every view
+straight away.
+
+Counting a view never fails the request that is being counted: if the views
+can't be written they are logged, kept and tried again with the next flush.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from conduit.apps.core.utils import get_database_name
+from conduit.apps.profiles.statistics import update_statistics_by_count
+
+from .models import Article
+
+logger = logging.getLogger(__name__)
+
+
+def write_view_counts(counts):
+    """
+    Add `counts` (a dict of article id to number of views) to the articles'
+    view counts and to their authors' `total_article_views`.
+
+    Articles (and authors) that got the same number of views are updated
+    together, so this runs one UPDATE per distinct count rather than one per
+    article.
+    """
+    article_ids_by_count = defaultdict(list)
+
+    for article_id, count in counts.items():
+        article_ids_by_count[count].append(article_id)
+
+    views_by_author = Counter()
+    authors = Article.objects.filter(pk__in=list(counts)).values_list(
+        'pk', 'author_id'
+    )
+
+    for article_id, author_id in authors:
+        views_by_author[author_id] += counts[article_id]
+
+    with transaction.atomic():
+        for count, article_ids in article_ids_by_count.items():
+            Article.objects.filter(pk__in=article_ids).update(
+                view_count=F('view_count') + count
+            )
+
+        update_statistics_by_count(views_by_author, 'total_article_views')
+
+
+class ViewCounter(object):
+    def __init__(self):
+        self._counts = Counter()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._database = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'ARTICLE_VIEW_FLUSH_INTERVAL', 10)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, 'ARTICLE_VIEW_MAX_PENDING', 1000)
+
+    def record(self, article_id, count=1):
+        """Count `count` views of the article with the given id."""
+        with self._lock:
+            self._counts[article_id] += count
+            self._pending += count
+            self._database = get_database_name()
+            pending = self._pending
+
+        if self.flush_interval <= 0 or pending >= self.max_pending:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not write article view counts.')
+        else:
+            self._start()
+
+    def flush(self):
+        """Write all buffered views to the database."""
+        # Only one flush at a time, so that batches are written in order.
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, Counter()
+                self._pending = 0
+                database, self._database = self._database, None
+
+            if not counts:
+                return
+
+            # Views counted in a database that has since been swapped out,
+            # like a test database once the tests are done, are not written
+            # to whatever took its place.
+            if database != get_database_name():
+                logger.warning(
+                    'Dropping %d article views counted in another database.',
+                    sum(counts.values())
+                )
+                return
+
+            try:
+                write_view_counts(counts)
+            except Exception:
+                # Put the views back so the next flush can try again.
+                with self._lock:
+                    self._counts.update(counts)
+                    self._pending += sum(counts.values())
+                    self._database = database
+
+                raise
+
+    def _start(self):
+        # The flusher thread is started lazily so that each worker process
+        # gets its own after forking.
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._thread = threading.Thread(
+                target=self._run, name='article-view-counter'
+            )
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not write article view counts.')
+            finally:
+                # This thread has its own database connection. Don't hold
+                # on to it between flushes.
+                connection.close()
+
+
+view_counter = ViewCounter()
+
+
+@atexit.register
+def flush_view_counter():
+    # Write out whatever is still buffered when the process exits cleanly.
+    try:
+        view_counter.flush()
+    except Exception:
+        logger.exception('Could not write article view counts.')
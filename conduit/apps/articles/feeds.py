@@ -0,0 +1,248 @@
+"""
+Materialized home feeds.
+
+Instead of joining every followed author's articles on each request, every
+profile has a feed table (`FeedEntry`) that is written to when an article
+is published and when the profile follows or unfollows someone.
+
+Fanning out a single article to millions of followers is too expensive to
+do while publishing, so authors with at least `FEED_FANOUT_MAX_FOLLOWERS`
+followers are skipped on write. Their articles are merged into each
+follower's feed when it is read instead (fan-out-on-read). These authors
+are kept in `FeedPullAuthor` until they drop back below the threshold and
+what they published in the meantime has been copied into their followers'
+feeds (see `restore_fan_out`).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from conduit.apps.core.routers import use_primary
+from conduit.apps.profiles.models import Profile
+
+from .models import Article, FeedEntry, FeedPullAuthor
+
+PULL_AUTHORS_CACHE_KEY = 'feeds:pull-authors'
+
+Follow = Profile.follows.through
+
+
+def get_fanout_max_followers():
+    return getattr(settings, 'FEED_FANOUT_MAX_FOLLOWERS', 10000)
+
+
+def get_inbox_size():
+    return getattr(settings, 'FEED_INBOX_SIZE', 1000)
+
+
+def get_batch_size():
+    return getattr(settings, 'FEED_BATCH_SIZE', 1000)
+
+
+def get_pull_author_ids():
+    """
+    Returns the set of profile ids whose articles are not fanned out on
+    write because they have too many followers.
+    """
+    author_ids = cache.get(PULL_AUTHORS_CACHE_KEY)
+
+    if author_ids is None:
+        # A replica may not have seen an author cross the threshold yet.
+        # Cached, that would hide their new articles from every feed.
+        with use_primary():
+            author_ids = set(
+                FeedPullAuthor.objects.values_list('profile_id', flat=True)
+            )
+        cache.set(
+            PULL_AUTHORS_CACHE_KEY, author_ids,
+            getattr(settings, 'FEED_PULL_AUTHORS_TIMEOUT', 300)
+        )
+
+    return author_ids
+
+
+def get_feed_queryset(profile):
+    """
+    Returns the articles in `profile`'s home feed, newest first.
+
+    A feed made only of fanned out articles is read from `FeedEntry` in the
+    order of its `(owner, created_at)` index. Feeds that also follow authors
+    read on demand have to be merged with their articles, which the index
+    can't help with.
+    """
+    pulled_author_ids = list(profile.follows.filter(
+        pk__in=get_pull_author_ids()
+    ).values_list('pk', flat=True))
+
+    if not pulled_author_ids:
+        return Article.objects.filter(feed_entries__owner=profile).order_by(
+            '-feed_entries__created_at', '-feed_entries__article_id'
+        )
+
+    pushed = Q(pk__in=FeedEntry.objects.filter(owner=profile).values(
+        'article_id'
+    ))
+    pulled = Q(author_id__in=pulled_author_ids)
+
+    return Article.objects.filter(pushed | pulled).order_by(
+        '-created_at', '-pk'
+    )
+
+
+def _bulk_create_entries(entries):
+    batch_size = get_batch_size()
+    batch = []
+
+    for entry in entries:
+        batch.append(entry)
+
+        if len(batch) >= batch_size:
+            FeedEntry.objects.bulk_create(batch)
+            batch = []
+
+    if batch:
+        FeedEntry.objects.bulk_create(batch)
+
+
+def fan_out_article(article):
+    """Add a newly published `article` to the feeds of its author's followers."""
+    followers = Follow.objects.filter(to_profile_id=article.author_id)
+
+    if followers.count() >= get_fanout_max_followers():
+        _, created = FeedPullAuthor.objects.get_or_create(
+            profile_id=article.author_id,
+            defaults={'since': article.created_at}
+        )
+
+        # This author is now read on demand. Make sure readers find out
+        # straight away rather than when the cached set expires.
+        if created:
+            cache.delete(PULL_AUTHORS_CACHE_KEY)
+
+        return
+
+    follower_ids = followers.values_list('from_profile_id', flat=True)
+
+    _bulk_create_entries(
+        FeedEntry(
+            owner_id=follower_id,
+            article_id=article.pk,
+            author_id=article.author_id,
+            created_at=article.created_at,
+        )
+        for follower_id in follower_ids.iterator()
+    )
+
+    # The author may have been read on demand until now without anyone
+    # unfollowing them, e.g. because the threshold was raised.
+    if article.author_id in get_pull_author_ids():
+        restore_fan_out([article.author_id])
+
+
+def _create_entries(follower_ids, articles):
+    """
+    Add `articles`, a list of `(pk, author_id, created_at)` tuples, to the
+    feeds of `follower_ids`, skipping the ones that are already there.
+    """
+    article_ids = [article[0] for article in articles]
+
+    for follower_id in follower_ids:
+        existing = set(FeedEntry.objects.filter(
+            owner_id=follower_id, article_id__in=article_ids
+        ).values_list('article_id', flat=True))
+
+        _bulk_create_entries(
+            FeedEntry(
+                owner_id=follower_id,
+                article_id=article_id,
+                author_id=author_id,
+                created_at=created_at,
+            )
+            for article_id, author_id, created_at in articles
+            if article_id not in existing
+        )
+
+
+def backfill_feeds(follower_ids, author_ids):
+    """
+    Copy the latest `FEED_INBOX_SIZE` articles by `author_ids` into the feeds
+    of `follower_ids`. Called when the followers start following the authors.
+
+    Authors read on demand are copied too, so that their older articles are
+    already in place if they drop back below `FEED_FANOUT_MAX_FOLLOWERS`.
+    """
+    if not author_ids:
+        return
+
+    articles = list(Article.objects.filter(
+        author_id__in=author_ids
+    ).order_by('-created_at').values_list(
+        'pk', 'author_id', 'created_at'
+    )[:get_inbox_size()])
+
+    _create_entries(follower_ids, articles)
+
+
+def restore_fan_out(author_ids):
+    """
+    Fan out the authors among `author_ids` that are read on demand but have
+    fewer than `FEED_FANOUT_MAX_FOLLOWERS` followers again. What they
+    published in the meantime is copied into their followers' feeds first.
+    """
+    pulled = list(FeedPullAuthor.objects.filter(
+        profile_id__in=list(author_ids)
+    ))
+
+    if not pulled:
+        return
+
+    threshold = get_fanout_max_followers()
+
+    for pull_author in pulled:
+        author_id = pull_author.profile_id
+        followers = Follow.objects.filter(to_profile_id=author_id)
+
+        # Most authors stay above the threshold after losing a follower, so
+        # count their followers before loading all of them.
+        if followers.count() >= threshold:
+            continue
+
+        with transaction.atomic():
+            # Whoever deletes the row does the copying.
+            deleted, _ = FeedPullAuthor.objects.filter(
+                profile_id=author_id
+            ).delete()
+
+            if not deleted:
+                continue
+
+            articles = list(Article.objects.filter(
+                author_id=author_id, created_at__gte=pull_author.since
+            ).order_by('-created_at').values_list(
+                'pk', 'author_id', 'created_at'
+            )[:get_inbox_size()])
+
+            _create_entries(
+                followers.values_list('from_profile_id', flat=True), articles
+            )
+
+        cache.delete(PULL_AUTHORS_CACHE_KEY)
+
+
+def remove_from_feeds(follower_ids, author_ids):
+    """Remove articles by `author_ids` from the feeds of `follower_ids`."""
+    FeedEntry.objects.filter(
+        owner_id__in=follower_ids, author_id__in=author_ids
+    ).delete()
+
+
+def rebuild_feed(profile_id):
+    """Rebuild the feed of a single profile from the follow graph."""
+    FeedEntry.objects.filter(owner_id=profile_id).delete()
+
+    author_ids = Follow.objects.filter(
+        from_profile_id=profile_id
+    ).values_list('to_profile_id', flat=True)
+
+    backfill_feeds([profile_id], author_ids)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from conduit.apps.articles.cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the hit and miss counters of the article cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Reset the counters after showing them.'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+
+        if stats is None:
+            self.stdout.write(
+                'The article cache is off. Set '
+                'ARTICLE_REPRESENTATION_CACHE_ALIAS to turn it on.'
+            )
+            return
+
+        self.stdout.write('Hits:      {}'.format(stats['hits']))
+        self.stdout.write('Misses:    {}'.format(stats['misses']))
+
+        if stats['hit_ratio'] is not None:
+            self.stdout.write('Hit ratio: {:.1%}'.format(stats['hit_ratio']))
+
+        if options['reset']:
+            reset_stats()
+            self.stdout.write('Counters reset.')
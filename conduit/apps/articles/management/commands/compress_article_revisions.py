@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from conduit.apps.articles.models import ArticleRevision
+from conduit.apps.articles.revisions import compress_revisions
+
+
+class Command(BaseCommand):
+    help = (
+        'Rewrite article revisions as periodic snapshots plus deltas and '
+        'report how much space that saves.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report the savings, without changing anything.'
+        )
+
+    def handle(self, *args, **options):
+        article_ids = ArticleRevision.objects.order_by(
+            'article_id'
+        ).values_list('article_id', flat=True).distinct()
+
+        total_before = total_after = 0
+
+        for count, article_id in enumerate(article_ids.iterator(), 1):
+            before, after = compress_revisions(
+                article_id, dry_run=options['dry_run']
+            )
+            total_before += before
+            total_after += after
+
+            if count % 100 == 0:
+                self.stdout.write('Processed {} articles.'.format(count))
+
+        saved = total_before - total_after
+
+        self.stdout.write(
+            'Revision content: {} bytes before, {} bytes after, {} bytes '
+            '({:.1f}%) saved.'.format(
+                total_before, total_after, saved,
+                100.0 * saved / total_before if total_before else 0.0
+            )
+        )
+
+        if options['dry_run']:
+            self.stdout.write('Dry run, nothing was changed.')
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
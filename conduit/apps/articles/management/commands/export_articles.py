@@ -0,0 +1,59 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from conduit.apps.articles.transfer import iter_article_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Write every article, with its tags and comments, as JSON Lines. '
+        'See `conduit.apps.articles.transfer` for the format.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='-',
+            help='File to write to. Defaults to standard output.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Number of articles to read at a time.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+
+        if options['output'] == '-':
+            output = sys.stdout
+        else:
+            output = open(options['output'], 'w', encoding='utf-8')
+
+        # Progress goes to standard error, so that it does not end up in the
+        # export when writing to standard output.
+        started = time.time()
+        exported = 0
+
+        try:
+            for record in iter_article_records(chunk_size):
+                output.write(json.dumps(record, ensure_ascii=False))
+                output.write('\n')
+                exported += 1
+
+                if exported % chunk_size == 0:
+                    self.report(exported, started)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        self.report(exported, started)
+        self.stderr.write(self.style.SUCCESS('Done.'))
+
+    def report(self, exported, started):
+        elapsed = max(time.time() - started, 1e-6)
+
+        self.stderr.write('Exported {} articles ({:.0f} rows/s).'.format(
+            exported, exported / elapsed
+        ))
@@ -0,0 +1,76 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from conduit.apps.articles.categories import category_tree
+from conduit.apps.articles.tags import tag_directory
+from conduit.apps.articles.transfer import ArticleImporter
+
+
+def read_records(lines):
+    for line in lines:
+        line = line.strip()
+
+        if line:
+            yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = (
+        'Import articles, with their tags and comments, from JSON Lines '
+        'written by `export_articles`. Authors that do not exist are '
+        'created, with an unusable password, unless their email address is '
+        'taken. Categories must already exist. Articles whose slug is taken '
+        'are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input', nargs='?', default='-',
+            help='File to read from. Defaults to standard input.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of articles to insert per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        if options['input'] == '-':
+            lines = sys.stdin
+        else:
+            lines = open(options['input'], encoding='utf-8')
+
+        importer = ArticleImporter(batch_size=options['batch_size'])
+        started = time.time()
+        stats = importer.stats
+
+        try:
+            for stats in importer.import_records(read_records(lines)):
+                elapsed = max(time.time() - started, 1e-6)
+
+                self.stdout.write(
+                    'Imported {} users, {} articles, {} tags and {} '
+                    'comments, skipped {} users, {} articles and {} comments '
+                    '({:.0f} rows/s).'.format(
+                        stats['users'], stats['articles'], stats['tags'],
+                        stats['comments'], stats['skipped_users'],
+                        stats['skipped'], stats['skipped_comments'],
+                        stats['rows'] / elapsed
+                    )
+                )
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+
+        # Articles inserted in bulk do not send signals. The importer indexes
+        # them for search and updates the statistics of their authors, but
+        # the shared in-memory directories have to be told.
+        tag_directory.invalidate()
+        category_tree.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Done. Run rebuild_feeds to add the imported articles to the '
+            'home feeds of their authors\' followers.'
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from conduit.apps.articles.categories import category_tree, rebuild_paths
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the materialized path of every category, e.g. after '
+        'categories were created or moved without sending signals.'
+    )
+
+    def handle(self, *args, **options):
+        changed = rebuild_paths()
+        category_tree.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Updated the paths of {} categories.'.format(changed)
+        ))
@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from conduit.apps.articles.feeds import PULL_AUTHORS_CACHE_KEY, rebuild_feed
+from conduit.apps.profiles.models import Profile
+
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized home feeds from the follow graph.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Only rebuild the feeds of these users.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Number of feeds to rebuild per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        # The set of fan-out-on-read authors may have changed since it was
+        # cached, so start from a fresh copy.
+        cache.delete(PULL_AUTHORS_CACHE_KEY)
+
+        profiles = Profile.objects.order_by('pk')
+
+        if options['usernames']:
+            profiles = profiles.filter(
+                user__username__in=options['usernames']
+            )
+
+        profile_ids = list(profiles.values_list('pk', flat=True))
+        chunk_size = options['chunk_size']
+
+        for start in range(0, len(profile_ids), chunk_size):
+            with transaction.atomic():
+                for profile_id in profile_ids[start:start + chunk_size]:
+                    rebuild_feed(profile_id)
+
+            self.stdout.write('Rebuilt {} of {} feeds.'.format(
+                min(start + chunk_size, len(profile_ids)), len(profile_ids)
+            ))
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from conduit.apps.articles.models import Article
+from conduit.apps.articles.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the article full-text search index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of articles to index per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        chunk_size = options['chunk_size']
+        articles = Article.objects.only(
+            'id', 'title', 'description', 'body'
+        ).order_by('pk')
+
+        with transaction.atomic():
+            backend.clear()
+
+        # Walk the table in primary key order so that only one chunk of
+        # articles is held in memory at a time.
+        last_pk = 0
+        indexed = 0
+
+        while True:
+            chunk = list(articles.filter(pk__gt=last_pk)[:chunk_size])
+
+            if not chunk:
+                break
+
+            with transaction.atomic():
+                backend.index(chunk)
+
+            last_pk = chunk[-1].pk
+            indexed += len(chunk)
+            self.stdout.write('Indexed {} articles.'.format(indexed))
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from conduit.apps.articles.models import Article
+from conduit.apps.articles.ratings import reconcile_aggregates
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the rating count, sum, histogram and Bayesian score of '
+        'every article from its ratings.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of articles to reconcile per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        articles = Article.objects.order_by('pk')
+        last_pk = 0
+        reconciled = 0
+
+        # Each chunk costs one grouped query over the ratings of its
+        # articles, however many ratings they have.
+        while True:
+            article_ids = list(articles.filter(
+                pk__gt=last_pk
+            ).values_list('pk', flat=True)[:chunk_size])
+
+            if not article_ids:
+                break
+
+            reconcile_aggregates(article_ids)
+
+            last_pk = article_ids[-1]
+            reconciled += len(article_ids)
+            self.stdout.write('Reconciled {} articles.'.format(reconciled))
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
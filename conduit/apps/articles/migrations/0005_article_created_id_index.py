@@ -0,0 +1,19 @@
+# Generated migration for cursor pagination
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_add_new_models'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(
+                fields=['created_at', 'id'], name='articles_created_id_idx'
+            ),
+        ),
+    ]
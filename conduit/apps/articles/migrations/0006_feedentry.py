@@ -0,0 +1,44 @@
+# Generated migration for the materialized home feed
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_add_social_features'),
+        ('articles', '0005_article_created_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('article', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='feed_entries', to='articles.Article'
+                )),
+                ('author', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='+', to='profiles.Profile'
+                )),
+                ('owner', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='feed_entries', to='profiles.Profile'
+                )),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='feedentry',
+            unique_together=set([('owner', 'article')]),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(
+                fields=['owner', 'created_at'], name='articles_feed_owner_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated migration for the article full-text search index
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # The FTS5 index only exists on SQLite. Other databases use the search
+    # backend configured in `ARTICLE_SEARCH_BACKEND`.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE articles_article_fts USING fts5("
+        "title, description, body, tokenize='porter unicode61')"
+    )
+    schema_editor.execute(
+        'INSERT INTO articles_article_fts (rowid, title, description, body) '
+        'SELECT id, title, description, body FROM articles_article'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute('DROP TABLE articles_article_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0006_feedentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated migration for delta-compressed article revisions
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_article_search_index'),
+    ]
+
+    operations = [
+        # Existing revisions are full copies, so they start out as snapshots.
+        # `compress_article_revisions` converts them.
+        migrations.AddField(
+            model_name='articlerevision',
+            name='is_snapshot',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='articlerevision',
+            name='delta',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated migration for denormalized article rating aggregates
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0008_articlerevision_delta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleRatingAggregate',
+            fields=[
+                ('article', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True, related_name='rating_aggregate',
+                    serialize=False, to='articles.Article'
+                )),
+                ('rating_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('score_1_count', models.IntegerField(default=0)),
+                ('score_2_count', models.IntegerField(default=0)),
+                ('score_3_count', models.IntegerField(default=0)),
+                ('score_4_count', models.IntegerField(default=0)),
+                ('score_5_count', models.IntegerField(default=0)),
+                ('bayesian_score', models.FloatField(db_index=True, default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated migration for materialized category paths
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def set_category_paths(apps, schema_editor):
+    Category = apps.get_model('articles', 'Category')
+    rows = list(Category.objects.values_list('pk', 'parent_id'))
+    ids = set(pk for pk, parent_id in rows)
+    children = defaultdict(list)
+
+    for pk, parent_id in rows:
+        children[parent_id if parent_id in ids else None].append(pk)
+
+    paths = {}
+    stack = [(pk, '') for pk in children[None]]
+
+    while stack:
+        pk, parent_path = stack.pop()
+        paths[pk] = '{}{}/'.format(parent_path, pk)
+        stack.extend((child, paths[pk]) for child in children.get(pk, ()))
+
+    for pk, parent_id in rows:
+        path = paths.get(pk, '{}/'.format(pk))
+        Category.objects.filter(pk=pk).update(
+            path=path, depth=path.count('/') - 1
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_articleratingaggregate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(set_category_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated migration for durable fan-out-on-read authors
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=django.utils.timezone.utc)
+
+
+def add_pull_authors(apps, schema_editor):
+    # Authors that were read on demand until now have no feed entries for
+    # what they published in the meantime. It is not known since when, so
+    # their latest articles are all copied when they are fanned out again.
+    Profile = apps.get_model('profiles', 'Profile')
+    FeedPullAuthor = apps.get_model('articles', 'FeedPullAuthor')
+    Follow = Profile.follows.through
+
+    author_ids = Follow.objects.order_by().values('to_profile_id').annotate(
+        followers=models.Count('id')
+    ).filter(
+        followers__gte=getattr(settings, 'FEED_FANOUT_MAX_FOLLOWERS', 10000)
+    ).values_list('to_profile_id', flat=True)
+
+    FeedPullAuthor.objects.bulk_create(
+        FeedPullAuthor(profile_id=author_id, since=EPOCH)
+        for author_id in author_ids
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_add_social_features'),
+        ('articles', '0010_category_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedPullAuthor',
+            fields=[
+                ('profile', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True, related_name='+', serialize=False,
+                    to='profiles.Profile'
+                )),
+                ('since', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(add_pull_authors, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,33 @@
-from django.db import models
+from collections import OrderedDict
+
+from django.db import IntegrityError, models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 from conduit.apps.core.models import TimestampedModel
 
+from .slugs import allocate_slugs
+
+
+class ArticleManager(models.Manager):
+    def bulk_create(self, objs, batch_size=None):
+        """
+        Like `QuerySet.bulk_create`, but gives every article without a slug
+        a unique one first, since `bulk_create` does not send the `pre_save`
+        signal that usually does that. No other signals are sent either, so
+        feeds, the search index and the other denormalized data must be
+        rebuilt afterwards.
+        """
+        objs = list(objs)
+        missing = [article for article in objs if not article.slug]
+        slugs = allocate_slugs(self.all(), [
+            article.title for article in missing
+        ])
+
+        for article, slug in zip(missing, slugs):
+            article.slug = slug
+
+        return super(ArticleManager, self).bulk_create(objs, batch_size)
+
 
 class Article(TimestampedModel):
     slug = models.SlugField(db_index=True, max_length=255, unique=True)
@@ -33,6 +58,16 @@ class Article(TimestampedModel):
     is_published = models.BooleanField(default=True)
     featured = models.BooleanField(default=False)
 
+    objects = ArticleManager()
+
+    class Meta(TimestampedModel.Meta):
+        # Cursor pagination walks articles in `(created_at, id)` order.
+        indexes = [
+            models.Index(
+                fields=['created_at', 'id'], name='articles_created_id_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -56,10 +91,63 @@ class Comment(TimestampedModel):
     is_edited = models.BooleanField(default=False)
 
 
+class TagManager(models.Manager):
+    def get_or_create_many(self, names):
+        """
+        Returns a `Tag` for each distinct name in `names`, in order, creating
+        the ones that don't exist yet.
+
+        Tags are matched on `slug`, which is the lowercased name, so "Django"
+        and "django" are the same tag. This takes one query to find the
+        existing tags and, if any are missing, one to create them and one to
+        read them back.
+        """
+        names_by_slug = OrderedDict()
+
+        for name in names:
+            names_by_slug.setdefault(name.lower(), name)
+
+        tags = dict(
+            (tag.slug, tag)
+            for tag in self.filter(slug__in=list(names_by_slug))
+        )
+        missing = [
+            slug for slug in names_by_slug if slug not in tags
+        ]
+
+        if missing:
+            try:
+                with transaction.atomic():
+                    self.bulk_create([
+                        self.model(tag=names_by_slug[slug], slug=slug)
+                        for slug in missing
+                    ])
+            except IntegrityError:
+                # Someone else created some of these tags after we looked.
+                # We pick those up below and create the rest one by one.
+                pass
+
+            # Not every database returns primary keys from `bulk_create`, so
+            # read the new tags back.
+            tags.update(
+                (tag.slug, tag) for tag in self.filter(slug__in=missing)
+            )
+
+            for slug in missing:
+                if slug not in tags:
+                    tags[slug], created = self.get_or_create(
+                        slug=slug, defaults={'tag': names_by_slug[slug]}
+                    )
+
+        return [tags[slug] for slug in names_by_slug]
+
+
 class Tag(TimestampedModel):
     tag = models.CharField(max_length=255)
     slug = models.SlugField(db_index=True, unique=True)
 
+    objects = TagManager()
+
     def __str__(self):
         return self.tag
 
@@ -79,6 +167,16 @@ class Category(TimestampedModel):
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
 
+    # The primary keys of the category's ancestors and of the category
+    # itself, each followed by a "/", e.g. "1/5/12/". The categories in a
+    # subtree are the ones whose path starts with the path of its root, so
+    # they can be found with one indexed query. Both fields are kept up to
+    # date when a category is saved. See `conduit.apps.articles.categories`.
+    path = models.CharField(
+        max_length=255, db_index=True, blank=True, editable=False
+    )
+    depth = models.IntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name_plural = 'categories'
         ordering = ['order', 'name']
@@ -105,6 +203,12 @@ class ArticleRevision(TimestampedModel):
     revision_note = models.TextField(blank=True)
     version_number = models.IntegerField()
 
+    # Snapshots hold the full `title`, `description` and `body`. Other
+    # revisions leave those blank and hold a `delta` against the version
+    # before them instead. See `conduit.apps.articles.revisions`.
+    is_snapshot = models.BooleanField(default=True)
+    delta = models.TextField(blank=True)
+
     class Meta:
         ordering = ['-created_at']
         unique_together = ['article', 'version_number']
@@ -136,6 +240,47 @@ class ArticleRating(TimestampedModel):
         return f"{self.profile.user.username} rated {self.article.title}: {self.score}/5"
 
 
+class ArticleRatingAggregate(models.Model):
+    """
+    The ratings of an article added up, kept current as ratings are saved
+    and deleted. See `conduit.apps.articles.ratings`.
+    """
+    article = models.OneToOneField(
+        'articles.Article', on_delete=models.CASCADE, primary_key=True,
+        related_name='rating_aggregate'
+    )
+
+    rating_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+
+    # How many ratings of each score the article has.
+    score_1_count = models.IntegerField(default=0)
+    score_2_count = models.IntegerField(default=0)
+    score_3_count = models.IntegerField(default=0)
+    score_4_count = models.IntegerField(default=0)
+    score_5_count = models.IntegerField(default=0)
+
+    # The average rating pulled towards `ARTICLE_RATING_PRIOR_MEAN`, so that
+    # an article with a single 5 doesn't outrank one with hundreds of 4s.
+    bayesian_score = models.FloatField(db_index=True, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def average(self):
+        if not self.rating_count:
+            return None
+
+        return float(self.rating_sum) / self.rating_count
+
+    @property
+    def histogram(self):
+        return dict(
+            (score, getattr(self, 'score_{}_count'.format(score)))
+            for score in range(1, 6)
+        )
+
+
 class BookmarkCollection(TimestampedModel):
     """Collections for organizing bookmarked articles."""
     name = models.CharField(max_length=100)
@@ -186,3 +331,60 @@ class ReadingList(TimestampedModel):
 
     def __str__(self):
         return f"{self.profile.user.username} - {self.article.title}"
+
+
+class FeedEntry(models.Model):
+    """
+    One article in a profile's materialized home feed.
+
+    Rows are written when an article is published (fan-out-on-write) and
+    when a profile follows or unfollows an author, so that reading the feed
+    does not have to join across the whole follow graph.
+    """
+    owner = models.ForeignKey(
+        'profiles.Profile', on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+
+    article = models.ForeignKey(
+        'articles.Article', on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+
+    author = models.ForeignKey(
+        'profiles.Profile', on_delete=models.CASCADE, related_name='+'
+    )
+
+    # A copy of `article.created_at`, so a feed can be read in order using
+    # only the index below.
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['owner', 'article']
+        indexes = [
+            models.Index(
+                fields=['owner', 'created_at'], name='articles_feed_owner_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.owner.user.username} - {self.article.title}"
+
+
+class FeedPullAuthor(models.Model):
+    """
+    An author whose articles are merged into feeds when they are read
+    rather than fanned out when they are published. The row stays until the
+    author's unfanned articles have been copied into their followers' feeds,
+    so nothing drops out of a feed when the author leaves this set.
+    """
+    profile = models.OneToOneField(
+        'profiles.Profile', on_delete=models.CASCADE, primary_key=True,
+        related_name='+'
+    )
+
+    # When the first article that was not fanned out was published.
+    since = models.DateTimeField()
+
+    def __str__(self):
+        return self.profile.user.username
@@ -0,0 +1,138 @@
+"""
+Keeps `ArticleRatingAggregate` up to date.
+
+Every rating that is created, changed or deleted is added to (or taken off)
+its article's aggregate with a single UPDATE of `F()` expressions, which
+also recomputes the Bayesian score:
+
+    (prior_weight * prior_mean + rating_sum) / (prior_weight + rating_count)
+
+`ARTICLE_RATING_PRIOR_MEAN` and `ARTICLE_RATING_PRIOR_WEIGHT` set the prior.
+After changing either, run `reconcile_rating_aggregates` to recompute every
+score. The same command fixes aggregates that drifted because ratings were
+changed without sending signals.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Value
+
+from .models import ArticleRating, ArticleRatingAggregate
+
+SCORES = range(1, 6)
+
+
+def get_prior():
+    return (
+        float(getattr(settings, 'ARTICLE_RATING_PRIOR_MEAN', 3.0)),
+        float(getattr(settings, 'ARTICLE_RATING_PRIOR_WEIGHT', 5)),
+    )
+
+
+def get_bayesian_score(rating_count, rating_sum):
+    prior_mean, prior_weight = get_prior()
+
+    return (prior_weight * prior_mean + rating_sum) / (
+        prior_weight + rating_count
+    )
+
+
+def _score_field(score):
+    return 'score_{}_count'.format(score)
+
+
+def compute_aggregates(article_ids):
+    """
+    Returns new, unsaved aggregates for those of the given articles that
+    have ratings, computed with one grouped query.
+    """
+    histograms = defaultdict(dict)
+    counts = ArticleRating.objects.filter(
+        article_id__in=list(article_ids)
+    ).order_by().values('article_id', 'score').annotate(
+        count=Count('id')
+    ).values_list('article_id', 'score', 'count')
+
+    for article_id, score, count in counts:
+        histograms[article_id][score] = count
+
+    aggregates = []
+
+    for article_id, histogram in histograms.items():
+        aggregate = ArticleRatingAggregate(
+            article_id=article_id,
+            rating_count=sum(histogram.values()),
+            rating_sum=sum(
+                score * count for score, count in histogram.items()
+            ),
+        )
+
+        for score in SCORES:
+            setattr(aggregate, _score_field(score), histogram.get(score, 0))
+
+        aggregate.bayesian_score = get_bayesian_score(
+            aggregate.rating_count, aggregate.rating_sum
+        )
+        aggregates.append(aggregate)
+
+    return aggregates
+
+
+def reconcile_aggregates(article_ids):
+    """Replace the aggregates of the given articles with fresh ones."""
+    article_ids = list(article_ids)
+
+    with transaction.atomic():
+        ArticleRatingAggregate.objects.filter(
+            article_id__in=article_ids
+        ).delete()
+        ArticleRatingAggregate.objects.bulk_create(
+            compute_aggregates(article_ids)
+        )
+
+
+def update_aggregate(article_id, added=(), removed=(), create=False):
+    """
+    Add the scores in `added` to the article's aggregate and take those in
+    `removed` off it. If the article has no aggregate yet and `create` is
+    true, one is computed from its ratings, which must already include the
+    change.
+    """
+    count_delta = len(added) - len(removed)
+    sum_delta = sum(added) - sum(removed)
+    prior_mean, prior_weight = get_prior()
+
+    updates = {
+        'rating_count': F('rating_count') + count_delta,
+        'rating_sum': F('rating_sum') + sum_delta,
+        # The right hand side sees the values from before the update.
+        'bayesian_score': ExpressionWrapper(
+            (Value(prior_weight * prior_mean) + F('rating_sum') + sum_delta) /
+            (Value(prior_weight) + F('rating_count') + count_delta),
+            output_field=FloatField()
+        ),
+    }
+
+    for score in SCORES:
+        delta = list(added).count(score) - list(removed).count(score)
+
+        if delta:
+            updates[_score_field(score)] = F(_score_field(score)) + delta
+
+    updated = ArticleRatingAggregate.objects.filter(
+        article_id=article_id
+    ).update(**updates)
+
+    if updated or not create:
+        return
+
+    try:
+        with transaction.atomic():
+            ArticleRatingAggregate.objects.bulk_create(
+                compute_aggregates([article_id])
+            )
+    except IntegrityError:
+        # Someone else created it in the meantime, maybe before this
+        # rating was saved. Count again.
+        reconcile_aggregates([article_id])
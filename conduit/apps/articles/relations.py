@@ -1,14 +1,51 @@
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 
 from .models import Tag
 
 
+class TagListField(serializers.ManyRelatedField):
+    """
+    Resolves a whole list of tag names at once with
+    `Tag.objects.get_or_create_many`, instead of one `get_or_create` per tag.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        for name in data:
+            if not isinstance(name, str):
+                self.child_relation.fail('incorrect_type',
+                                         data_type=type(name).__name__)
+
+        return Tag.objects.get_or_create_many(data)
+
+
 class TagRelatedField(serializers.RelatedField):
+    default_error_messages = {
+        'incorrect_type': 'Incorrect type. Expected a string, '
+                          'received {data_type}.',
+    }
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+
+        for key in kwargs.keys():
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+
+        return TagListField(**list_kwargs)
+
     def get_queryset(self):
         return Tag.objects.all()
 
     def to_internal_value(self, data):
-        tag, created = Tag.objects.get_or_create(tag=data, slug=data.lower())
+        tag, = Tag.objects.get_or_create_many([data])
 
         return tag
 
@@ -0,0 +1,272 @@
+"""
+Compact storage for `ArticleRevision`.
+
+Most edits change a few lines of an article, so storing every version in
+full wastes a lot of space. Instead, every `ARTICLE_REVISION_SNAPSHOT_INTERVAL`
+versions a full copy (a snapshot) is stored, and the versions in between
+only store a delta against the version before them. A delta that would be
+larger than the full text is stored as a snapshot instead.
+
+A delta is a JSON object holding, for each field that changed, a list of
+line operations: a positive number copies that many lines of the previous
+version, a negative number skips that many, and a string is inserted as is.
+
+`get_revision` rebuilds any version from the closest snapshot before it.
+Versions never change once written, so rebuilt versions are cached.
+"""
+import difflib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from .models import ArticleRevision
+
+FIELDS = ('title', 'description', 'body')
+
+REVISION_KEY = 'articles:{}:revisions:{}'
+
+
+def get_cache():
+    return caches[getattr(settings, 'ARTICLE_CACHE_ALIAS', 'default')]
+
+
+def get_snapshot_interval():
+    return getattr(settings, 'ARTICLE_REVISION_SNAPSHOT_INTERVAL', 10)
+
+
+def get_timeout():
+    return getattr(settings, 'ARTICLE_REVISION_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def diff_text(old, new):
+    old_lines = old.splitlines(True)
+    new_lines = new.splitlines(True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, False)
+    ops = []
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(i2 - i1)
+            continue
+
+        if i2 > i1:
+            ops.append(i1 - i2)
+
+        if j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+
+    return ops
+
+
+def patch_text(old, ops):
+    old_lines = old.splitlines(True)
+    position = 0
+    parts = []
+
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.extend(old_lines[position:position + op])
+            position += op
+        else:
+            position -= op
+
+    return ''.join(parts)
+
+
+def encode_delta(old, new):
+    """
+    Returns the delta that turns `old` into `new`, both dicts of `FIELDS`,
+    as a JSON string.
+    """
+    return json.dumps(dict(
+        (field, diff_text(old[field], new[field]))
+        for field in FIELDS if old[field] != new[field]
+    ), separators=(',', ':'))
+
+
+def apply_delta(old, delta):
+    content = dict(old)
+
+    for field, ops in json.loads(delta).items():
+        content[field] = patch_text(old[field], ops)
+
+    return content
+
+
+def get_content(instance):
+    return dict((field, getattr(instance, field)) for field in FIELDS)
+
+
+def get_stored_size(revision):
+    """The number of bytes a revision takes up for its content."""
+    return sum(
+        len(value.encode('utf-8'))
+        for value in [revision.delta] + list(get_content(revision).values())
+    )
+
+
+def _cache_content(article_id, version_number, content):
+    get_cache().set(
+        REVISION_KEY.format(article_id, version_number), content,
+        get_timeout()
+    )
+
+
+def get_revision(article_id, version_number):
+    """
+    Returns the title, description and body of an article as they were in
+    the given version, as a dict. Raises `ArticleRevision.DoesNotExist` if
+    there is no such version.
+    """
+    key = REVISION_KEY.format(article_id, version_number)
+    content = get_cache().get(key)
+
+    if content is not None:
+        return content
+
+    revisions = ArticleRevision.objects.filter(article_id=article_id)
+    snapshot_version = revisions.filter(
+        is_snapshot=True, version_number__lte=version_number
+    ).aggregate(version=Max('version_number'))['version']
+
+    chain = list(revisions.filter(
+        version_number__gte=snapshot_version or 0,
+        version_number__lte=version_number
+    ).order_by('version_number'))
+
+    if not chain or chain[-1].version_number != version_number:
+        raise ArticleRevision.DoesNotExist(
+            'Article {} has no version {}.'.format(article_id, version_number)
+        )
+
+    content = get_content(chain[0])
+
+    for revision in chain[1:]:
+        content = apply_delta(content, revision.delta)
+
+    _cache_content(article_id, version_number, content)
+
+    return content
+
+
+def build_revision(article_id, version_number, content, previous=None):
+    """
+    Returns an unsaved `ArticleRevision` holding `content`, either as a
+    snapshot or as a delta against `previous`, the content of the version
+    before it.
+    """
+    revision = ArticleRevision(
+        article_id=article_id, version_number=version_number
+    )
+    interval = get_snapshot_interval()
+
+    if previous is not None and (version_number - 1) % interval != 0:
+        delta = encode_delta(previous, content)
+
+        if len(delta) < sum(len(value) for value in content.values()):
+            revision.is_snapshot = False
+            revision.delta = delta
+
+            for field in FIELDS:
+                setattr(revision, field, '')
+
+            return revision
+
+    revision.is_snapshot = True
+    revision.delta = ''
+
+    for field in FIELDS:
+        setattr(revision, field, content[field])
+
+    return revision
+
+
+def record_revision(article, edited_by=None, note=''):
+    """
+    Store the current title, description and body of `article` as its next
+    version, unless they are the same as the latest version. Returns the new
+    `ArticleRevision`, or `None` if nothing changed.
+    """
+    content = get_content(article)
+
+    for attempt in range(3):
+        latest = ArticleRevision.objects.filter(
+            article_id=article.pk
+        ).aggregate(version=Max('version_number'))['version']
+
+        previous = None
+
+        if latest is not None:
+            previous = get_revision(article.pk, latest)
+
+            if previous == content:
+                return None
+
+        revision = build_revision(
+            article.pk, (latest or 0) + 1, content, previous
+        )
+        revision.edited_by = edited_by
+        revision.revision_note = note
+
+        try:
+            with transaction.atomic():
+                revision.save()
+        except IntegrityError:
+            # Someone else saved a version at the same time. Diff against
+            # theirs instead.
+            if attempt == 2:
+                raise
+
+            continue
+
+        _cache_content(article.pk, revision.version_number, content)
+
+        return revision
+
+
+def compress_revisions(article_id, dry_run=False):
+    """
+    Rewrite the revisions of an article as snapshots and deltas according to
+    the current snapshot interval. Returns a tuple of the number of bytes
+    their content took up before and after.
+    """
+    revisions = list(ArticleRevision.objects.filter(
+        article_id=article_id
+    ).order_by('version_number'))
+
+    before = after = 0
+    content = None
+
+    with transaction.atomic():
+        for revision in revisions:
+            if revision.is_snapshot:
+                new_content = get_content(revision)
+            else:
+                new_content = apply_delta(content, revision.delta)
+
+            compressed = build_revision(
+                article_id, revision.version_number, new_content, content
+            )
+            before += get_stored_size(revision)
+            after += get_stored_size(compressed)
+
+            changed = (
+                compressed.is_snapshot != revision.is_snapshot or
+                compressed.delta != revision.delta
+            )
+
+            if changed and not dry_run:
+                ArticleRevision.objects.filter(pk=revision.pk).update(
+                    is_snapshot=compressed.is_snapshot,
+                    delta=compressed.delta,
+                    **get_content(compressed)
+                )
+
+            content = new_content
+
+    return before, after
@@ -0,0 +1,168 @@
+"""
+Full-text search over article titles, descriptions and bodies.
+
+The backend is chosen with the `ARTICLE_SEARCH_BACKEND` setting. If it is
+`None`, SQLite databases use an FTS5 index and every other database falls
+back to `SimpleSearchBackend`, which does not need an index.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Article
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def get_search_terms(query):
+    """Split a user supplied search query into the words to search for."""
+    return WORD_RE.findall(query or '')
+
+
+class BaseSearchBackend(object):
+    def index(self, articles):
+        """Add `articles` to the index, replacing any earlier copies."""
+        raise NotImplementedError
+
+    def remove(self, article_ids):
+        """Remove the articles with the given ids from the index."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every article from the index."""
+        raise NotImplementedError
+
+    def search(self, query, offset, limit):
+        """
+        Returns a tuple `(ids, count)`: the ids of the matching articles, best
+        match first, from `offset` to `offset + limit`, and the total number
+        of matching articles.
+        """
+        raise NotImplementedError
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    Searches the article table directly with `icontains`. It needs no index,
+    so it works anywhere, but every search scans the whole table and results
+    are ordered by date rather than relevance.
+    """
+
+    def index(self, articles):
+        pass
+
+    def remove(self, article_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, query, offset, limit):
+        terms = get_search_terms(query)
+
+        if not terms:
+            return [], 0
+
+        queryset = Article.objects.all()
+
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) |
+                Q(description__icontains=term) |
+                Q(body__icontains=term)
+            )
+
+        ids = list(queryset.values_list('pk', flat=True)[offset:offset + limit])
+
+        return ids, queryset.count()
+
+
+class SQLiteFTS5SearchBackend(BaseSearchBackend):
+    """
+    Searches an SQLite FTS5 table that holds a copy of each article's title,
+    description and body, using the article id as the rowid. Results are
+    ranked with BM25, with matches in the title counting the most.
+    """
+    table = 'articles_article_fts'
+    weights = (10.0, 5.0, 1.0)
+
+    def index(self, articles):
+        articles = list(articles)
+
+        if not articles:
+            return
+
+        self.remove([article.pk for article in articles])
+
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO {} (rowid, title, description, body) '
+                'VALUES (%s, %s, %s, %s)'.format(self.table),
+                [(article.pk, article.title, article.description, article.body)
+                 for article in articles]
+            )
+
+    def remove(self, article_ids):
+        article_ids = list(article_ids)
+
+        if not article_ids:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM {} WHERE rowid IN ({})'.format(
+                    self.table, ', '.join(['%s'] * len(article_ids))
+                ),
+                article_ids
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {}'.format(self.table))
+
+    def get_match_expression(self, query):
+        # Quote every word so that characters with a meaning in the FTS5
+        # query syntax (`-`, `*`, `NEAR`, ...) are searched for literally.
+        return ' '.join('"{}"'.format(term) for term in get_search_terms(query))
+
+    def search(self, query, offset, limit):
+        match = self.get_match_expression(query)
+
+        if not match:
+            return [], 0
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+                'ORDER BY bm25({table}, {weights}) LIMIT %s OFFSET %s'.format(
+                    table=self.table,
+                    weights=', '.join(str(weight) for weight in self.weights)
+                ),
+                [match, limit, offset]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute(
+                'SELECT COUNT(*) FROM {table} WHERE {table} MATCH %s'.format(
+                    table=self.table
+                ),
+                [match]
+            )
+            count = cursor.fetchone()[0]
+
+        return ids, count
+
+
+def get_search_backend():
+    backend = getattr(settings, 'ARTICLE_SEARCH_BACKEND', None)
+
+    if backend is not None:
+        return import_string(backend)()
+
+    if connection.vendor == 'sqlite':
+        return SQLiteFTS5SearchBackend()
+
+    return SimpleSearchBackend()
@@ -1,12 +1,27 @@
+from django.db import DEFAULT_DB_ALIAS, models
+from django.db.models import prefetch_related_objects
+
 from rest_framework import serializers
 
+from conduit.apps.core.metrics import TimedSerializerMixin
+from conduit.apps.core.routers import use_primary
 from conduit.apps.profiles.serializers import ProfileSerializer
 
+from . import cache as article_cache
 from .models import Article, Comment, Tag
 from .relations import TagRelatedField
 
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    def to_representation(self, data):
+        # Serialize the whole page at once so cached articles can be looked
+        # up in a single round trip to the cache.
+        iterable = data.all() if isinstance(data, models.Manager) else data
+
+        return self.child.to_representations(list(iterable))
+
+
+class ArticleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = ProfileSerializer(read_only=True)
     description = serializers.CharField(required=False)
     slug = serializers.SlugField(required=False)
@@ -40,6 +55,7 @@ class ArticleSerializer(serializers.ModelSerializer):
             'title',
             'updatedAt',
         )
+        list_serializer_class = ArticleListSerializer
 
     def create(self, validated_data):
         author = self.context.get('author', None)
@@ -47,9 +63,7 @@ class ArticleSerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tags', [])
 
         article = Article.objects.create(author=author, **validated_data)
-
-        for tag in tags:
-            article.tags.add(tag)
+        article.tags.add(*tags)
 
         return article
 
@@ -65,17 +79,92 @@ class ArticleSerializer(serializers.ModelSerializer):
         if not request.user.is_authenticated():
             return False
 
+        favorited = self.context.get('favorited', None)
+
+        if favorited is not None:
+            return instance.pk in favorited
+
         return request.user.profile.has_favorited(instance)
 
     def get_favorites_count(self, instance):
+        favorites_counts = self.context.get('favorites_counts', None)
+
+        if favorites_counts is not None:
+            return favorites_counts.get(instance.pk, 0)
+
         return instance.favorited_by.count()
 
     def get_updated_at(self, instance):
         return instance.updated_at.isoformat()
 
+    def to_representation(self, instance):
+        return self.to_representations([instance])[0]
+
+    def to_representations(self, articles):
+        """
+        Serialize `articles`, reusing cached representations where we can.
+
+        Only the fields that depend on the current user are computed for
+        articles found in the cache. The rest are serialized in full, after
+        loading their tags in one query, and added to the cache.
+        """
+        cached, keys = article_cache.get_representations(articles)
+        missing = [article for article in articles if article.pk not in cached]
+        fresh = {}
+
+        # Representations are stored under the versions of their article and
+        # author read above, so they must be built from rows read after them.
+        # The rows we were given may be older, or come from a lagging
+        # replica, so read the articles that are not cached again from the
+        # primary.
+        with use_primary():
+            if keys and missing:
+                fresh = Article.objects.using(DEFAULT_DB_ALIAS).select_related(
+                    'author', 'author__user'
+                ).in_bulk([article.pk for article in missing])
+                missing = [
+                    fresh.get(article.pk, article) for article in missing
+                ]
+
+            prefetch_related_objects(missing, 'tags')
+
+        missing = dict((article.pk, article) for article in missing)
+        representations = []
+        serialized = {}
+
+        for article in articles:
+            if article.pk in cached:
+                data = self.add_viewer_fields(cached[article.pk], article)
+            else:
+                data = super(ArticleSerializer, self).to_representation(
+                    missing[article.pk]
+                )
+
+                # Articles gone from the primary are shown but not cached.
+                if article.pk in fresh:
+                    serialized[article.pk] = data
+
+            representations.append(data)
+
+        article_cache.set_representations(keys, serialized)
+
+        return representations
+
+    def add_viewer_fields(self, data, instance):
+        data['favorited'] = self.get_favorited(instance)
+        data['favoritesCount'] = self.get_favorites_count(instance)
+        data['author']['following'] = self.fields['author'].get_following(
+            instance.author
+        )
+
+        return data
+
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = ProfileSerializer(required=False)
+    parent = serializers.PrimaryKeyRelatedField(
+        queryset=Comment.objects.all(), required=False, allow_null=True
+    )
 
     createdAt = serializers.SerializerMethodField(method_name='get_created_at')
     updatedAt = serializers.SerializerMethodField(method_name='get_updated_at')
@@ -86,6 +175,7 @@ class CommentSerializer(serializers.ModelSerializer):
             'id',
             'author',
             'body',
+            'parent',
             'createdAt',
             'updatedAt',
         )
@@ -98,6 +188,14 @@ class CommentSerializer(serializers.ModelSerializer):
             author=author, article=article, **validated_data
         )
 
+    def validate_parent(self, value):
+        if value is not None and value.article_id != self.context['article'].pk:
+            raise serializers.ValidationError(
+                'The parent comment belongs to a different article.'
+            )
+
+        return value
+
     def get_created_at(self, instance):
         return instance.created_at.isoformat()
 
@@ -105,7 +203,7 @@ class CommentSerializer(serializers.ModelSerializer):
         return instance.updated_at.isoformat()
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ('tag',)
@@ -1,31 +1,211 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_save
+)
 from django.dispatch import receiver
-from django.utils.text import slugify
 
-from conduit.apps.core.utils import generate_random_string
+from conduit.apps.authentication.models import User
+from conduit.apps.profiles.models import Profile
 
-from .models import Article
+from .cache import invalidate_articles, invalidate_profiles
+from .categories import category_tree, prepare_path, update_paths
+from .feeds import (
+    backfill_feeds, fan_out_article, remove_from_feeds, restore_fan_out
+)
+from .models import Article, ArticleRating, Category, FeedEntry, Tag
+from .ratings import update_aggregate
+from .search import get_search_backend
+from .slugs import allocate_slugs
+from .tags import tag_directory
 
 @receiver(pre_save, sender=Article)
 def add_slug_to_article_if_not_exists(sender, instance, *args, **kwargs):
-    MAXIMUM_SLUG_LENGTH = 255
-
     if instance and not instance.slug:
-        slug = slugify(instance.title)
-        unique = generate_random_string()
+        instance.slug = allocate_slugs(
+            Article.objects.all(), [instance.title]
+        )[0]
+
+
+@receiver(post_save, sender=Article)
+def add_article_to_follower_feeds(sender, instance, created, *args, **kwargs):
+    if instance and created:
+        fan_out_article(instance)
+
+
+@receiver(m2m_changed, sender=Profile.follows.through)
+def update_feeds_on_follow_change(sender, instance, action, reverse, pk_set,
+                                  *args, **kwargs):
+    # `follower.follows.add(followee)` sends `instance=follower` and the
+    # followees in `pk_set`. The reverse side,
+    # `followee.followed_by.add(follower)`, sends them the other way around.
+    if action == 'post_add':
+        if reverse:
+            backfill_feeds(pk_set, [instance.pk])
+        else:
+            backfill_feeds([instance.pk], pk_set)
+
+    elif action == 'post_remove':
+        if reverse:
+            remove_from_feeds(pk_set, [instance.pk])
+            restore_fan_out([instance.pk])
+        else:
+            remove_from_feeds([instance.pk], pk_set)
+            restore_fan_out(pk_set)
+
+    elif action == 'pre_clear' and not reverse:
+        # `post_clear` doesn't say who was unfollowed.
+        instance._unfollowed_ids = list(
+            instance.follows.values_list('pk', flat=True)
+        )
+
+    elif action == 'post_clear':
+        if reverse:
+            FeedEntry.objects.filter(author=instance).delete()
+        else:
+            FeedEntry.objects.filter(owner=instance).delete()
+            restore_fan_out(instance._unfollowed_ids)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_cached_article(sender, instance, *args, **kwargs):
+    invalidate_articles([instance.pk])
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_cached_article_tags(sender, instance, action, reverse, pk_set,
+                                   *args, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_articles([instance.pk])
+
+    # `tag.articles.clear()` does not tell us which articles it touched, so
+    # we have to look them up before they are removed.
+    elif action == 'pre_clear':
+        invalidate_articles(instance.articles.values_list('pk', flat=True))
+
+    elif action in ('post_add', 'post_remove'):
+        invalidate_articles(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def invalidate_cached_tagged_articles(sender, instance, created, *args,
+                                      **kwargs):
+    if not created:
+        invalidate_articles(instance.articles.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_cached_author(sender, instance, *args, **kwargs):
+    invalidate_profiles([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_author_user(sender, instance, created, *args,
+                                  **kwargs):
+    # The author's username comes from `User`. A new user does not have a
+    # profile yet, so there is nothing to invalidate.
+    if not created:
+        invalidate_profiles(
+            Profile.objects.filter(user=instance).values_list('pk', flat=True)
+        )
+
+
+@receiver(post_save, sender=Article)
+def add_article_to_search_index(sender, instance, *args, **kwargs):
+    get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Article)
+def remove_article_from_search_index(sender, instance, *args, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_tag_directory_on_tags_change(sender, action, *args, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        tag_directory.invalidate()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Article)
+def invalidate_tag_directory(sender, *args, **kwargs):
+    # Deleting an article removes its tags without sending `m2m_changed`.
+    tag_directory.invalidate()
+
+
+@receiver(pre_save, sender=ArticleRating)
+def remember_previous_rating(sender, instance, *args, **kwargs):
+    # Changing a score has to take the old one off the aggregate, so find
+    # out what it was before it is overwritten.
+    instance._previous_score = None
+
+    if instance.pk is not None:
+        instance._previous_score = ArticleRating.objects.filter(
+            pk=instance.pk
+        ).values_list('score', flat=True).first()
+
+
+@receiver(post_save, sender=ArticleRating)
+def add_rating_to_aggregate(sender, instance, created, *args, **kwargs):
+    previous = getattr(instance, '_previous_score', None)
+
+    if created:
+        update_aggregate(instance.article_id, added=[instance.score],
+                         create=True)
+    elif previous is not None and previous != instance.score:
+        update_aggregate(instance.article_id, added=[instance.score],
+                         removed=[previous])
+
+
+@receiver(post_delete, sender=ArticleRating)
+def remove_rating_from_aggregate(sender, instance, *args, **kwargs):
+    # Never create an aggregate here: when an article is deleted, its
+    # ratings are deleted along with it.
+    update_aggregate(instance.article_id, removed=[instance.score])
+
+
+@receiver(pre_save, sender=Category)
+def set_category_path(sender, instance, *args, **kwargs):
+    prepare_path(instance)
+
+
+@receiver(post_save, sender=Category)
+def move_category_descendants(sender, instance, *args, **kwargs):
+    update_paths(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_tree(sender, *args, **kwargs):
+    category_tree.invalidate()
+
+
+@receiver(pre_save, sender=Article)
+def remember_article_category(sender, instance, update_fields=None, *args,
+                              **kwargs):
+    # The article counts in the category tree only change when an article
+    # moves to another category. Find out which one it was in before.
+    instance._previous_category_id = None
+
+    if update_fields is not None and not (
+            set(update_fields) & set(['category', 'category_id'])):
+        instance._previous_category_id = instance.category_id
+    elif instance.pk is not None:
+        instance._previous_category_id = Article.objects.filter(
+            pk=instance.pk
+        ).values_list('category_id', flat=True).first()
+
 
-        if len(slug) > MAXIMUM_SLUG_LENGTH:
-            slug = slug[:MAXIMUM_SLUG_LENGTH]
+@receiver(post_save, sender=Article)
+def count_article_in_category(sender, instance, *args, **kwargs):
+    previous = getattr(instance, '_previous_category_id', None)
 
-        while len(slug + '-' + unique) > MAXIMUM_SLUG_LENGTH:
-            parts = slug.split('-')
+    if instance.category_id != previous:
+        category_tree.invalidate()
 
-            if len(parts) is 1:
-                # The slug has no hypens. To append the unique string we must
-                # arbitrarly remove `len(unique)` characters from the end of
-                # `slug`. Subtract one to account for extra hyphen.
-                slug = slug[:MAXIMUM_SLUG_LENGTH - len(unique) - 1]
-            else:
-                slug = '-'.join(parts[:-1])
 
-        instance.slug = slug + '-' + unique
+@receiver(post_delete, sender=Article)
+def uncount_article_in_category(sender, instance, *args, **kwargs):
+    if instance.category_id is not None:
+        category_tree.invalidate()
@@ -0,0 +1,109 @@
+"""
+Allocates unique article slugs.
+
+A slug is the slugified title followed by a random six character suffix,
+so slugs can't be guessed from the title, and a title that is already used
+many times is no more likely to collide than a new one.
+
+Slugs are allocated for many articles at once. Each round checks the
+candidates of every article that still needs a slug in one query, and an
+article whose candidate is taken tries more candidates in the next round,
+twice as many each time.
+
+Candidates are checked, not reserved, so an article saved concurrently can
+still take a slug first. Inserting the second article then fails on the
+unique index, as it would for any other unique field.
+"""
+import string
+
+from django.utils.text import slugify
+
+from conduit.apps.core.utils import generate_random_string
+
+SUFFIX_CHARS = string.ascii_lowercase + string.digits
+SUFFIX_LENGTH = 6
+
+# The most candidates tried per article per round.
+MAX_CANDIDATES = 64
+
+# Checking more slugs than this in one query could run into the database's
+# limit on query parameters.
+QUERY_CHUNK_SIZE = 500
+
+
+def get_base(title, max_length):
+    """
+    Slugify `title` and shorten it so that a suffix still fits in
+    `max_length`, at a hyphen if possible.
+    """
+    slug = slugify(title)[:max_length]
+
+    while len(slug) + 1 + SUFFIX_LENGTH > max_length:
+        parts = slug.split('-')
+
+        if len(parts) == 1:
+            # The slug has no hyphens, so cut it off in the middle of a word.
+            slug = slug[:max_length - SUFFIX_LENGTH - 1]
+        else:
+            slug = '-'.join(parts[:-1])
+
+    return slug
+
+
+def get_candidate(base):
+    return '{}-{}'.format(
+        base, generate_random_string(SUFFIX_CHARS, SUFFIX_LENGTH)
+    )
+
+
+def _get_taken(queryset, slugs):
+    slugs = list(slugs)
+    taken = set()
+
+    for start in range(0, len(slugs), QUERY_CHUNK_SIZE):
+        taken.update(queryset.filter(
+            slug__in=slugs[start:start + QUERY_CHUNK_SIZE]
+        ).values_list('slug', flat=True))
+
+    return taken
+
+
+def allocate_slugs(queryset, titles):
+    """
+    Returns a slug for each of `titles`, in order, that is not used by any
+    row of `queryset` or by another of the returned slugs.
+    """
+    max_length = queryset.model._meta.get_field('slug').max_length
+    bases = [get_base(title, max_length) for title in titles]
+    slugs = [None] * len(bases)
+
+    pending = list(range(len(bases)))
+    width = 1
+
+    while pending:
+        candidates = {}
+
+        for index in pending:
+            candidates[index] = [
+                get_candidate(bases[index]) for _ in range(width)
+            ]
+
+        taken = _get_taken(queryset, (
+            slug for slugs_to_try in candidates.values()
+            for slug in slugs_to_try
+        ))
+
+        pending = []
+
+        for index, slugs_to_try in candidates.items():
+            for slug in slugs_to_try:
+                if slug not in taken:
+                    slugs[index] = slug
+                    taken.add(slug)
+                    break
+            else:
+                pending.append(index)
+
+        width = min(width * 2, MAX_CANDIDATES)
+
+    return slugs
@@ -0,0 +1,145 @@
+"""
+An in-memory directory of every tag with the number of articles using it.
+
+The tags endpoint is requested on every page load, so rather than reading
+the tag table each time, every process keeps the whole directory in memory,
+sorted by popularity, together with an index of the tags sorted by slug for
+prefix lookups.
+
+The directory is rebuilt the next time it is read after a tag changes or is
+added to or removed from an article. Each change also bumps a version in
+`ARTICLE_CACHE_ALIAS`. If that cache is shared, other processes see the new
+version and rebuild their copy too. A per-process cache such as the default
+LocMemCache only tells the process that made the change, so every copy is
+also rebuilt once it is `TAG_DIRECTORY_MAX_AGE` seconds old. Reading the
+directory costs one cache lookup and no queries while it is fresh.
+"""
+import bisect
+import threading
+import time
+
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+from conduit.apps.core.routers import use_primary
+from conduit.apps.core.utils import generate_random_string
+
+from .models import Tag
+
+VERSION_KEY = 'tags:directory:version'
+
+TagEntry = namedtuple('TagEntry', ('tag', 'slug', 'count'))
+
+
+def get_cache():
+    return caches[getattr(settings, 'ARTICLE_CACHE_ALIAS', 'default')]
+
+
+def _get_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+
+    if version is None:
+        version = generate_random_string(size=12)
+
+        if not cache.add(VERSION_KEY, version, None):
+            version = cache.get(VERSION_KEY)
+
+    return version
+
+
+class TagDirectory(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._built_at = None
+
+        # Every tag, most used first. Tags used by the same number of
+        # articles are sorted by name.
+        self._entries = []
+
+        # The slugs in alphabetical order, and the position in `_entries` of
+        # the tag each one belongs to.
+        self._slugs = []
+        self._ranks = []
+
+    def _build(self):
+        rows = Tag.objects.annotate(
+            article_count=Count('articles')
+        ).values_list('tag', 'slug', 'article_count')
+
+        entries = sorted(
+            (TagEntry(*row) for row in rows),
+            key=lambda entry: (-entry.count, entry.slug)
+        )
+        by_slug = sorted(
+            (entry.slug, rank) for rank, entry in enumerate(entries)
+        )
+
+        return (
+            entries,
+            [slug for slug, rank in by_slug],
+            [rank for slug, rank in by_slug],
+        )
+
+    def _is_fresh(self, version):
+        max_age = getattr(settings, 'TAG_DIRECTORY_MAX_AGE', 60)
+
+        if version != self._version:
+            return False
+
+        return max_age is None or time.time() - self._built_at < max_age
+
+    def _refresh(self):
+        version = _get_version()
+
+        if self._is_fresh(version):
+            return
+
+        with self._lock:
+            if self._is_fresh(version):
+                return
+
+            # Swap everything in at once, so that concurrent readers see
+            # either the old directory or the new one. Every process keeps
+            # what it builds for a while, so read it from the primary rather
+            # than a replica that may not have the latest changes.
+            with use_primary():
+                self._entries, self._slugs, self._ranks = self._build()
+            self._version = version
+            self._built_at = time.time()
+
+    def get_tags(self, prefix=None, limit=None):
+        """
+        Returns a list of `TagEntry`, most used first. If `prefix` is given,
+        only tags whose slug starts with it (ignoring case) are returned.
+        """
+        self._refresh()
+
+        entries = self._entries
+
+        if prefix:
+            prefix = prefix.lower()
+            slugs, ranks = self._slugs, self._ranks
+            start = bisect.bisect_left(slugs, prefix)
+            end = start
+
+            while end < len(slugs) and slugs[end].startswith(prefix):
+                end += 1
+
+            entries = [entries[rank] for rank in sorted(ranks[start:end])]
+
+        if limit is not None:
+            entries = entries[:limit]
+
+        return entries
+
+    def invalidate(self):
+        self._version = None
+        get_cache().set(VERSION_KEY, generate_random_string(size=12), None)
+
+
+tag_directory = TagDirectory()
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.articles import cache as article_cache
+from conduit.apps.articles.models import Article
+from conduit.apps.articles.serializers import ArticleSerializer
+from conduit.apps.authentication.models import User
+
+
+@override_settings(ARTICLE_REPRESENTATION_CACHE_ALIAS='default')
+class RepresentationCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        author = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        ).profile
+        self.article = Article.objects.create(
+            author=author, title='Title', description='Description',
+            body='Body'
+        )
+
+    def get_cached(self):
+        article = Article.objects.get(pk=self.article.pk)
+        cached, keys = article_cache.get_representations([article])
+
+        return cached.get(article.pk)
+
+    def test_representations_are_cached(self):
+        ArticleSerializer(self.article).data
+
+        self.assertEqual(self.get_cached()['title'], 'Title')
+        self.assertIsNone(self.get_cached()['favorited'])
+
+        self.article.title = 'New title'
+        self.article.save()
+
+        self.assertIsNone(self.get_cached())
+
+    def test_rows_loaded_before_a_change_are_not_cached(self):
+        # Loaded before someone else changed the title and its version.
+        stale = Article.objects.get(pk=self.article.pk)
+        Article.objects.filter(pk=self.article.pk).update(title='New title')
+        article_cache.invalidate_articles([self.article.pk])
+
+        self.assertEqual(ArticleSerializer(stale).data['title'], 'New title')
+        self.assertEqual(self.get_cached()['title'], 'New title')
+
+    def test_versions_change_again_on_commit(self):
+        callbacks = []
+
+        with mock.patch(
+            'django.db.transaction.on_commit', side_effect=callbacks.append
+        ):
+            self.article.title = 'New title'
+            self.article.save()
+
+        # Stored by another request that read the old row before the change
+        # was committed.
+        cached, keys = article_cache.get_representations([self.article])
+        article_cache.set_representations(keys, {
+            self.article.pk: {'title': 'Title', 'author': {}},
+        })
+        self.assertEqual(self.get_cached()['title'], 'Title')
+
+        for callback in callbacks:
+            callback()
+
+        self.assertIsNone(self.get_cached())
+
+    @override_settings(ARTICLE_REPRESENTATION_CACHE_ALIAS=None)
+    def test_nothing_is_cached_without_a_shared_cache(self):
+        cache.clear()
+        data = ArticleSerializer(self.article).data
+
+        self.assertEqual(data['title'], 'Title')
+        self.assertEqual(
+            article_cache.get_representations([self.article]), ({}, {})
+        )
+        self.assertIsNone(article_cache.get_stats())
+        self.assertIsNone(cache.get(
+            article_cache.ARTICLE_VERSION_KEY.format(self.article.pk)
+        ))
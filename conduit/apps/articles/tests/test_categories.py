@@ -0,0 +1,208 @@
+import time
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.articles import categories
+from conduit.apps.articles.categories import CategoryTree, category_tree
+from conduit.apps.articles.models import Article, Category
+from conduit.apps.authentication.models import User
+
+
+class CategoryPathTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        # books
+        # +- fiction
+        #    +- fantasy
+        # +- poetry
+        self.books = self.create('Books')
+        self.fiction = self.create('Fiction', self.books)
+        self.fantasy = self.create('Fantasy', self.fiction)
+        self.poetry = self.create('Poetry', self.books)
+
+    def create(self, name, parent=None):
+        return Category.objects.create(
+            name=name, slug=name.lower(), parent=parent
+        )
+
+    def get_path(self, category):
+        category.refresh_from_db()
+
+        return category.path, category.depth
+
+    def get_subtree(self, category):
+        category.refresh_from_db()
+
+        return sorted(Category.objects.filter(
+            path__startswith=category.path
+        ).values_list('slug', flat=True))
+
+    def test_paths_list_the_ancestors(self):
+        self.assertEqual(
+            self.get_path(self.fantasy),
+            ('{}/{}/{}/'.format(
+                self.books.pk, self.fiction.pk, self.fantasy.pk
+            ), 2)
+        )
+        self.assertEqual(
+            self.get_subtree(self.books),
+            ['books', 'fantasy', 'fiction', 'poetry']
+        )
+        self.assertEqual(
+            self.get_subtree(self.fiction), ['fantasy', 'fiction']
+        )
+
+    def test_moving_a_category_moves_its_descendants(self):
+        self.fiction.parent = self.poetry
+        self.fiction.save()
+
+        self.assertEqual(
+            self.get_path(self.fantasy),
+            ('{}/{}/{}/{}/'.format(
+                self.books.pk, self.poetry.pk, self.fiction.pk,
+                self.fantasy.pk
+            ), 3)
+        )
+        self.assertEqual(
+            self.get_subtree(self.poetry), ['fantasy', 'fiction', 'poetry']
+        )
+
+        self.fiction.parent = None
+        self.fiction.save()
+
+        self.assertEqual(
+            self.get_path(self.fantasy),
+            ('{}/{}/'.format(self.fiction.pk, self.fantasy.pk), 1)
+        )
+        self.assertEqual(self.get_subtree(self.books), ['books', 'poetry'])
+
+    def test_categories_can_not_be_moved_under_themselves(self):
+        for parent in (self.fiction, self.fantasy):
+            self.fiction.parent = parent
+
+            with self.assertRaises(ValidationError):
+                self.fiction.save()
+
+        self.assertEqual(
+            self.get_subtree(self.fiction), ['fantasy', 'fiction']
+        )
+
+    def test_rebuild_paths(self):
+        Category.objects.update(path='', depth=0)
+
+        self.assertEqual(categories.rebuild_paths(), 4)
+        self.assertEqual(self.get_path(self.fantasy)[1], 2)
+        self.assertEqual(
+            self.get_subtree(self.books),
+            ['books', 'fantasy', 'fiction', 'poetry']
+        )
+
+    def test_tree_counts_the_articles_of_subtrees(self):
+        author = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        ).profile
+
+        for category in (self.books, self.fiction, self.fantasy):
+            Article.objects.create(
+                author=author, title='Title', description='Description',
+                body='Body', category=category
+            )
+
+        books = category_tree.get_category('books')
+        fiction = category_tree.get_category('fiction')
+
+        self.assertEqual(
+            (books.article_count, books.subtree_article_count), (1, 3)
+        )
+        self.assertEqual(
+            (fiction.article_count, fiction.subtree_article_count), (1, 2)
+        )
+        self.assertEqual(
+            [node.slug for node in category_tree.get_children(self.books.pk)],
+            ['fiction', 'poetry']
+        )
+
+
+class CategoryTreeMaxAgeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        Category.objects.create(name='Fiction', slug='fiction')
+        self.tree = CategoryTree()
+
+    def get_slugs(self):
+        return [node.slug for node in self.tree.get_children()]
+
+    @override_settings(CATEGORY_TREE_MAX_AGE=60)
+    def test_copies_are_rebuilt_once_they_are_old(self):
+        self.assertEqual(self.get_slugs(), ['fiction'])
+
+        # Another process with its own cache: no signals reach this one.
+        Category.objects.bulk_create([
+            Category(name='Poetry', slug='poetry', path='', depth=0)
+        ])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_slugs(), ['fiction'])
+
+        with mock.patch('time.time', return_value=time.time() + 61):
+            self.assertEqual(self.get_slugs(), ['fiction', 'poetry'])
+
+
+class CategoryTreeInvalidationTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        ).profile
+        self.fiction = Category.objects.create(name='Fiction', slug='fiction')
+        self.poetry = Category.objects.create(name='Poetry', slug='poetry')
+
+        patcher = mock.patch.object(category_tree, 'invalidate')
+        self.invalidate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_article(self, category=None):
+        return Article.objects.create(
+            author=self.author, title='Title', description='Description',
+            body='Body', category=category
+        )
+
+    def test_articles_without_a_category_leave_the_tree_alone(self):
+        article = self.create_article()
+        article.body = 'New body'
+        article.save()
+        article.delete()
+
+        self.assertFalse(self.invalidate.called)
+
+    def test_editing_an_article_leaves_the_tree_alone(self):
+        article = self.create_article(self.fiction)
+        self.invalidate.reset_mock()
+
+        article.title = 'New title'
+        article.save()
+
+        self.assertFalse(self.invalidate.called)
+
+    def test_adding_moving_and_removing_articles_invalidates(self):
+        article = self.create_article(self.fiction)
+        self.assertEqual(self.invalidate.call_count, 1)
+
+        article.category = self.poetry
+        article.save()
+        self.assertEqual(self.invalidate.call_count, 2)
+
+        article.delete()
+        self.assertEqual(self.invalidate.call_count, 3)
+
+    def test_changing_a_category_invalidates(self):
+        self.fiction.name = 'Novels'
+        self.fiction.save()
+
+        self.assertEqual(self.invalidate.call_count, 1)
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.articles import counters, views
+from conduit.apps.articles.models import Article
+from conduit.apps.authentication.models import User
+
+
+@override_settings(ARTICLE_VIEW_FLUSH_INTERVAL=0)
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        self.counter = counters.ViewCounter()
+        author = User.objects.create_user(
+            'author', 'author@example.com', 'password'
+        ).profile
+        self.article = Article.objects.create(
+            author=author, title='Title', description='Description',
+            body='Body'
+        )
+
+    def get_view_count(self):
+        self.article.refresh_from_db()
+
+        return self.article.view_count
+
+    def test_views_are_written(self):
+        self.counter.record(self.article.pk)
+        self.counter.record(self.article.pk)
+
+        self.assertEqual(self.get_view_count(), 2)
+
+    def test_a_failed_write_keeps_the_views(self):
+        with mock.patch.object(
+            counters, 'write_view_counts',
+            side_effect=OperationalError('database is locked')
+        ), self.assertLogs(counters.logger):
+            self.counter.record(self.article.pk)
+
+        self.assertEqual(self.get_view_count(), 0)
+
+        self.counter.record(self.article.pk)
+
+        self.assertEqual(self.get_view_count(), 2)
+
+    def test_a_failed_write_does_not_fail_the_request(self):
+        with mock.patch.object(
+            counters, 'write_view_counts',
+            side_effect=OperationalError('database is locked')
+        ), mock.patch.object(views, 'view_counter', self.counter), \
+                self.assertLogs(counters.logger):
+            response = self.client.get(
+                '/api/articles/{}'.format(self.article.slug)
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ARTICLE_VIEW_FLUSH_INTERVAL=3600)
+    def test_views_are_not_written_to_another_database(self):
+        self.counter.record(self.article.pk)
+
+        # What the test runner does once the tests are done.
+        with mock.patch.object(
+            counters, 'get_database_name', return_value='db.sqlite3'
+        ), mock.patch.object(counters, 'write_view_counts') as write, \
+                self.assertLogs(counters.logger, 'WARNING'):
+            self.counter.flush()
+
+        self.assertFalse(write.called)
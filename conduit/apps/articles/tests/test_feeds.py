@@ -0,0 +1,181 @@
+import io
+import json
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from conduit.apps.articles.feeds import Follow
+from conduit.apps.articles.models import Article, FeedEntry
+from conduit.apps.authentication.models import User
+
+
+@override_settings(FEED_FANOUT_MAX_FOLLOWERS=2)
+class FeedTests(TestCase):
+    def setUp(self):
+        # The set of authors read on demand is cached.
+        cache.clear()
+
+        self.author = self.create_profile('author')
+        self.bob = self.create_profile('bob')
+        self.carol = self.create_profile('carol')
+
+    def create_profile(self, username):
+        return User.objects.create_user(
+            username, '{}@example.com'.format(username), 'password'
+        ).profile
+
+    def publish(self, title, author=None):
+        return Article.objects.create(
+            author=author or self.author, title=title,
+            description='Description', body='Body'
+        )
+
+    def get_feed(self, profile):
+        response = self.client.get(
+            '/api/articles/feed',
+            HTTP_AUTHORIZATION='Token {}'.format(profile.user.token)
+        )
+        self.assertEqual(response.status_code, 200)
+
+        return [
+            article['title']
+            for article in json.loads(response.content.decode())['articles']
+        ]
+
+    def get_entries(self, profile):
+        return sorted(FeedEntry.objects.filter(owner=profile).values_list(
+            'article__title', flat=True
+        ))
+
+    def test_publishing_fans_out_to_followers(self):
+        self.bob.follow(self.author)
+        self.publish('First')
+        self.publish('Second')
+
+        self.assertEqual(self.get_entries(self.bob), ['First', 'Second'])
+        self.assertEqual(self.get_entries(self.carol), [])
+        self.assertEqual(self.get_feed(self.bob), ['Second', 'First'])
+
+    def test_following_backfills_and_unfollowing_removes(self):
+        self.publish('First')
+
+        self.bob.follow(self.author)
+        self.assertEqual(self.get_feed(self.bob), ['First'])
+
+        self.bob.unfollow(self.author)
+        self.assertEqual(self.get_feed(self.bob), [])
+        self.assertEqual(self.get_entries(self.bob), [])
+
+    def test_popular_authors_are_read_on_demand(self):
+        self.bob.follow(self.author)
+        self.carol.follow(self.author)
+        self.publish('Popular')
+
+        self.assertEqual(self.get_entries(self.bob), [])
+        self.assertEqual(self.get_feed(self.bob), ['Popular'])
+        self.assertEqual(self.get_feed(self.carol), ['Popular'])
+
+    def test_feeds_merge_pushed_and_pulled_articles(self):
+        other = self.create_profile('other')
+        self.bob.follow(self.author)
+        self.carol.follow(self.author)
+        self.bob.follow(other)
+
+        self.publish('Pulled')
+        self.publish('Pushed', author=other)
+
+        self.assertEqual(self.get_feed(self.bob), ['Pushed', 'Pulled'])
+
+    def test_dropping_below_the_threshold_restores_fan_out(self):
+        self.bob.follow(self.author)
+        self.carol.follow(self.author)
+        self.publish('While popular')
+        self.assertEqual(self.get_feed(self.bob), ['While popular'])
+
+        self.carol.unfollow(self.author)
+        self.publish('Afterwards')
+
+        self.assertEqual(
+            self.get_entries(self.bob), ['Afterwards', 'While popular']
+        )
+        self.assertEqual(
+            self.get_feed(self.bob), ['Afterwards', 'While popular']
+        )
+
+    def test_followers_stay_unloaded_above_the_threshold(self):
+        dave = self.create_profile('dave')
+
+        for profile in (self.bob, self.carol, dave):
+            profile.follow(self.author)
+
+        self.publish('Popular')
+
+        with CaptureQueriesContext(connection) as queries:
+            dave.unfollow(self.author)
+
+        # Only counted, never listed.
+        follower_column = '"{}"."from_profile_id"'.format(
+            Follow._meta.db_table
+        )
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith('SELECT ' + follower_column)
+        ])
+        self.assertEqual(self.get_feed(self.bob), ['Popular'])
+
+    def test_raising_the_threshold_keeps_pulled_articles(self):
+        self.bob.follow(self.author)
+        self.carol.follow(self.author)
+        self.publish('While popular')
+
+        with override_settings(FEED_FANOUT_MAX_FOLLOWERS=10):
+            self.assertEqual(self.get_feed(self.bob), ['While popular'])
+
+            self.publish('Afterwards')
+
+            self.assertEqual(
+                self.get_entries(self.carol), ['Afterwards', 'While popular']
+            )
+            self.assertEqual(
+                self.get_feed(self.bob), ['Afterwards', 'While popular']
+            )
+
+    def test_following_a_popular_author_copies_older_articles(self):
+        self.publish('Before')
+        self.bob.follow(self.author)
+        self.carol.follow(self.author)
+        self.publish('While popular')
+
+        dave = self.create_profile('dave')
+        dave.follow(self.author)
+        self.carol.unfollow(self.author)
+        self.bob.unfollow(self.author)
+
+        self.assertEqual(
+            self.get_entries(dave), ['Before', 'While popular']
+        )
+
+    def test_losing_every_follower_at_once_restores_fan_out(self):
+        self.bob.follow(self.author)
+        self.carol.follow(self.author)
+        self.publish('While popular')
+
+        self.carol.follows.clear()
+
+        self.assertEqual(self.get_entries(self.bob), ['While popular'])
+
+    def test_rebuild_feeds(self):
+        other = self.create_profile('other')
+        self.bob.follow(self.author)
+        self.bob.follow(other)
+        self.publish('First')
+        self.publish('Second', author=other)
+
+        FeedEntry.objects.all().delete()
+        call_command('rebuild_feeds', 'bob', stdout=io.StringIO())
+
+        self.assertEqual(self.get_entries(self.bob), ['First', 'Second'])
+        self.assertEqual(self.get_feed(self.bob), ['Second', 'First'])
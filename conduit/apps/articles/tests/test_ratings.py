@@ -0,0 +1,118 @@
+import json
+
+from django.test import TestCase
+
+from conduit.apps.articles.models import (
+    Article, ArticleRating, ArticleRatingAggregate
+)
+from conduit.apps.articles.ratings import compute_aggregates
+from conduit.apps.authentication.models import User
+
+FIELDS = (
+    'rating_count', 'rating_sum', 'score_1_count', 'score_2_count',
+    'score_3_count', 'score_4_count', 'score_5_count',
+)
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.profiles = [
+            User.objects.create_user(
+                'user{}'.format(number), 'user{}@example.com'.format(number),
+                'password'
+            ).profile
+            for number in range(6)
+        ]
+        self.article = self.create_article('Title')
+
+    def create_article(self, title):
+        return Article.objects.create(
+            author=self.profiles[0], title=title, description='Description',
+            body='Body'
+        )
+
+    def rate(self, article, scores):
+        return [
+            ArticleRating.objects.create(
+                article=article, profile=profile, score=score
+            )
+            for profile, score in zip(self.profiles, scores)
+        ]
+
+    def get_values(self, aggregate):
+        values = dict((field, getattr(aggregate, field)) for field in FIELDS)
+        values['bayesian_score'] = round(aggregate.bayesian_score, 6)
+
+        return values
+
+    def assertMatchesRatings(self, article):
+        """The stored aggregate equals one computed from scratch."""
+        computed = compute_aggregates([article.pk])
+
+        if not computed:
+            self.assertFalse(ArticleRatingAggregate.objects.filter(
+                article=article, rating_count__gt=0
+            ).exists())
+            return
+
+        stored = ArticleRatingAggregate.objects.get(article=article)
+
+        self.assertEqual(
+            self.get_values(stored), self.get_values(computed[0])
+        )
+
+    def test_creating_ratings(self):
+        self.rate(self.article, [5, 4, 4, 1])
+
+        self.assertMatchesRatings(self.article)
+
+    def test_changing_ratings(self):
+        ratings = self.rate(self.article, [5, 4, 4, 1])
+
+        ratings[1].score = 2
+        ratings[1].save()
+        # Saving without a change adds nothing.
+        ratings[2].save()
+
+        self.assertMatchesRatings(self.article)
+
+    def test_deleting_ratings(self):
+        ratings = self.rate(self.article, [5, 4, 1])
+
+        ratings[0].delete()
+        self.assertMatchesRatings(self.article)
+
+        ratings[1].delete()
+        ratings[2].delete()
+        self.assertMatchesRatings(self.article)
+
+    def test_deleting_the_article(self):
+        self.rate(self.article, [5, 4])
+        self.article.delete()
+
+        self.assertFalse(ArticleRatingAggregate.objects.exists())
+
+    def test_top_rated(self):
+        # One 5 is outranked by many 4s, because of the prior.
+        lone = self.create_article('Lone')
+        popular = self.create_article('Popular')
+        poor = self.create_article('Poor')
+        self.create_article('Unrated')
+
+        self.rate(lone, [5])
+        self.rate(popular, [4, 4, 4, 4, 5, 4])
+        self.rate(poor, [1, 2])
+
+        response = self.client.get('/api/articles/top-rated')
+        articles = json.loads(response.content.decode())['articles']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [article['title'] for article in articles],
+            ['Popular', 'Lone', 'Poor']
+        )
+        self.assertEqual(articles[0]['rating']['count'], 6)
+        self.assertEqual(
+            articles[0]['rating']['histogram'],
+            {'1': 0, '2': 0, '3': 0, '4': 5, '5': 1}
+        )
@@ -0,0 +1,151 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.articles.models import Article, ArticleRevision
+from conduit.apps.articles.revisions import (
+    get_revision, get_stored_size, record_revision
+)
+from conduit.apps.authentication.models import User
+
+
+def get_body(version):
+    # Every version changes one of many lines, so deltas are small.
+    lines = ['Line {}\n'.format(number) for number in range(50)]
+    lines[version % 50] = 'Changed in version {}\n'.format(version)
+
+    return ''.join(lines)
+
+
+@override_settings(ARTICLE_REVISION_SNAPSHOT_INTERVAL=5)
+class RevisionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        author = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        ).profile
+        self.article = Article.objects.create(
+            author=author, title='Title', description='Description',
+            body=get_body(1)
+        )
+
+    def edit(self, version):
+        self.article.title = 'Title {}'.format(version)
+        self.article.body = get_body(version)
+        self.article.save()
+
+        return record_revision(self.article)
+
+    def get_expected(self, version):
+        return {
+            'title': 'Title {}'.format(version),
+            'description': 'Description',
+            'body': get_body(version),
+        }
+
+    def get_snapshots(self):
+        return list(ArticleRevision.objects.filter(
+            article=self.article, is_snapshot=True
+        ).order_by('version_number').values_list(
+            'version_number', flat=True
+        ))
+
+    def assertVersions(self, versions):
+        # Rebuild every version from the database, not from the cache.
+        cache.clear()
+
+        for version in versions:
+            self.assertEqual(
+                get_revision(self.article.pk, version),
+                self.get_expected(version)
+            )
+
+    def test_versions_round_trip_through_delta_chains(self):
+        for version in range(1, 13):
+            self.edit(version)
+
+        self.assertEqual(self.get_snapshots(), [1, 6, 11])
+        self.assertVersions(range(1, 13))
+
+    def test_deltas_are_smaller_than_snapshots(self):
+        first = self.edit(1)
+        second = self.edit(2)
+
+        self.assertFalse(second.is_snapshot)
+        self.assertEqual(second.body, '')
+        self.assertLess(get_stored_size(second), get_stored_size(first) / 4)
+
+    def test_unchanged_articles_record_no_version(self):
+        self.edit(1)
+
+        self.assertIsNone(record_revision(self.article))
+        self.assertEqual(self.article.revisions.count(), 1)
+
+    def test_missing_versions(self):
+        self.edit(1)
+
+        with self.assertRaises(ArticleRevision.DoesNotExist):
+            get_revision(self.article.pk, 2)
+
+    def test_restoring_an_old_version(self):
+        for version in range(1, 9):
+            self.edit(version)
+
+        cache.clear()
+        old = get_revision(self.article.pk, 3)
+
+        for field, value in old.items():
+            setattr(self.article, field, value)
+
+        self.article.save()
+        restored = record_revision(self.article)
+
+        self.assertEqual(restored.version_number, 9)
+        self.assertEqual(get_revision(self.article.pk, 9), old)
+        self.assertVersions(range(1, 9))
+
+    def test_compress_article_revisions(self):
+        # Revisions stored before deltas existed are all snapshots.
+        for version in range(1, 13):
+            content = self.get_expected(version)
+            ArticleRevision.objects.create(
+                article=self.article, version_number=version, **content
+            )
+
+        stdout = io.StringIO()
+        call_command('compress_article_revisions', '--dry-run', stdout=stdout)
+
+        self.assertIn('Dry run', stdout.getvalue())
+        self.assertEqual(len(self.get_snapshots()), 12)
+
+        sizes = [
+            get_stored_size(revision)
+            for revision in self.article.revisions.all()
+        ]
+        call_command('compress_article_revisions', stdout=io.StringIO())
+        compressed = [
+            get_stored_size(revision)
+            for revision in self.article.revisions.all()
+        ]
+
+        self.assertEqual(self.get_snapshots(), [1, 6, 11])
+        self.assertLess(sum(compressed), sum(sizes) / 2)
+        self.assertVersions(range(1, 13))
+
+        # New versions carry on from the compressed chain.
+        self.edit(13)
+        self.assertVersions(range(1, 14))
+
+    def test_compressing_again_follows_a_new_interval(self):
+        for version in range(1, 13):
+            self.edit(version)
+
+        with override_settings(ARTICLE_REVISION_SNAPSHOT_INTERVAL=4):
+            call_command('compress_article_revisions', stdout=io.StringIO())
+
+        self.assertEqual(self.get_snapshots(), [1, 5, 9])
+        self.assertVersions(range(1, 13))
@@ -0,0 +1,96 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.articles.models import Article
+from conduit.apps.articles.search import SQLiteFTS5SearchBackend
+from conduit.apps.authentication.models import User
+
+
+class SQLiteFTS5SearchTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        ).profile
+        self.backend = SQLiteFTS5SearchBackend()
+
+        self.in_body = self.create(
+            'Training', 'How to train', 'Feed your dragons every day.'
+        )
+        self.in_title = self.create(
+            'Dragons', 'All about them', 'They breathe fire.'
+        )
+        self.create('Unicorns', 'Not dragons', 'Horns, mostly.')
+
+    def create(self, title, description, body):
+        return Article.objects.create(
+            author=self.author, title=title, description=description,
+            body=body
+        )
+
+    def search(self, query, offset=0, limit=10):
+        return self.backend.search(query, offset, limit)
+
+    def test_matches_are_ranked_title_first(self):
+        ids, count = self.search('dragons')
+
+        self.assertEqual(count, 3)
+        self.assertEqual(ids[0], self.in_title.pk)
+        self.assertEqual(ids[-1], self.in_body.pk)
+
+    def test_every_word_has_to_match(self):
+        self.assertEqual(self.search('dragons fire'), ([self.in_title.pk], 1))
+        self.assertEqual(self.search('dragons wings'), ([], 0))
+
+    def test_pages_count_every_match(self):
+        ids, count = self.search('dragons', offset=1, limit=1)
+
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(count, 3)
+
+    def test_changed_articles_are_indexed_again(self):
+        self.in_title.title = 'Wyverns'
+        self.in_title.body = 'They fly.'
+        self.in_title.save()
+
+        self.assertEqual(self.search('wyverns'), ([self.in_title.pk], 1))
+        self.assertEqual(self.search('fire'), ([], 0))
+
+    def test_deleted_articles_are_removed(self):
+        self.in_title.delete()
+
+        self.assertEqual(self.search('fire'), ([], 0))
+        self.assertNotIn(self.in_title.pk, self.search('dragons')[0])
+
+    def test_punctuation_is_not_query_syntax(self):
+        self.assertEqual(self.search('?!*-"'), ([], 0))
+        self.assertEqual(self.search(''), ([], 0))
+        self.assertEqual(self.search('-"fire*)('), ([self.in_title.pk], 1))
+
+    def test_rebuild_search_index(self):
+        self.backend.clear()
+        self.assertEqual(self.search('dragons'), ([], 0))
+
+        call_command(
+            'rebuild_search_index', chunk_size=2, stdout=io.StringIO()
+        )
+
+        self.assertEqual(self.search('dragons')[1], 3)
+
+    def test_search_endpoint(self):
+        with override_settings(ARTICLE_SEARCH_BACKEND=(
+            'conduit.apps.articles.search.SQLiteFTS5SearchBackend'
+        )):
+            response = self.client.get('/api/articles/search?q=fire')
+
+        data = json.loads(response.content.decode())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['articlesCount'], 1)
+        self.assertEqual(
+            [article['title'] for article in data['articles']], ['Dragons']
+        )
+
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from conduit.apps.articles import slugs
+from conduit.apps.articles.models import Article
+from conduit.apps.authentication.models import User
+
+
+class AllocateSlugsTests(TestCase):
+    def allocate(self, titles, suffixes):
+        with mock.patch.object(
+            slugs, 'generate_random_string', side_effect=suffixes
+        ):
+            return slugs.allocate_slugs(Article.objects.all(), titles)
+
+    def test_slugs_are_the_title_and_a_random_suffix(self):
+        allocated = slugs.allocate_slugs(
+            Article.objects.all(), ['Hello World', 'Hello World']
+        )
+
+        self.assertEqual(len(set(allocated)), 2)
+
+        for slug in allocated:
+            self.assertRegex(slug, r'^hello-world-[a-z0-9]{6}$')
+
+    def test_collisions_within_a_batch(self):
+        with self.assertNumQueries(2):
+            allocated = self.allocate(
+                ['Title', 'Title', 'Other'],
+                ['aaaaaa', 'aaaaaa', 'aaaaaa', 'bbbbbb', 'cccccc']
+            )
+
+        self.assertEqual(
+            allocated, ['title-aaaaaa', 'title-bbbbbb', 'other-aaaaaa']
+        )
+
+    def test_collisions_with_existing_slugs(self):
+        author = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        ).profile
+        Article.objects.create(
+            author=author, slug='title-aaaaaa', title='Title',
+            description='Description', body='Body'
+        )
+
+        with self.assertNumQueries(2):
+            allocated = self.allocate(
+                ['Title'], ['aaaaaa', 'aaaaaa', 'bbbbbb']
+            )
+
+        self.assertEqual(allocated, ['title-bbbbbb'])
+
+    def test_long_titles_leave_room_for_the_suffix(self):
+        slug, = slugs.allocate_slugs(Article.objects.all(), ['word ' * 100])
+
+        self.assertLessEqual(len(slug), 255)
+        self.assertRegex(slug, r'^word(-word)*-[a-z0-9]{6}$')
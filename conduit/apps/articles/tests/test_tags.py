@@ -0,0 +1,118 @@
+import time
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.articles.models import Tag
+from conduit.apps.articles.tags import TagDirectory
+
+
+class TagDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        Tag.objects.create(tag='Dragons', slug='dragons')
+        self.directory = TagDirectory()
+
+    def get_slugs(self):
+        return [entry.slug for entry in self.directory.get_tags()]
+
+    def add_tag_elsewhere(self):
+        # Another process with its own cache: no signals reach this one.
+        Tag.objects.bulk_create([Tag(tag='Drama', slug='drama')])
+
+    def test_changes_are_seen_straight_away(self):
+        self.assertEqual(self.get_slugs(), ['dragons'])
+
+        Tag.objects.create(tag='Drama', slug='drama')
+
+        self.assertEqual(self.get_slugs(), ['dragons', 'drama'])
+        self.assertEqual(
+            [entry.slug for entry in self.directory.get_tags('DRAG')],
+            ['dragons']
+        )
+
+    @override_settings(TAG_DIRECTORY_MAX_AGE=60)
+    def test_copies_are_rebuilt_once_they_are_old(self):
+        self.assertEqual(self.get_slugs(), ['dragons'])
+        self.add_tag_elsewhere()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_slugs(), ['dragons'])
+
+        with mock.patch('time.time', return_value=time.time() + 61):
+            self.assertEqual(self.get_slugs(), ['dragons', 'drama'])
+
+    @override_settings(TAG_DIRECTORY_MAX_AGE=None)
+    def test_copies_can_be_kept_until_the_next_change(self):
+        self.assertEqual(self.get_slugs(), ['dragons'])
+        self.add_tag_elsewhere()
+
+        with mock.patch('time.time', return_value=time.time() + 3600):
+            self.assertEqual(self.get_slugs(), ['dragons'])
+
+
+class GetOrCreateManyTests(TestCase):
+    def get_names(self, tags):
+        return [(tag.tag, tag.slug) for tag in tags]
+
+    def test_names_are_matched_ignoring_case(self):
+        Tag.objects.create(tag='Python', slug='python')
+
+        tags = Tag.objects.get_or_create_many(
+            ['Django', 'PYTHON', 'django', 'DJANGO', 'python']
+        )
+
+        # The first spelling of a new tag is kept, and existing tags keep
+        # theirs.
+        self.assertEqual(
+            self.get_names(tags), [('Django', 'django'), ('Python', 'python')]
+        )
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_existing_tags_take_one_query(self):
+        Tag.objects.create(tag='Django', slug='django')
+        Tag.objects.create(tag='Python', slug='python')
+
+        with self.assertNumQueries(1):
+            tags = Tag.objects.get_or_create_many(['python', 'Django'])
+
+        self.assertEqual(
+            self.get_names(tags), [('Python', 'python'), ('Django', 'django')]
+        )
+
+    def test_tags_created_by_someone_else_in_the_meantime(self):
+        find = Tag.objects.filter
+        calls = []
+
+        def look_up(**kwargs):
+            tags = list(find(**kwargs))
+
+            # Another request creates one of the tags after we looked.
+            if not calls:
+                Tag.objects.create(tag='PYTHON', slug='python')
+
+            calls.append(kwargs)
+            return tags
+
+        with mock.patch.object(Tag.objects, 'filter', side_effect=look_up):
+            with mock.patch.object(
+                Tag.objects, 'bulk_create', wraps=Tag.objects.bulk_create
+            ) as bulk_create:
+                tags = Tag.objects.get_or_create_many(
+                    ['Django', 'Python', 'Flask']
+                )
+
+        # The insert failed on the new tag, and the rest were created one
+        # by one.
+        self.assertEqual(bulk_create.call_count, 1)
+        self.assertEqual(self.get_names(tags), [
+            ('Django', 'django'), ('PYTHON', 'python'), ('Flask', 'flask'),
+        ])
+        self.assertEqual(Tag.objects.count(), 3)
+
+    def test_no_names(self):
+        self.assertEqual(Tag.objects.get_or_create_many([]), [])
@@ -0,0 +1,121 @@
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from conduit.apps.articles.models import Article, Comment, Tag
+from conduit.apps.authentication.models import User
+from conduit.apps.profiles.models import ProfileStatistics
+
+
+class TransferTests(TestCase):
+    def setUp(self):
+        self.jake = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        ).profile
+        self.jake.bio = 'Writes about dragons'
+        self.jake.save()
+        self.jane = User.objects.create_user(
+            'jane', 'jane@jane.jane', 'password'
+        ).profile
+
+        for number in range(3):
+            article = Article.objects.create(
+                author=self.jake, title='Title {}'.format(number),
+                description='Description', body='Line\nbody ü'
+            )
+            article.tags.add(*Tag.objects.get_or_create_many(
+                ['Dragons', 'Number {}'.format(number)]
+            ))
+            comment = Comment.objects.create(
+                article=article, author=self.jane, body='Nice'
+            )
+            reply = Comment.objects.create(
+                article=article, author=self.jake, body='Thanks',
+                parent=comment
+            )
+            Comment.objects.create(
+                article=article, author=self.jane, body='Welcome',
+                parent=reply
+            )
+
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, 'articles.jsonl')
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.remove, self.path)
+
+    def get_articles(self):
+        return [
+            {
+                'slug': article.slug,
+                'author': article.author.user.username,
+                'body': article.body,
+                'createdAt': article.created_at,
+                'updatedAt': article.updated_at,
+                'tags': sorted(article.tags.values_list('tag', flat=True)),
+                'comments': [
+                    (
+                        comment.author.user.username, comment.body,
+                        comment.parent.body if comment.parent else None,
+                        comment.created_at,
+                    )
+                    for comment in article.comments.order_by('pk')
+                ],
+            }
+            for article in Article.objects.order_by('created_at')
+        ]
+
+    def export(self):
+        call_command(
+            'export_articles', output=self.path, chunk_size=2,
+            stderr=io.StringIO()
+        )
+
+    def import_(self):
+        call_command(
+            'import_articles', self.path, batch_size=2, stdout=io.StringIO()
+        )
+
+    def test_round_trip_into_an_empty_database(self):
+        before = self.get_articles()
+        self.export()
+
+        User.objects.all().delete()
+        Tag.objects.all().delete()
+        self.assertFalse(Article.objects.exists())
+
+        self.import_()
+
+        self.assertEqual(self.get_articles(), before)
+
+        jake = User.objects.get(username='jake')
+        self.assertEqual(jake.email, 'jake@jake.jake')
+        self.assertEqual(jake.profile.bio, 'Writes about dragons')
+        self.assertFalse(jake.has_usable_password())
+        self.assertEqual(
+            ProfileStatistics.objects.get(profile=jake.profile).total_articles,
+            3
+        )
+
+    def test_existing_authors_are_reused(self):
+        self.export()
+        Article.objects.all().delete()
+
+        self.import_()
+
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(
+            Article.objects.filter(author=self.jake).count(), 3
+        )
+
+    def test_authors_whose_email_is_taken_are_skipped(self):
+        self.export()
+        User.objects.all().delete()
+        User.objects.create_user('jake2', 'jake@jake.jake', 'password')
+
+        self.import_()
+
+        self.assertFalse(Article.objects.exists())
+        self.assertFalse(User.objects.filter(username='jake').exists())
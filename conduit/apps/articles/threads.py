@@ -0,0 +1,101 @@
+"""
+Builds comment threads from `Comment.parent`.
+
+Rather than following `parent` one comment at a time, the id and parent id
+of every comment on the article are loaded in one query and the tree is put
+together in memory in a single pass. Only the comments that end up on the
+page are then loaded in full.
+"""
+from collections import defaultdict
+
+
+class CommentTree(object):
+    def __init__(self, rows):
+        """
+        `rows` are `(id, parent_id)` pairs, oldest comment first. Comments
+        whose parent is missing are treated as roots.
+        """
+        rows = list(rows)
+        ids = set(pk for pk, parent_id in rows)
+
+        self.roots = []
+        self.children = defaultdict(list)
+
+        for pk, parent_id in rows:
+            if parent_id is None or parent_id not in ids:
+                self.roots.append(pk)
+            else:
+                self.children[parent_id].append(pk)
+
+        self.reply_counts = self._count_replies()
+
+    def _count_replies(self):
+        # Walk the tree from the roots, then go through the comments in
+        # reverse so that every comment is counted after all of its replies.
+        # This avoids recursion, so threads can be arbitrarily deep.
+        order = []
+        stack = list(self.roots)
+
+        while stack:
+            pk = stack.pop()
+            order.append(pk)
+            stack.extend(self.children.get(pk, ()))
+
+        counts = {}
+
+        for pk in reversed(order):
+            counts[pk] = sum(
+                1 + counts[child] for child in self.children.get(pk, ())
+            )
+
+        return counts
+
+    def select(self, root_ids, preview_size=None, max_depth=None):
+        """
+        Returns a dict of comment id to the ids of the replies to show under
+        it, for the threads starting at `root_ids`. At most `preview_size`
+        replies are shown per comment (all of them if it is `None`), and no
+        replies more than `max_depth` levels below the root.
+        """
+        shown = {}
+        stack = [(pk, 0) for pk in root_ids]
+
+        while stack:
+            pk, depth = stack.pop()
+            replies = self.children.get(pk, [])
+
+            if max_depth is not None and depth >= max_depth:
+                replies = []
+            elif preview_size is not None:
+                replies = replies[:preview_size]
+
+            shown[pk] = replies
+            stack.extend((reply, depth + 1) for reply in replies)
+
+        return shown
+
+
+def get_comment_tree(comments):
+    """Returns the `CommentTree` of the `comments` queryset in one query."""
+    return CommentTree(
+        comments.order_by('created_at', 'pk').values_list('pk', 'parent_id')
+    )
+
+
+def nest_comments(shown, representations, reply_counts):
+    """
+    Put serialized comments together into threads. `shown` is the result of
+    `CommentTree.select` and `representations` maps every comment id in it
+    to its serialized form. Returns a dict of comment id to its thread: its
+    representation with `replyCount` and `replies` added.
+    """
+    threads = {}
+
+    for pk in shown:
+        threads[pk] = dict(representations[pk])
+        threads[pk]['replyCount'] = reply_counts[pk]
+
+    for pk, replies in shown.items():
+        threads[pk]['replies'] = [threads[reply] for reply in replies]
+
+    return threads
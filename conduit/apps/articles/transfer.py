@@ -0,0 +1,448 @@
+"""
+Moves articles between databases as JSON Lines.
+
+Every line holds one article, with its author and category referred to by
+username and slug, its tags by name, and its comments inline:
+
+    {"slug": "...", "title": "...", "description": "...", "body": "...",
+     "author": "jake", "category": "python", "tags": ["django"],
+     "isPublished": true, "featured": false, "viewCount": 0,
+     "createdAt": "...", "updatedAt": "...",
+     "comments": [{"id": 1, "parent": null, "author": "jane", "body": "...",
+                   "isEdited": false, "createdAt": "...", "updatedAt": "..."}],
+     "authors": [{"username": "jake", "email": "...", "bio": "...",
+                  "image": "..."}, ...]}
+
+Comment ids are only used to link replies to their parents within the same
+article; imported comments get new ones.
+
+`authors` lists the users that wrote the article or one of its comments, so
+that an import into an empty database can create them. Passwords are not
+exported: users created by an import have to reset theirs.
+
+Both directions work through the articles a chunk at a time, so memory use
+depends on the chunk size rather than on the size of the tables.
+"""
+from collections import Counter, defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Case, DateTimeField, IntegerField, Value, When
+from django.utils.dateparse import parse_datetime
+
+from conduit.apps.authentication.models import User
+from conduit.apps.profiles.models import Profile, ProfileStatistics
+from conduit.apps.profiles.statistics import rebuild_statistics
+
+from .models import Article, Category, Comment, Tag
+from .search import get_search_backend
+
+ARTICLE_FIELDS = (
+    'pk', 'slug', 'title', 'description', 'body', 'author__user__username',
+    'category__slug', 'is_published', 'featured', 'view_count', 'created_at',
+    'updated_at',
+)
+
+COMMENT_FIELDS = (
+    'pk', 'article_id', 'parent_id', 'author__user__username', 'body',
+    'is_edited', 'created_at', 'updated_at',
+)
+
+AUTHOR_FIELDS = ('user__username', 'user__email', 'bio', 'image')
+
+# Rows per UPDATE when restoring timestamps and comment parents. Each row
+# adds a few query parameters, and SQLite allows at most 999.
+UPDATE_CHUNK_SIZE = 100
+
+
+def _format_datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+def iter_article_records(chunk_size=500):
+    """Yields every article as a dict in the format described above."""
+    articles = Article.objects.order_by('pk').values(*ARTICLE_FIELDS)
+    last_pk = 0
+
+    while True:
+        chunk = list(articles.filter(pk__gt=last_pk)[:chunk_size].iterator())
+
+        if not chunk:
+            return
+
+        article_ids = [row['pk'] for row in chunk]
+        tags = defaultdict(list)
+        comments = defaultdict(list)
+
+        links = Article.tags.through.objects.filter(
+            article_id__in=article_ids
+        ).order_by('pk').values_list('article_id', 'tag__tag')
+
+        for article_id, tag in links.iterator():
+            tags[article_id].append(tag)
+
+        rows = Comment.objects.filter(
+            article_id__in=article_ids
+        ).order_by('pk').values(*COMMENT_FIELDS)
+
+        for row in rows.iterator():
+            comments[row['article_id']].append({
+                'id': row['pk'],
+                'parent': row['parent_id'],
+                'author': row['author__user__username'],
+                'body': row['body'],
+                'isEdited': row['is_edited'],
+                'createdAt': _format_datetime(row['created_at']),
+                'updatedAt': _format_datetime(row['updated_at']),
+            })
+
+        usernames = set(row['author__user__username'] for row in chunk)
+        usernames.update(
+            comment['author']
+            for article_comments in comments.values()
+            for comment in article_comments
+        )
+        authors = dict(
+            (row['user__username'], {
+                'username': row['user__username'],
+                'email': row['user__email'],
+                'bio': row['bio'],
+                'image': row['image'],
+            })
+            for row in Profile.objects.filter(
+                user__username__in=usernames
+            ).values(*AUTHOR_FIELDS).iterator()
+        )
+
+        for row in chunk:
+            article_usernames = set([row['author__user__username']])
+            article_usernames.update(
+                comment['author'] for comment in comments[row['pk']]
+            )
+
+            yield {
+                'slug': row['slug'],
+                'title': row['title'],
+                'description': row['description'],
+                'body': row['body'],
+                'author': row['author__user__username'],
+                'category': row['category__slug'],
+                'tags': tags[row['pk']],
+                'isPublished': row['is_published'],
+                'featured': row['featured'],
+                'viewCount': row['view_count'],
+                'createdAt': _format_datetime(row['created_at']),
+                'updatedAt': _format_datetime(row['updated_at']),
+                'comments': comments[row['pk']],
+                'authors': [
+                    authors[username] for username in sorted(article_usernames)
+                    if username in authors
+                ],
+            }
+
+        last_pk = article_ids[-1]
+
+
+def _set_values(model, values, field_types):
+    """
+    Set different values on many rows with one UPDATE per chunk. `values`
+    maps primary keys to dicts of field name to value.
+    """
+    items = list(values.items())
+
+    for start in range(0, len(items), UPDATE_CHUNK_SIZE):
+        chunk = items[start:start + UPDATE_CHUNK_SIZE]
+        updates = {}
+
+        for field, output_field in field_types.items():
+            updates[field] = Case(*[
+                When(pk=pk, then=Value(row[field]))
+                for pk, row in chunk if row.get(field) is not None
+            ], default=field, output_field=output_field)
+
+        model.objects.filter(
+            pk__in=[pk for pk, row in chunk]
+        ).update(**updates)
+
+
+def _get_timestamps(record):
+    return {
+        'created_at': parse_datetime(record.get('createdAt') or ''),
+        'updated_at': parse_datetime(record.get('updatedAt') or ''),
+    }
+
+
+TIMESTAMP_FIELDS = {
+    'created_at': DateTimeField(), 'updated_at': DateTimeField(),
+}
+
+
+class ArticleImporter(object):
+    """
+    Imports articles in batches. Authors, tags and categories are looked up
+    once and then kept in memory. Authors that do not exist are created from
+    the records' `authors`, unless their email address is taken. Articles
+    whose slug is already taken, or whose author does not exist, are
+    skipped, and so are comments by users that do not exist.
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.stats = Counter()
+
+        self._profiles = {}
+        self._tags = {}
+        self._categories = dict(
+            Category.objects.values_list('slug', 'pk')
+        )
+
+    def import_records(self, records):
+        """
+        Import an iterable of article dicts, yielding `stats` after each
+        batch.
+        """
+        batch = []
+
+        for record in records:
+            batch.append(record)
+
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch)
+                batch = []
+                yield self.stats
+
+        if batch:
+            self._import_batch(batch)
+            yield self.stats
+
+    def _load_profiles(self, usernames, authors):
+        missing = set(usernames) - set(self._profiles)
+
+        if missing:
+            # Remember the users that don't exist too, so they are only
+            # looked up once.
+            self._profiles.update(dict.fromkeys(missing))
+            self._profiles.update(Profile.objects.filter(
+                user__username__in=missing
+            ).values_list('user__username', 'pk'))
+
+            self._create_users([
+                authors[username] for username in missing
+                if self._profiles[username] is None and username in authors
+            ])
+
+    def _create_users(self, authors):
+        """
+        Create users and profiles for `authors`, a list of author records,
+        with `bulk_create`. Their passwords are unusable.
+        """
+        taken = set(User.objects.filter(email__in=[
+            author.get('email') for author in authors
+        ]).values_list('email', flat=True))
+        accepted = []
+
+        for author in authors:
+            email = author.get('email')
+
+            if not email or email in taken:
+                self.stats['skipped_users'] += 1
+                continue
+
+            taken.add(email)
+            accepted.append(author)
+
+        if not accepted:
+            return
+
+        password = make_password(None)
+        usernames = [author['username'] for author in accepted]
+
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(
+                    username=author['username'], email=author['email'],
+                    password=password
+                )
+                for author in accepted
+            ])
+
+            # `bulk_create` sends no `post_save`, which is what creates the
+            # profile and its statistics row for other users.
+            user_ids = dict(User.objects.filter(
+                username__in=usernames
+            ).values_list('username', 'pk'))
+            Profile.objects.bulk_create([
+                Profile(
+                    user_id=user_ids[author['username']],
+                    bio=author.get('bio') or '',
+                    image=author.get('image') or '',
+                )
+                for author in accepted
+            ])
+            profile_ids = dict(Profile.objects.filter(
+                user__username__in=usernames
+            ).values_list('user__username', 'pk'))
+            ProfileStatistics.objects.bulk_create([
+                ProfileStatistics(profile_id=pk)
+                for pk in profile_ids.values()
+            ])
+
+        self._profiles.update(profile_ids)
+        self.stats['users'] += len(accepted)
+        self.stats['rows'] += 3 * len(accepted)
+
+    def _load_tags(self, names):
+        missing = [name for name in names if name.lower() not in self._tags]
+
+        if missing:
+            self._tags.update(
+                (tag.slug, tag.pk)
+                for tag in Tag.objects.get_or_create_many(missing)
+            )
+
+    def _import_batch(self, records):
+        self._load_profiles(
+            [record.get('author') for record in records] + [
+                comment.get('author') for record in records
+                for comment in record.get('comments', ())
+            ],
+            dict(
+                (author['username'], author) for record in records
+                for author in record.get('authors', ())
+                if author.get('username')
+            )
+        )
+
+        taken = set(Article.objects.filter(slug__in=[
+            record['slug'] for record in records if record.get('slug')
+        ]).values_list('slug', flat=True))
+
+        accepted = []
+
+        for record in records:
+            slug = record.get('slug') or ''
+            author_id = self._profiles.get(record.get('author'))
+
+            if slug in taken or author_id is None:
+                self.stats['skipped'] += 1
+                continue
+
+            if slug:
+                taken.add(slug)
+
+            accepted.append((record, Article(
+                slug=slug,
+                title=record['title'],
+                description=record.get('description', ''),
+                body=record.get('body', ''),
+                author_id=author_id,
+                category_id=self._categories.get(record.get('category')),
+                is_published=record.get('isPublished', True),
+                featured=record.get('featured', False),
+                view_count=record.get('viewCount', 0),
+            )))
+
+        if not accepted:
+            return
+
+        self._load_tags(set(
+            name for record, article in accepted
+            for name in record.get('tags', ())
+        ))
+
+        with transaction.atomic():
+            self._create_articles(accepted)
+            self._create_comments(accepted)
+
+        get_search_backend().index(article for record, article in accepted)
+        rebuild_statistics(set(
+            article.author_id for record, article in accepted
+        ) | set(
+            self._profiles[comment['author']]
+            for record, article in accepted
+            for comment in record.get('comments', ())
+            if self._profiles.get(comment.get('author')) is not None
+        ))
+
+    def _create_articles(self, accepted):
+        articles = [article for record, article in accepted]
+        Article.objects.bulk_create(articles)
+
+        # Not every database returns primary keys from `bulk_create`, so read
+        # them back. Every article has a slug by now.
+        pks = dict(Article.objects.filter(
+            slug__in=[article.slug for article in articles]
+        ).values_list('slug', 'pk'))
+
+        for article in articles:
+            article.pk = pks[article.slug]
+
+        # `bulk_create` sets `created_at` to now, like `save` does.
+        _set_values(Article, dict(
+            (article.pk, _get_timestamps(record))
+            for record, article in accepted
+        ), TIMESTAMP_FIELDS)
+
+        links = [
+            Article.tags.through(article_id=article.pk, tag_id=tag_id)
+            for record, article in accepted
+            for tag_id in set(
+                self._tags[name.lower()] for name in record.get('tags', ())
+            )
+        ]
+        Article.tags.through.objects.bulk_create(links)
+
+        self.stats['articles'] += len(articles)
+        self.stats['tags'] += len(links)
+        self.stats['rows'] += len(articles) + len(links)
+
+    def _create_comments(self, accepted):
+        records = []
+        comments = []
+
+        for record, article in accepted:
+            for comment in record.get('comments', ()):
+                if self._profiles.get(comment.get('author')) is None:
+                    self.stats['skipped_comments'] += 1
+                    continue
+
+                records.append((article.pk, comment))
+                comments.append(Comment(
+                    article_id=article.pk,
+                    author_id=self._profiles[comment['author']],
+                    body=comment.get('body', ''),
+                    is_edited=comment.get('isEdited', False),
+                ))
+
+        if not comments:
+            return
+
+        Comment.objects.bulk_create(comments)
+
+        # The articles are new, so their comments are exactly the ones just
+        # inserted, and in the same order.
+        pks = Comment.objects.filter(
+            article_id__in=set(article_id for article_id, comment in records)
+        ).order_by('pk').values_list('pk', flat=True)
+
+        new_pks = {}
+        values = {}
+
+        for (article_id, comment), pk in zip(records, pks):
+            new_pks[(article_id, comment.get('id'))] = pk
+            values[pk] = _get_timestamps(comment)
+
+        for (article_id, comment), pk in zip(records, pks):
+            # Replies to comments that were skipped become top-level
+            # comments.
+            if comment.get('parent') is not None:
+                values[pk]['parent_id'] = new_pks.get(
+                    (article_id, comment['parent'])
+                )
+
+        _set_values(Comment, values, dict(
+            TIMESTAMP_FIELDS, parent_id=IntegerField()
+        ))
+
+        self.stats['comments'] += len(comments)
+        self.stats['rows'] += len(comments)
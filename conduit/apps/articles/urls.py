@@ -4,6 +4,7 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     ArticleViewSet, ArticlesFavoriteAPIView, ArticlesFeedAPIView,
+    ArticlesSearchAPIView, ArticlesTopRatedAPIView, CategoryListAPIView,
     CommentsListCreateAPIView, CommentsDestroyAPIView, TagListAPIView
 )
 
@@ -11,10 +12,17 @@ router = DefaultRouter(trailing_slash=False)
 router.register(r'articles', ArticleViewSet)
 
 urlpatterns = [
-    url(r'^', include(router.urls)),
-
+    # `articles/feed`, `articles/search` and `articles/top-rated` must come
+    # before the router's urls, otherwise the router treats them as article
+    # slugs.
     url(r'^articles/feed/?$', ArticlesFeedAPIView.as_view()),
 
+    url(r'^articles/search/?$', ArticlesSearchAPIView.as_view()),
+
+    url(r'^articles/top-rated/?$', ArticlesTopRatedAPIView.as_view()),
+
+    url(r'^', include(router.urls)),
+
     url(r'^articles/(?P<article_slug>[-\w]+)/favorite/?$',
         ArticlesFavoriteAPIView.as_view()),
 
@@ -25,4 +33,6 @@ urlpatterns = [
         CommentsDestroyAPIView.as_view()),
 
     url(r'^tags/?$', TagListAPIView.as_view()),
+
+    url(r'^categories/?$', CategoryListAPIView.as_view()),
 ]
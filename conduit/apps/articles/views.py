@@ -1,14 +1,61 @@
+from django.conf import settings
+from django.db.models import Count
+
 from rest_framework import generics, mixins, status, viewsets
 from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import (
     AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
 )
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Article, Comment, Tag
+from conduit.apps.authentication.activity import log_activity
+from conduit.apps.profiles.models import Profile
+
+from .categories import category_tree
+from .counters import view_counter
+from .feeds import get_feed_queryset
+from .models import Article, ArticleRatingAggregate, Comment, Tag
 from .renderers import ArticleJSONRenderer, CommentJSONRenderer
+from .revisions import record_revision
+from .search import get_search_backend
 from .serializers import ArticleSerializer, CommentSerializer, TagSerializer
+from .tags import tag_directory
+from .threads import get_comment_tree, nest_comments
+
+
+def get_article_list_context(request, articles):
+    """
+    Build the serializer context for a page of articles.
+
+    `ArticleSerializer` and `ProfileSerializer` would otherwise run a query
+    per article to find the favorites count, whether the current user has
+    favorited the article and whether they follow its author. Here we answer
+    those questions for the whole page at once so that the number of queries
+    does not grow with the size of the page.
+    """
+    articles = list(articles)
+    favorites_counts = Profile.favorites.through.objects.filter(
+        article_id__in=[article.pk for article in articles]
+    ).values('article_id').annotate(count=Count('id')).values_list(
+        'article_id', 'count'
+    )
+
+    context = {
+        'request': request,
+        'favorites_counts': dict(favorites_counts),
+    }
+
+    if request.user.is_authenticated():
+        profile = request.user.profile
+
+        context['favorited'] = profile.get_favorited_ids(articles)
+        context['following'] = profile.get_following_ids(
+            article.author for article in articles
+        )
+
+    return context
 
 
 class ArticleViewSet(mixins.CreateModelMixin, 
@@ -39,6 +86,19 @@ class ArticleViewSet(mixins.CreateModelMixin,
                 favorited_by__user__username=favorited_by
             )
 
+        # Articles in the category or any of its subcategories.
+        category = self.request.query_params.get('category', None)
+        if category is not None:
+            node = category_tree.get_category(category)
+
+            if node is not None:
+                queryset = queryset.filter(
+                    category__path__startswith=node.path
+                )
+            else:
+                # No such category, so no articles.
+                queryset = queryset.filter(category__slug=category)
+
         return queryset
 
     def create(self, request):
@@ -52,14 +112,19 @@ class ArticleViewSet(mixins.CreateModelMixin,
         data=serializer_data, context=serializer_context
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        article = serializer.save()
+        record_revision(article, edited_by=request.user.profile)
+
+        log_activity(
+            request.user, 'article_create', request, article_id=article.pk
+        )
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def list(self, request):
-        serializer_context = {'request': request}
         page = self.paginate_queryset(self.get_queryset())
 
+        serializer_context = get_article_list_context(request, page)
         serializer = self.serializer_class(
             page,
             context=serializer_context,
@@ -76,6 +141,14 @@ class ArticleViewSet(mixins.CreateModelMixin,
         except Article.DoesNotExist:
             raise NotFound('An article with this slug does not exist.')
 
+        view_counter.record(serializer_instance.pk)
+
+        if request.user.is_authenticated():
+            log_activity(
+                request.user, 'article_view', request,
+                article_id=serializer_instance.pk
+            )
+
         serializer = self.serializer_class(
             serializer_instance,
             context=serializer_context
@@ -102,10 +175,31 @@ class ArticleViewSet(mixins.CreateModelMixin,
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        record_revision(serializer_instance, edited_by=request.user.profile)
+
+        log_activity(
+            request.user, 'article_edit', request,
+            article_id=serializer_instance.pk
+        )
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+def get_comment_list_context(request, comments):
+    """
+    Build the serializer context for a list of comments, looking up whether
+    the current user follows each author for the whole list at once.
+    """
+    context = {'request': request}
+
+    if request.user.is_authenticated():
+        context['following'] = request.user.profile.get_following_ids(
+            comment.author for comment in comments
+        )
+
+    return context
+
+
 class CommentsListCreateAPIView(generics.ListCreateAPIView):
     lookup_field = 'article__slug'
     lookup_url_kwarg = 'article_slug'
@@ -125,6 +219,78 @@ class CommentsListCreateAPIView(generics.ListCreateAPIView):
 
         return queryset.filter(**filters)
 
+    def list(self, request, article_slug=None):
+        if request.query_params.get('threaded', None) in ('1', 'true'):
+            return self.list_threads(request)
+
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        serializer = self.serializer_class(
+            page, context=get_comment_list_context(request, page), many=True
+        )
+
+        return self.get_paginated_response(serializer.data)
+
+    def list_threads(self, request):
+        """
+        List the comments as threads, newest thread first and replies in
+        the order they were written, paginated by thread. Each comment shows
+        up to `COMMENT_REPLY_PREVIEW_SIZE` of its replies and the number of
+        replies below it in total. `?root=<id>` returns every reply below one
+        comment instead. Either way replies are nested at most
+        `COMMENT_THREAD_MAX_DEPTH` levels deep; deeper ones can be fetched
+        with `?root=` on the last comment shown.
+        """
+        tree = get_comment_tree(self.filter_queryset(Comment.objects.all()))
+        root = request.query_params.get('root', None)
+
+        if root is not None:
+            try:
+                root = int(root)
+            except ValueError:
+                root = None
+
+            if root not in tree.reply_counts:
+                raise NotFound('A comment with this ID does not exist.')
+
+            paginator = None
+            root_ids = [root]
+            preview_size = None
+        else:
+            # Threads are paginated like search results, by offset.
+            paginator = LimitOffsetPagination()
+            root_ids = paginator.paginate_queryset(
+                tree.roots[::-1], request, view=self
+            )
+            preview_size = getattr(
+                settings, 'COMMENT_REPLY_PREVIEW_SIZE', 3
+            )
+
+        shown = tree.select(
+            root_ids, preview_size,
+            getattr(settings, 'COMMENT_THREAD_MAX_DEPTH', 10)
+        )
+        comments = Comment.objects.select_related(
+            'author', 'author__user'
+        ).in_bulk(list(shown))
+        serializer = self.serializer_class(
+            list(comments.values()),
+            context=get_comment_list_context(request, comments.values()),
+            many=True
+        )
+        threads = nest_comments(
+            shown,
+            dict((data['id'], data) for data in serializer.data),
+            tree.reply_counts
+        )
+        results = [threads[pk] for pk in root_ids]
+
+        if paginator is None:
+            return Response({'results': results, 'count': len(results)})
+
+        return paginator.get_paginated_response(results)
+
     def create(self, request, article_slug=None):
         data = request.data.get('comment', {})
         context = {'author': request.user.profile}
@@ -199,12 +365,64 @@ class TagListAPIView(generics.ListAPIView):
     permission_classes = (AllowAny,)
     serializer_class = TagSerializer
 
+    def get_limit(self, request):
+        # Like `LimitOffsetPagination`, ignore a limit we can't make sense of
+        # rather than failing the request.
+        try:
+            limit = int(request.query_params['limit'])
+        except (KeyError, ValueError):
+            return None
+
+        return limit if limit >= 0 else None
+
     def list(self, request):
-        serializer_data = self.get_queryset()
-        serializer = self.serializer_class(serializer_data, many=True)
+        # Tags are served from the in-memory directory, most used first,
+        # rather than from the database.
+        entries = tag_directory.get_tags(
+            prefix=request.query_params.get('prefix', None),
+            limit=self.get_limit(request)
+        )
+
+        if request.query_params.get('counts', None) in ('1', 'true'):
+            tags = [
+                {'tag': entry.tag, 'articlesCount': entry.count}
+                for entry in entries
+            ]
+        else:
+            tags = [entry.tag for entry in entries]
+
+        return Response({
+            'tags': tags
+        }, status=status.HTTP_200_OK)
+
 
+class CategoryListAPIView(APIView):
+    permission_classes = (AllowAny,)
+
+    def serialize(self, node):
+        return {
+            'name': node.name,
+            'slug': node.slug,
+            'description': node.description,
+            'icon': node.icon,
+            'articlesCount': node.subtree_article_count,
+            'children': [
+                self.serialize(child)
+                for child in category_tree.get_children(node.pk)
+                if child.is_active
+            ],
+        }
+
+    def get(self, request):
+        # The tree is served from memory. `articlesCount` includes the
+        # articles in subcategories. Inactive categories are left out,
+        # together with their subcategories.
         return Response({
-            'tags': serializer.data
+            'categories': [
+                self.serialize(node)
+                for node in category_tree.get_children()
+                if node.is_active
+            ]
         }, status=status.HTTP_200_OK)
 
 
@@ -215,17 +433,100 @@ class ArticlesFeedAPIView(generics.ListAPIView):
     serializer_class = ArticleSerializer
 
     def get_queryset(self):
-        return Article.objects.filter(
-            author__in=self.request.user.profile.follows.all()
+        return get_feed_queryset(self.request.user.profile).select_related(
+            'author', 'author__user'
         )
 
     def list(self, request):
-        queryset = self.get_queryset()
-        page = self.paginate_queryset(queryset)
+        page = self.paginate_queryset(self.get_queryset())
 
-        serializer_context = {'request': request}
+        serializer_context = get_article_list_context(request, page)
         serializer = self.serializer_class(
             page, context=serializer_context, many=True
         )
 
         return self.get_paginated_response(serializer.data)
+
+
+class ArticlesSearchAPIView(generics.GenericAPIView):
+    permission_classes = (AllowAny,)
+    queryset = Article.objects.select_related('author', 'author__user')
+    renderer_classes = (ArticleJSONRenderer,)
+    serializer_class = ArticleSerializer
+
+    def get(self, request):
+        # Results are ranked by relevance rather than by date, so cursor
+        # pagination does not apply here.
+        paginator = LimitOffsetPagination()
+        limit = paginator.get_limit(request)
+        offset = paginator.get_offset(request)
+
+        article_ids, count = get_search_backend().search(
+            request.query_params.get('q', ''), offset, limit
+        )
+
+        articles = self.queryset.in_bulk(article_ids)
+        page = [articles[pk] for pk in article_ids if pk in articles]
+
+        serializer_context = get_article_list_context(request, page)
+        serializer = self.serializer_class(
+            page, context=serializer_context, many=True
+        )
+
+        return Response({
+            'results': serializer.data,
+            'count': count,
+        }, status=status.HTTP_200_OK)
+
+
+class ArticlesTopRatedAPIView(generics.GenericAPIView):
+    permission_classes = (AllowAny,)
+    queryset = Article.objects.select_related('author', 'author__user')
+    renderer_classes = (ArticleJSONRenderer,)
+    serializer_class = ArticleSerializer
+
+    def get(self, request):
+        # The page is read from the `bayesian_score` index of the aggregates
+        # table, so it never has to group the ratings.
+        paginator = LimitOffsetPagination()
+        aggregates = paginator.paginate_queryset(
+            ArticleRatingAggregate.objects.filter(
+                rating_count__gt=0
+            ).order_by('-bayesian_score', 'article_id'),
+            request, view=self
+        )
+
+        articles = self.queryset.in_bulk(
+            [aggregate.article_id for aggregate in aggregates]
+        )
+        page = [
+            articles[aggregate.article_id] for aggregate in aggregates
+            if aggregate.article_id in articles
+        ]
+
+        serializer_context = get_article_list_context(request, page)
+        serializer = self.serializer_class(
+            page, context=serializer_context, many=True
+        )
+
+        # Ratings are added here rather than by the serializer so that the
+        # cached article representations don't change with every rating.
+        aggregates = dict(
+            (aggregate.article_id, aggregate) for aggregate in aggregates
+        )
+        results = []
+
+        for article, data in zip(page, serializer.data):
+            aggregate = aggregates[article.pk]
+            data['rating'] = {
+                'average': aggregate.average,
+                'count': aggregate.rating_count,
+                'score': aggregate.bayesian_score,
+                'histogram': dict(
+                    (str(score), count)
+                    for score, count in aggregate.histogram.items()
+                ),
+            }
+            results.append(data)
+
+        return paginator.get_paginated_response(results)
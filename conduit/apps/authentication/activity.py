@@ -0,0 +1,320 @@
+"""
+Batched, asynchronous writes to `UserActivityLog`.
+
+`log_activity` only puts the event on an in-memory queue. A background
+thread takes events off the queue and writes them with `bulk_create`, up to
+`ACTIVITY_LOG_BATCH_SIZE` at a time, every `ACTIVITY_LOG_FLUSH_INTERVAL`
+seconds or as soon as a full batch is waiting.
+
+If `ACTIVITY_LOG_SPOOL_DIR` is set, batches are appended to a JSON lines
+file in that directory instead (one per process), and the
+`flush_activity_spool` command loads them into the database. This keeps the
+database writes of many worker processes down to a single writer.
+
+The queue holds at most `ACTIVITY_LOG_MAX_QUEUE` events. When it is full,
+`log_activity` waits up to `ACTIVITY_LOG_BLOCK_TIMEOUT` seconds for room and
+then drops the event. Events are never allowed to fail a request. Whatever
+is still queued when the process exits is written out first, unless the
+database it was logged against is gone by then, as the test database is
+when the tests finish.
+"""
+import atexit
+import fcntl
+import json
+import logging
+import os
+import queue
+import threading
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from conduit.apps.core.utils import get_database_name
+
+from .models import UserActivityLog
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIX = '.jsonl'
+
+
+def get_client_ip(request):
+    return request.META.get('REMOTE_ADDR') or None
+
+
+def _to_record(event):
+    record = dict(event)
+    record['created_at'] = record['created_at'].isoformat()
+
+    return record
+
+
+def _from_record(record):
+    record = dict(record)
+    record['created_at'] = parse_datetime(record['created_at'])
+
+    return record
+
+
+def write_events(events, batch_size=None):
+    """Insert `events` (dicts of `UserActivityLog` field values)."""
+    UserActivityLog.objects.bulk_create(
+        [UserActivityLog(**event) for event in events], batch_size=batch_size
+    )
+
+
+def get_spool_path(directory, pid=None):
+    return os.path.join(directory, 'activity-{}{}'.format(
+        os.getpid() if pid is None else pid, SPOOL_SUFFIX
+    ))
+
+
+def append_to_spool(path, events):
+    """
+    Append `events` to the spool file at `path`. The file is locked while
+    we write so that `read_spool` never sees half a batch.
+    """
+    while True:
+        with open(path, 'a') as spool:
+            fcntl.flock(spool, fcntl.LOCK_EX)
+
+            # `read_spool` may have taken the file away while we waited for
+            # the lock. If so, start a new one.
+            if os.fstat(spool.fileno()).st_nlink == 0:
+                continue
+
+            spool.write(''.join(
+                json.dumps(_to_record(event)) + '\n' for event in events
+            ))
+
+            return
+
+
+def read_spool(path):
+    """
+    Take the spool file at `path` away from its writer and return the
+    events in it. The file is removed.
+    """
+    with open(path) as spool:
+        fcntl.flock(spool, fcntl.LOCK_EX)
+        os.unlink(path)
+        lines = spool.readlines()
+
+    return [_from_record(json.loads(line)) for line in lines if line.strip()]
+
+
+class ActivityLog(object):
+    def __init__(self):
+        self._queue = None
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = Counter()
+        self._database = None
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'ACTIVITY_LOG_ENABLED', True)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 500)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'ACTIVITY_LOG_FLUSH_INTERVAL', 2)
+
+    @property
+    def block_timeout(self):
+        return getattr(settings, 'ACTIVITY_LOG_BLOCK_TIMEOUT', 0)
+
+    @property
+    def spool_dir(self):
+        return getattr(settings, 'ACTIVITY_LOG_SPOOL_DIR', None)
+
+    @property
+    def queue(self):
+        if self._queue is None:
+            with self._lock:
+                if self._queue is None:
+                    self._queue = queue.Queue(
+                        getattr(settings, 'ACTIVITY_LOG_MAX_QUEUE', 10000)
+                    )
+
+        return self._queue
+
+    def log(self, user, activity_type, description='', ip_address=None,
+            metadata=None):
+        """
+        Queue an activity of `user` to be written. Returns `False` if the
+        event was dropped because the queue is full.
+        """
+        if not self.enabled:
+            return True
+
+        event = {
+            'user_id': user.pk,
+            'activity_type': activity_type,
+            'description': description,
+            'ip_address': ip_address,
+            'metadata': json.dumps(metadata) if metadata else '',
+            'created_at': timezone.now(),
+        }
+
+        try:
+            if self.block_timeout > 0:
+                self.queue.put(event, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(event)
+        except queue.Full:
+            self._count('dropped')
+
+            return False
+
+        self._count('queued')
+        self._database = get_database_name()
+
+        if self.flush_interval <= 0:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not write activity log.')
+        else:
+            if self.queue.qsize() >= self.batch_size:
+                self._wakeup.set()
+
+            self._start()
+
+        return True
+
+    def flush(self):
+        """Write everything that is queued, in batches."""
+        # Only one flush at a time, so that batches are written in order.
+        with self._flush_lock:
+            stale = not self.spool_dir and self._database not in (
+                None, get_database_name()
+            )
+
+            while True:
+                batch = self._take(self.batch_size)
+
+                if not batch:
+                    return
+
+                if stale:
+                    logger.warning(
+                        'Dropping %d activity events logged against another '
+                        'database.', len(batch)
+                    )
+                    self._count('failed', len(batch))
+                    continue
+
+                try:
+                    self._write(batch)
+                except Exception:
+                    self._count('failed', len(batch))
+                    raise
+
+                self._count('written', len(batch))
+
+    def get_stats(self):
+        """
+        Returns how many events were queued, written, dropped because the
+        queue was full and lost because they could not be written, and how
+        many are waiting.
+        """
+        with self._lock:
+            stats = dict(
+                (key, self._stats[key])
+                for key in ('queued', 'written', 'dropped', 'failed')
+            )
+
+        stats['pending'] = self.queue.qsize()
+
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _take(self, n):
+        batch = []
+
+        while len(batch) < n:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _write(self, batch):
+        if self.spool_dir:
+            append_to_spool(get_spool_path(self.spool_dir), batch)
+        else:
+            write_events(batch)
+
+    def _start(self):
+        # The writer thread is started lazily so that each worker process
+        # gets its own after forking.
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._thread = threading.Thread(
+                target=self._run, name='activity-log-writer'
+            )
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not write activity log.')
+            finally:
+                # This thread has its own database connection. Don't hold
+                # on to it between flushes.
+                connection.close()
+
+
+activity_log = ActivityLog()
+
+
+def log_activity(user, activity_type, request=None, description='',
+                 **metadata):
+    """
+    Record that `user` did `activity_type` (one of
+    `UserActivityLog.ACTIVITY_TYPES`). Extra keyword arguments are stored as
+    JSON metadata.
+    """
+    return activity_log.log(
+        user, activity_type, description=description,
+        ip_address=get_client_ip(request) if request is not None else None,
+        metadata=metadata
+    )
+
+
+@atexit.register
+def drain_activity_log():
+    # Write out whatever is still queued when the process exits cleanly.
+    try:
+        activity_log.flush()
+    except Exception:
+        logger.exception('Could not write activity log.')
@@ -4,6 +4,7 @@ from django.conf import settings
 
 from rest_framework import authentication, exceptions
 
+from . import cache as auth_cache
 from .models import User
 
 
@@ -73,15 +74,25 @@ class JWTAuthentication(authentication.BaseAuthentication):
         """
         Try to authenticate the given credentials. If authentication is
         successful, return the user and token. If not, throw an error.
+
+        Clients tend to send the same token with every request, so both the
+        decoded token and the user it belongs to are cached. See
+        `conduit.apps.authentication.cache` for how and for how long.
         """
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY)
-        except:
-            msg = 'Invalid authentication. Could not decode token.'
-            raise exceptions.AuthenticationFailed(msg)
+        user_id = auth_cache.get_token(token)
+
+        if user_id is None:
+            try:
+                payload = jwt.decode(token, settings.SECRET_KEY)
+            except:
+                msg = 'Invalid authentication. Could not decode token.'
+                raise exceptions.AuthenticationFailed(msg)
+
+            auth_cache.set_token(token, payload)
+            user_id = payload['id']
 
         try:
-            user = User.objects.get(pk=payload['id'])
+            user = auth_cache.get_user(user_id)
         except User.DoesNotExist:
             msg = 'No user matching this token was found.'
             raise exceptions.AuthenticationFailed(msg)
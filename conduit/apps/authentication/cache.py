@@ -0,0 +1,172 @@
+"""
+Caches used by `JWTAuthentication` so that clients who send the same token
+over and over can be authenticated without touching the database.
+
+There are two tiers. Every process keeps a small LRU cache with a short
+timeout. If `JWT_AUTH_SHARED_CACHE_ALIAS` names one of the `CACHES`, that
+cache is checked next and shared between processes. Two things are cached:
+
+1) token -> (user id, expiry), so we don't decode the same token again.
+2) user id -> the few user and profile fields that requests need (see
+   `USER_FIELDS` and `PROFILE_FIELDS`), so we don't load the user again.
+   Secrets such as the password hash are never cached. The other fields
+   of a cached user are loaded from the database if they are used.
+
+Saving or deleting a user or profile invalidates (2) in the local cache of
+the process that made the change and in the shared cache. Other processes
+may keep using their copy for up to `JWT_AUTH_CACHE_TIMEOUT` seconds.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from conduit.apps.core.cache import LRUCache
+from conduit.apps.core.routers import use_primary
+from conduit.apps.profiles.models import Profile
+
+from .models import User
+
+TOKEN_KEY = 'auth:token:{}'
+USER_KEY = 'auth:user:v2:{}'
+
+# Change the version in `USER_KEY` when these change.
+USER_FIELDS = ('id', 'username', 'email', 'is_active', 'is_staff')
+PROFILE_FIELDS = ('id', 'user_id', 'bio', 'image')
+
+local_cache = LRUCache(
+    max_size=getattr(settings, 'JWT_AUTH_CACHE_SIZE', 10000),
+    timeout=getattr(settings, 'JWT_AUTH_CACHE_TIMEOUT', 30),
+)
+
+
+def get_shared_cache():
+    alias = getattr(settings, 'JWT_AUTH_SHARED_CACHE_ALIAS', None)
+
+    if alias is None:
+        return None
+
+    return caches[alias]
+
+
+def get_shared_timeout():
+    return getattr(settings, 'JWT_AUTH_SHARED_CACHE_TIMEOUT', 300)
+
+
+def _get(key):
+    value = local_cache.get(key)
+
+    if value is None:
+        shared_cache = get_shared_cache()
+
+        if shared_cache is not None:
+            value = shared_cache.get(key)
+
+            if value is not None:
+                local_cache.set(key, value)
+
+    return value
+
+
+def _set(key, value, expires_in=None):
+    """
+    Store `value` in both tiers, but never for longer than `expires_in`
+    seconds if it is given.
+    """
+    local_timeout = local_cache.timeout
+    shared_timeout = get_shared_timeout()
+
+    if expires_in is not None:
+        local_timeout = min(local_timeout, expires_in)
+        shared_timeout = min(shared_timeout, expires_in)
+
+    local_cache.set(key, value, local_timeout)
+
+    shared_cache = get_shared_cache()
+
+    if shared_cache is not None:
+        shared_cache.set(key, value, shared_timeout)
+
+
+def _token_key(token):
+    return TOKEN_KEY.format(hashlib.sha1(token.encode('utf-8')).hexdigest())
+
+
+def get_token(token):
+    """
+    Returns the user id stored in `token` if we have already decoded it and
+    it has not expired since. Returns `None` otherwise.
+    """
+    entry = _get(_token_key(token))
+
+    if entry is None:
+        return None
+
+    user_id, expires_at = entry
+
+    if expires_at is not None and expires_at <= time.time():
+        return None
+
+    return user_id
+
+
+def set_token(token, payload):
+    expires_at = payload.get('exp', None)
+    expires_in = None
+
+    if expires_at is not None:
+        expires_in = max(int(expires_at - time.time()), 0)
+
+    _set(_token_key(token), (payload['id'], expires_at), expires_in)
+
+
+def _get_record(instance, field_names):
+    return tuple(getattr(instance, name) for name in field_names)
+
+
+def _from_record(model, field_names, record):
+    return model.from_db('default', field_names, record)
+
+
+def get_user(user_id):
+    """
+    Returns the user with the given id, with their profile attached, from
+    the cache if possible and from the database otherwise. Raises
+    `User.DoesNotExist` if there is no such user.
+    """
+    key = USER_KEY.format(user_id)
+    records = _get(key)
+
+    if records is None:
+        # What is cached here is shared with other requests, so it must not
+        # come from a replica that hasn't seen, say, the user's deactivation.
+        with use_primary():
+            user = User.objects.select_related('profile').get(pk=user_id)
+
+        try:
+            profile_record = _get_record(user.profile, PROFILE_FIELDS)
+        except Profile.DoesNotExist:
+            profile_record = None
+
+        _set(key, (_get_record(user, USER_FIELDS), profile_record))
+
+        return user
+
+    user_record, profile_record = records
+    user = _from_record(User, USER_FIELDS, user_record)
+
+    if profile_record is not None:
+        user.profile = _from_record(Profile, PROFILE_FIELDS, profile_record)
+
+    return user
+
+
+def invalidate_user(user_id):
+    key = USER_KEY.format(user_id)
+    local_cache.delete(key)
+
+    shared_cache = get_shared_cache()
+
+    if shared_cache is not None:
+        shared_cache.delete(key)
@@ -0,0 +1,64 @@
+import glob
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from conduit.apps.authentication.activity import (
+    SPOOL_SUFFIX, activity_log, append_to_spool, get_spool_path, read_spool,
+    write_events
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Load activity log events spooled by worker processes into the '
+        'database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--spool-dir',
+            help='Directory to read from. Defaults to ACTIVITY_LOG_SPOOL_DIR.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Number of events to insert per query. Defaults to '
+                 'ACTIVITY_LOG_BATCH_SIZE.'
+        )
+
+    def handle(self, *args, **options):
+        spool_dir = options['spool_dir'] or activity_log.spool_dir
+
+        if not spool_dir:
+            raise CommandError(
+                'No spool directory given and ACTIVITY_LOG_SPOOL_DIR is not '
+                'set.'
+            )
+
+        batch_size = options['batch_size'] or activity_log.batch_size
+        paths = sorted(glob.glob(
+            os.path.join(spool_dir, 'activity-*' + SPOOL_SUFFIX)
+        ))
+        total = 0
+
+        for path in paths:
+            events = read_spool(path)
+
+            try:
+                with transaction.atomic():
+                    write_events(events, batch_size=batch_size)
+            except Exception:
+                # The file is gone by now. Spool the events again so that
+                # the next run can retry them.
+                append_to_spool(get_spool_path(spool_dir), events)
+                raise
+
+            total += len(events)
+            self.stdout.write('Loaded {} events from {}.'.format(
+                len(events), os.path.basename(path)
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            'Done. Loaded {} events.'.format(total)
+        ))
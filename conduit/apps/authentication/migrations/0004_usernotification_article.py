@@ -0,0 +1,36 @@
+# Generated migration for authentication models
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_useractivitylog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usernotification',
+            name='notification_type',
+            field=models.CharField(
+                choices=[
+                    ('article', 'New Article'),
+                    ('follow', 'New Follower'),
+                    ('comment', 'New Comment'),
+                    ('like', 'Article Liked'),
+                    ('mention', 'Mentioned'),
+                    ('rating', 'Article Rated'),
+                    ('reply', 'Comment Reply'),
+                ],
+                max_length=20
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='usernotification',
+            index=models.Index(
+                fields=['recipient', 'is_read', 'created_at'],
+                name='notification_recipient_idx'
+            ),
+        ),
+    ]
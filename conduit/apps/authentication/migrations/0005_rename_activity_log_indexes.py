@@ -0,0 +1,38 @@
+# Generated migration for authentication models
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 0002 named these indexes explicitly, but `UserActivityLog` leaves
+    # naming them to Django. Recreate them under the generated names so the
+    # models and the migrations agree.
+
+    dependencies = [
+        ('authentication', '0004_usernotification_article'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='useractivitylog',
+            name='authenticat_user_id_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='useractivitylog',
+            name='authenticat_activity_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='useractivitylog',
+            index=models.Index(
+                fields=['user', '-created_at'],
+                name='authenticat_user_id_5cb56e_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='useractivitylog',
+            index=models.Index(
+                fields=['activity_type', '-created_at'],
+                name='authenticat_activit_d10f1a_idx'
+            ),
+        ),
+    ]
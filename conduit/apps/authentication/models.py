@@ -7,6 +7,7 @@ from django.contrib.auth.models import (
     AbstractBaseUser, BaseUserManager, PermissionsMixin
 )
 from django.db import models
+from django.utils import timezone
 
 from conduit.apps.core.models import TimestampedModel
 
@@ -142,6 +143,7 @@ class User(AbstractBaseUser, PermissionsMixin, TimestampedModel):
 class UserNotification(models.Model):
     """Notifications for user activities."""
     NOTIFICATION_TYPES = (
+        ('article', 'New Article'),
         ('follow', 'New Follower'),
         ('comment', 'New Comment'),
         ('like', 'Article Liked'),
@@ -170,6 +172,12 @@ class UserNotification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['recipient', 'is_read', 'created_at'],
+                name='notification_recipient_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.notification_type} for {self.recipient.username}"
@@ -221,7 +229,9 @@ class UserActivityLog(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     metadata = models.TextField(blank=True)  # JSON data
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not `auto_now_add`: events are written in batches some time after they
+    # happen, and this is when they happened.
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
@@ -0,0 +1,186 @@
+"""
+Delivers `UserNotification`s and keeps track of how many are unread.
+
+`notify` takes the recipients as a queryset of user ids, so that the whole
+recipient list comes from a single query however many followers an author
+has. The rows are streamed from that query and inserted with `bulk_create`,
+`NOTIFICATION_BATCH_SIZE` at a time.
+
+Each user's unread count is kept in the cache. It is counted from the table
+the first time it is asked for and from then on adjusted as notifications
+are delivered and read, so showing the count doesn't need a query.
+
+A count that is being filled in can miss a change made while it was counted,
+and that change finds no counter to adjust. So counters are stored under a
+version, and changes that find no counter move the user to a new version
+once they are made. A count filled in under the old version is never read.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from conduit.apps.core.routers import use_primary
+
+from .models import UserNotification
+
+UNREAD_KEY = 'notifications:{}:unread:{}'
+VERSION_KEY = 'notifications:{}:unread-version'
+
+
+def get_cache():
+    return caches[getattr(settings, 'NOTIFICATION_CACHE_ALIAS', 'default')]
+
+
+def get_batch_size():
+    return getattr(settings, 'NOTIFICATION_BATCH_SIZE', 1000)
+
+
+def get_unread_timeout():
+    return getattr(settings, 'NOTIFICATION_UNREAD_TIMEOUT', 60 * 60 * 24)
+
+
+def _get_unread_keys(user_ids):
+    """Returns a dict of user id to the key of their current unread count."""
+    cache = get_cache()
+    version_keys = dict(
+        (user_id, VERSION_KEY.format(user_id)) for user_id in user_ids
+    )
+    versions = cache.get_many(list(version_keys.values()))
+    missing = dict(
+        (version_key, uuid.uuid4().hex)
+        for version_key in version_keys.values() if version_key not in versions
+    )
+
+    # Two processes may both store a new version for the same user. The one
+    # that is overwritten only leaves a count behind that is never read.
+    if missing:
+        cache.set_many(missing, get_unread_timeout())
+        versions.update(missing)
+
+    return dict(
+        (user_id, UNREAD_KEY.format(user_id, versions[version_key]))
+        for user_id, version_key in version_keys.items()
+    )
+
+
+def _get_cached_unread_keys(user_ids):
+    """
+    The keys of the unread counts of `user_ids` that are cached. Call this
+    before changing notifications and pass the result to
+    `_update_unread_counts` afterwards.
+    """
+    keys = _get_unread_keys(user_ids)
+    cached = get_cache().get_many(list(keys.values()))
+
+    return dict(
+        (user_id, key) for user_id, key in keys.items() if key in cached
+    )
+
+
+def _update_unread_counts(user_ids, cached_keys, delta):
+    """
+    Add `delta` to the unread counts in `cached_keys` and move the other
+    users in `user_ids` to a new version, so that counts filled in while
+    their notifications changed are dropped.
+    """
+    cache = get_cache()
+
+    for key in cached_keys.values():
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # The counter expired since we looked.
+            pass
+
+    cache.set_many(dict(
+        (VERSION_KEY.format(user_id), uuid.uuid4().hex)
+        for user_id in user_ids if user_id not in cached_keys
+    ), get_unread_timeout())
+
+
+def notify(recipient_ids, notification_type, message, actor=None, link=''):
+    """
+    Send a notification to every user in `recipient_ids`, which can be a
+    list or a `values_list('...', flat=True)` queryset of user ids. The
+    actor never notifies themselves. Returns the number of notifications
+    sent.
+    """
+    if hasattr(recipient_ids, 'iterator'):
+        recipient_ids = recipient_ids.iterator()
+
+    actor_id = actor.pk if actor is not None else None
+    batch_size = get_batch_size()
+    sent = 0
+    batch = []
+
+    def send(batch):
+        cached_keys = _get_cached_unread_keys(batch)
+        UserNotification.objects.bulk_create([
+            UserNotification(
+                recipient_id=recipient_id,
+                notification_type=notification_type,
+                message=message,
+                actor_id=actor_id,
+                link=link,
+            )
+            for recipient_id in batch
+        ])
+        _update_unread_counts(batch, cached_keys, 1)
+
+    for recipient_id in recipient_ids:
+        if recipient_id == actor_id:
+            continue
+
+        batch.append(recipient_id)
+
+        if len(batch) >= batch_size:
+            send(batch)
+            sent += len(batch)
+            batch = []
+
+    if batch:
+        send(batch)
+        sent += len(batch)
+
+    return sent
+
+
+def get_unread_count(user):
+    key = _get_unread_keys([user.pk])[user.pk]
+    cache = get_cache()
+    count = cache.get(key)
+
+    if count is None:
+        # Later deliveries and reads are added to the cached count, so it
+        # has to start from the primary's.
+        with use_primary():
+            count = UserNotification.objects.filter(
+                recipient=user, is_read=False
+            ).count()
+        cache.add(key, count, get_unread_timeout())
+
+    return count
+
+
+def mark_read(user, notification_ids=None):
+    """
+    Mark the user's notifications with the given ids as read, or all of them
+    if no ids are given, with a single UPDATE. Returns how many notifications
+    were unread.
+    """
+    notifications = UserNotification.objects.filter(
+        recipient=user, is_read=False
+    )
+
+    if notification_ids is not None:
+        notifications = notifications.filter(pk__in=notification_ids)
+
+    cached_keys = _get_cached_unread_keys([user.pk])
+    updated = notifications.update(is_read=True, read_at=timezone.now())
+
+    if updated:
+        _update_unread_counts([user.pk], cached_keys, -updated)
+
+    return updated
@@ -19,3 +19,9 @@ class UserJSONRenderer(ConduitJSONRenderer):
             data['token'] = token.decode('utf-8')
 
         return super(UserJSONRenderer, self).render(data)
+
+
+class NotificationJSONRenderer(ConduitJSONRenderer):
+    object_label = 'notification'
+    pagination_object_label = 'notifications'
+    pagination_count_label = 'notificationsCount'
@@ -2,12 +2,14 @@ from django.contrib.auth import authenticate
 
 from rest_framework import serializers
 
+from conduit.apps.core.metrics import TimedSerializerMixin
 from conduit.apps.profiles.serializers import ProfileSerializer
 
-from .models import User
+from .models import User, UserNotification
 
 
-class RegistrationSerializer(serializers.ModelSerializer):
+class RegistrationSerializer(TimedSerializerMixin,
+                             serializers.ModelSerializer):
     """Serializers registration requests and creates a new user."""
 
     # Ensure passwords are at least 8 characters long, no longer than 128
@@ -33,7 +35,7 @@ class RegistrationSerializer(serializers.ModelSerializer):
         return User.objects.create_user(**validated_data)
 
 
-class LoginSerializer(serializers.Serializer):
+class LoginSerializer(TimedSerializerMixin, serializers.Serializer):
     email = serializers.CharField(max_length=255)
     username = serializers.CharField(max_length=255, read_only=True)
     password = serializers.CharField(max_length=128, write_only=True)
@@ -88,15 +90,17 @@ class LoginSerializer(serializers.Serializer):
 
         # The `validate` method should return a dictionary of validated data.
         # This is the data that is passed to the `create` and `update` methods
-        # that we will see later on.
+        # that we will see later on. `user` is not one of our fields, so it
+        # is not rendered, but it lets the view know who logged in.
         return {
             'email': user.email,
             'username': user.username,
-            'token': user.token
+            'token': user.token,
+            'user': user
         }
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Handles serialization and deserialization of User objects."""
 
     # Passwords must be at least 8 characters, but no more than 128 
@@ -174,3 +178,32 @@ class UserSerializer(serializers.ModelSerializer):
         instance.profile.save()
 
         return instance
+
+
+class NotificationSerializer(TimedSerializerMixin,
+                             serializers.ModelSerializer):
+    type = serializers.CharField(source='notification_type', read_only=True)
+    actor = serializers.SerializerMethodField()
+    isRead = serializers.BooleanField(source='is_read', read_only=True)
+    createdAt = serializers.SerializerMethodField(method_name='get_created_at')
+
+    class Meta:
+        model = UserNotification
+        fields = ('id', 'type', 'message', 'actor', 'link', 'isRead',
+                  'createdAt')
+
+    def get_actor(self, instance):
+        if instance.actor is None:
+            return None
+
+        return instance.actor.username
+
+    def get_created_at(self, instance):
+        return instance.created_at.isoformat()
+
+
+class NotificationMarkReadSerializer(serializers.Serializer):
+    # Without a list of ids, every notification is marked as read.
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_null=True
+    )
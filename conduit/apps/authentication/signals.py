@@ -1,9 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
+from conduit.apps.articles.feeds import get_fanout_max_followers
+from conduit.apps.articles.models import Article, Comment
 from conduit.apps.profiles.models import Profile
 
+from .cache import invalidate_user
 from .models import User
+from .notifications import notify
 
 @receiver(post_save, sender=User)
 def create_related_profile(sender, instance, created, *args, **kwargs):
@@ -13,3 +17,94 @@ def create_related_profile(sender, instance, created, *args, **kwargs):
     # has a profile.
     if instance and created:
         instance.profile = Profile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, *args, **kwargs):
+    # Deactivating a user, changing their password or any other change to
+    # the user must be seen by `JWTAuthentication` straight away.
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_cached_user_profile(sender, instance, *args, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=Article)
+def notify_followers_of_article(sender, instance, created, *args, **kwargs):
+    if not created or not instance.is_published:
+        return
+
+    author = instance.author
+    followers = Profile.follows.through.objects.filter(to_profile_id=author.pk)
+
+    # Like their feeds, the followers of popular authors are not written to
+    # one by one while the article is saved. They see it in their feed.
+    if followers.count() >= get_fanout_max_followers():
+        return
+
+    notify(
+        followers.values_list('from_profile__user_id', flat=True),
+        'article',
+        '{} published "{}"'.format(author.user.username, instance.title),
+        actor=author.user,
+        link='/article/{}'.format(instance.slug)
+    )
+
+
+def _notify_followed(follower, recipient_ids):
+    notify(
+        recipient_ids, 'follow',
+        '{} started following you'.format(follower.user.username),
+        actor=follower.user,
+        link='/profile/{}'.format(follower.user.username)
+    )
+
+
+@receiver(m2m_changed, sender=Profile.follows.through)
+def notify_followed_profiles(sender, instance, action, reverse, pk_set,
+                             *args, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+
+    if reverse:
+        # `followee.followed_by.add(*followers)`
+        followers = Profile.objects.filter(
+            pk__in=pk_set
+        ).select_related('user')
+
+        for follower in followers:
+            _notify_followed(follower, [instance.user_id])
+    else:
+        # `follower.follows.add(*followees)`
+        _notify_followed(instance, Profile.objects.filter(
+            pk__in=pk_set
+        ).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Comment)
+def notify_of_comment(sender, instance, created, *args, **kwargs):
+    if not created:
+        return
+
+    actor = instance.author.user
+    article = instance.article
+    link = '/article/{}'.format(article.slug)
+
+    notify(
+        [article.author.user_id], 'comment',
+        '{} commented on "{}"'.format(actor.username, article.title),
+        actor=actor, link=link
+    )
+
+    if instance.parent_id is not None:
+        notify(
+            [instance.parent.author.user_id], 'reply',
+            '{} replied to your comment on "{}"'.format(
+                actor.username, article.title
+            ),
+            actor=actor, link=link
+        )
@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.authentication import activity
+from conduit.apps.authentication.models import User, UserActivityLog
+
+
+@override_settings(ACTIVITY_LOG_FLUSH_INTERVAL=3600)
+class ActivityLogTests(TestCase):
+    def setUp(self):
+        self.log = activity.ActivityLog()
+        self.user = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        )
+
+    def test_flush_writes_queued_events(self):
+        self.log.log(self.user, 'login')
+        self.log.log(self.user, 'logout')
+        self.log.flush()
+
+        self.assertEqual(
+            sorted(UserActivityLog.objects.values_list(
+                'activity_type', flat=True
+            )),
+            ['login', 'logout']
+        )
+        self.assertEqual(self.log.get_stats()['written'], 2)
+
+    def test_events_are_not_written_to_another_database(self):
+        self.log.log(self.user, 'login')
+
+        # What the test runner does once the tests are done.
+        with mock.patch.object(
+            activity, 'get_database_name', return_value='db.sqlite3'
+        ), self.assertLogs(activity.logger, 'WARNING'):
+            self.log.flush()
+
+        self.assertFalse(UserActivityLog.objects.exists())
+        self.assertEqual(self.log.get_stats()['failed'], 1)
+        self.assertEqual(self.log.get_stats()['pending'], 0)
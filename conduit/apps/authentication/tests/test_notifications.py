@@ -0,0 +1,122 @@
+import json
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.articles.models import Article
+from conduit.apps.authentication import notifications
+from conduit.apps.authentication.models import User, UserNotification
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        )
+
+    def notify(self, count=1):
+        for _ in range(count):
+            notifications.notify([self.user.pk], 'follow', 'Hello')
+
+    def post_read(self, data):
+        return self.client.post(
+            '/api/user/notifications/read', json.dumps(data),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.user.token)
+        )
+
+    def test_unread_count_follows_changes(self):
+        self.notify(3)
+        self.assertEqual(notifications.get_unread_count(self.user), 3)
+
+        self.notify()
+        first = UserNotification.objects.filter(recipient=self.user).first()
+        notifications.mark_read(self.user, [first.pk])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(notifications.get_unread_count(self.user), 3)
+
+        notifications.mark_read(self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(notifications.get_unread_count(self.user), 0)
+
+    def test_counts_that_miss_a_change_are_not_kept(self):
+        # A count that started before the notification was delivered, and
+        # is stored once it was.
+        key = notifications._get_unread_keys([self.user.pk])[self.user.pk]
+        self.notify()
+        cache.add(key, 0)
+
+        self.assertEqual(notifications.get_unread_count(self.user), 1)
+
+    def test_mark_read(self):
+        self.notify(2)
+        first = UserNotification.objects.filter(recipient=self.user).first()
+
+        response = self.post_read({'ids': [first.pk]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.loads(response.content.decode())['unreadCount'], 1
+        )
+
+    def test_mark_read_rejects_ids_that_are_not_numbers(self):
+        self.notify()
+
+        response = self.post_read({'ids': ['abc']})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(notifications.get_unread_count(self.user), 1)
+
+    def test_unread_keys_are_created_in_one_round_trip(self):
+        users = [
+            User.objects.create_user(
+                'user{}'.format(number), 'user{}@example.com'.format(number),
+                'password'
+            )
+            for number in range(3)
+        ]
+        store = notifications.get_cache()
+        store.clear()
+
+        with mock.patch.object(store, 'add') as add:
+            with mock.patch.object(
+                store, 'set_many', wraps=store.set_many
+            ) as set_many:
+                keys = notifications._get_unread_keys(
+                    [user.pk for user in users]
+                )
+
+        self.assertFalse(add.called)
+        self.assertEqual(set_many.call_count, 1)
+        self.assertEqual(
+            notifications._get_unread_keys([user.pk for user in users]), keys
+        )
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=2)
+    def test_followers_of_popular_authors_are_not_notified(self):
+        author = User.objects.create_user(
+            'author', 'author@example.com', 'password'
+        ).profile
+        self.user.profile.follow(author)
+
+        def publish(title):
+            Article.objects.create(
+                author=author, title=title, description='Description',
+                body='Body'
+            )
+
+        publish('First')
+        self.assertEqual(notifications.get_unread_count(self.user), 1)
+
+        User.objects.create_user(
+            'bob', 'bob@example.com', 'password'
+        ).profile.follow(author)
+        publish('Second')
+        self.assertEqual(notifications.get_unread_count(self.user), 1)
@@ -0,0 +1,88 @@
+import json
+
+from django.test import TestCase
+
+from conduit.apps.authentication import cache as auth_cache
+from conduit.apps.authentication.models import User
+from conduit.apps.profiles.models import Profile
+
+
+class UserUpdateTests(TestCase):
+    def setUp(self):
+        auth_cache.local_cache.clear()
+        self.addCleanup(auth_cache.local_cache.clear)
+
+        self.user = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        )
+        self.headers = {
+            'HTTP_AUTHORIZATION': 'Token {}'.format(self.user.token),
+        }
+
+    def update(self, data):
+        return self.client.put(
+            '/api/user', json.dumps({'user': data}),
+            content_type='application/json', **self.headers
+        )
+
+    def test_updates_do_not_write_back_cached_values(self):
+        # Cache the user, then change them behind the cache's back, as
+        # another process would.
+        response = self.client.get('/api/user', **self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        User.objects.filter(pk=self.user.pk).update(email='new@jake.jake')
+        Profile.objects.filter(user=self.user).update(bio='New bio')
+
+        response = self.update({'username': 'jacob'})
+
+        self.assertEqual(response.status_code, 200)
+
+        self.user.refresh_from_db()
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.username, 'jacob')
+        self.assertEqual(self.user.email, 'new@jake.jake')
+        self.assertEqual(self.user.profile.bio, 'New bio')
+
+
+class CachedUserTests(TestCase):
+    def setUp(self):
+        auth_cache.local_cache.clear()
+        self.addCleanup(auth_cache.local_cache.clear)
+
+        self.user = User.objects.create_user(
+            'jake', 'jake@jake.jake', 'password'
+        )
+        self.headers = {
+            'HTTP_AUTHORIZATION': 'Token {}'.format(self.user.token),
+        }
+
+    def test_secrets_are_not_cached(self):
+        auth_cache.get_user(self.user.pk)
+        cached = auth_cache.local_cache.get(
+            auth_cache.USER_KEY.format(self.user.pk)
+        )
+
+        self.assertNotIn(self.user.password, cached[0])
+
+        with self.assertNumQueries(0):
+            user = auth_cache.get_user(self.user.pk)
+
+        self.assertEqual(
+            (user.username, user.email, user.profile.bio),
+            ('jake', 'jake@jake.jake', '')
+        )
+
+        # Anything else is loaded when it is used.
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('password'))
+
+    def test_deactivated_users_can_not_authenticate(self):
+        response = self.client.get('/api/user', **self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get('/api/user', **self.headers)
+        self.assertEqual(response.status_code, 403)
@@ -1,11 +1,18 @@
 from django.conf.urls import url
 
 from .views import (
-    LoginAPIView, RegistrationAPIView, UserRetrieveUpdateAPIView
+    LoginAPIView, NotificationListAPIView, NotificationMarkReadAPIView,
+    NotificationUnreadCountAPIView, RegistrationAPIView,
+    UserRetrieveUpdateAPIView
 )
 
 urlpatterns = [
     url(r'^user/?$', UserRetrieveUpdateAPIView.as_view()),
+    url(r'^user/notifications/?$', NotificationListAPIView.as_view()),
+    url(r'^user/notifications/unread/?$',
+        NotificationUnreadCountAPIView.as_view()),
+    url(r'^user/notifications/read/?$',
+        NotificationMarkReadAPIView.as_view()),
     url(r'^users/?$', RegistrationAPIView.as_view()),
     url(r'^users/login/?$', LoginAPIView.as_view()),
 ]
@@ -1,12 +1,16 @@
 from rest_framework import status
-from rest_framework.generics import RetrieveUpdateAPIView
+from rest_framework.generics import ListAPIView, RetrieveUpdateAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .renderers import UserJSONRenderer
+from .activity import log_activity
+from .models import User, UserNotification
+from .notifications import get_unread_count, mark_read
+from .renderers import NotificationJSONRenderer, UserJSONRenderer
 from .serializers import (
-    LoginSerializer, RegistrationSerializer, UserSerializer
+    LoginSerializer, NotificationMarkReadSerializer, NotificationSerializer,
+    RegistrationSerializer, UserSerializer
 )
 
 
@@ -44,6 +48,8 @@ class LoginAPIView(APIView):
         serializer = self.serializer_class(data=user)
         serializer.is_valid(raise_exception=True)
 
+        log_activity(serializer.validated_data['user'], 'login', request)
+
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -63,23 +69,72 @@ class UserRetrieveUpdateAPIView(RetrieveUpdateAPIView):
     def update(self, request, *args, **kwargs):
         user_data = request.data.get('user', {})
 
+        # `request.user` may come from the authentication cache and be a
+        # little out of date. Saving it would write the old values back, so
+        # update a fresh copy.
+        user = User.objects.select_related('profile').get(pk=request.user.pk)
+
         serializer_data = {
-            'username': user_data.get('username', request.user.username),
-            'email': user_data.get('email', request.user.email),
+            'username': user_data.get('username', user.username),
+            'email': user_data.get('email', user.email),
 
             'profile': {
-                'bio': user_data.get('bio', request.user.profile.bio),
-                'image': user_data.get('image', request.user.profile.image)
+                'bio': user_data.get('bio', user.profile.bio),
+                'image': user_data.get('image', user.profile.image)
             }
         }
 
         # Here is that serialize, validate, save pattern we talked about
         # before.
         serializer = self.serializer_class(
-            request.user, data=serializer_data, partial=True
+            user, data=serializer_data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
+        log_activity(request.user, 'profile_update', request)
+
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+
+
+class NotificationListAPIView(ListAPIView):
+    permission_classes = (IsAuthenticated,)
+    queryset = UserNotification.objects.select_related('actor')
+    renderer_classes = (NotificationJSONRenderer,)
+    serializer_class = NotificationSerializer
+
+    def get_queryset(self):
+        queryset = self.queryset.filter(recipient=self.request.user)
+
+        if self.request.query_params.get('unread', None) in ('1', 'true'):
+            queryset = queryset.filter(is_read=False)
+
+        return queryset
+
+
+class NotificationUnreadCountAPIView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        # The count is kept in the cache, so this doesn't touch the
+        # notifications table.
+        return Response({
+            'unreadCount': get_unread_count(request.user)
+        }, status=status.HTTP_200_OK)
+
+
+class NotificationMarkReadAPIView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    serializer_class = NotificationMarkReadSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        mark_read(request.user, serializer.validated_data.get('ids'))
+
+        return Response({
+            'unreadCount': get_unread_count(request.user)
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    A small, thread-safe, in-process LRU cache.
+
+    Entries expire `timeout` seconds after they were set. Once the cache
+    holds `max_size` entries, setting a new one evicts the least recently
+    used entry.
+    """
+
+    def __init__(self, max_size=1024, timeout=60):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, None)
+
+            if entry is None:
+                return default
+
+            value, expires_at = entry
+
+            if expires_at <= time.time():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key, value, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+
+        with self._lock:
+            self._entries[key] = (value, time.time() + timeout)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,98 @@
+"""
+JSON encoders used by `ConduitJSONRenderer`.
+
+Each encoder turns a Python object into UTF-8 encoded JSON bytes. The
+`CONDUIT_JSON_ENCODER` setting picks one by name. With the default,
+`'auto'`, the fastest library that is installed is used, falling back to
+the standard library.
+
+Values none of the libraries know how to encode natively (lazy translation
+strings, decimals, querysets, ...) are handed to Django REST Framework's
+`JSONEncoder.default`, so every encoder accepts the same input.
+"""
+import json
+
+from collections import OrderedDict
+
+from django.conf import settings
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class StdlibJSONEncoder(object):
+    name = 'json'
+
+    def __init__(self):
+        # Escaping non-ASCII characters is noticeably faster than writing
+        # them out as they are, with both this library and `ujson`.
+        self._encoder = JSONEncoder(separators=(',', ':'))
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj).encode('ascii')
+
+
+class OrjsonEncoder(object):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._option = orjson.OPT_NON_STR_KEYS
+        self._default = JSONEncoder().default
+
+    def dumps(self, obj):
+        return self._dumps(obj, default=self._default, option=self._option)
+
+
+class UjsonEncoder(object):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+
+        self._dumps = ujson.dumps
+        self._default = JSONEncoder().default
+
+    def dumps(self, obj):
+        return self._dumps(obj, default=self._default).encode('ascii')
+
+
+# In order of preference for `'auto'`.
+ENCODERS = OrderedDict([
+    (OrjsonEncoder.name, OrjsonEncoder),
+    (UjsonEncoder.name, UjsonEncoder),
+    (StdlibJSONEncoder.name, StdlibJSONEncoder),
+])
+
+_encoders = {}
+
+
+def get_available_encoders():
+    """Returns an instance of every encoder whose library is installed."""
+    available = []
+
+    for encoder_class in ENCODERS.values():
+        try:
+            available.append(encoder_class())
+        except ImportError:
+            pass
+
+    return available
+
+
+def get_encoder(name=None):
+    """
+    Returns the encoder called `name`, or the one chosen by the
+    `CONDUIT_JSON_ENCODER` setting if `name` is not given.
+    """
+    if name is None:
+        name = getattr(settings, 'CONDUIT_JSON_ENCODER', 'auto')
+
+    if name not in _encoders:
+        if name == 'auto':
+            _encoders[name] = get_available_encoders()[0]
+        else:
+            _encoders[name] = ENCODERS[name]()
+
+    return _encoders[name]
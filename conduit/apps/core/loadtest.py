@@ -0,0 +1,449 @@
+"""
+Drives mixed API traffic from concurrent workers and measures it.
+
+Requests go either straight to the WSGI application in `conduit.wsgi`, in
+this process, or over HTTP to a running server. In-process runs also count
+the database queries each request makes, and so do runs against a server
+that sends `Server-Timing` headers (see `REQUEST_METRICS_SERVER_TIMING`).
+
+Every worker registers its own user through the API, follows a few
+authors, and then picks scenarios at random, weighted by `SCENARIOS`:
+reading article lists, articles, feeds, profiles, comments and tags, logging
+in, and writing articles and comments.
+"""
+import http.client
+import io
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.db import connections
+
+# Each scenario is a method of `Worker`, and how often it is picked
+# relative to the others.
+SCENARIOS = (
+    ('articles', 30),
+    ('article', 20),
+    ('feed', 10),
+    ('profile', 10),
+    ('comments', 10),
+    ('tags', 5),
+    ('login', 5),
+    ('create_article', 5),
+    ('create_comment', 5),
+)
+
+PASSWORD = 'loadtest-password'
+
+
+class Response(object):
+    def __init__(self, status, body, queries=None):
+        self.status = status
+        self.body = body
+        self.queries = queries
+
+    def json(self):
+        return json.loads(self.body.decode('utf-8'))
+
+
+class WSGIClient(object):
+    """Calls the WSGI application directly, without a server."""
+
+    def __init__(self, application):
+        self.application = application
+
+    def start(self):
+        # Keep a log of the queries of every connection this thread uses.
+        # Django empties the log when a request starts, so after a request
+        # it holds exactly that request's queries.
+        for connection in connections.all():
+            connection.force_debug_cursor = True
+
+    def request(self, method, path, data=None, token=None):
+        body = json.dumps(data).encode('utf-8') if data is not None else b''
+        path, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+
+        if token is not None:
+            environ['HTTP_AUTHORIZATION'] = 'Token {}'.format(token)
+
+        statuses = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(int(status.split()[0]))
+
+        result = self.application(environ, start_response)
+
+        try:
+            content = b''.join(result)
+        finally:
+            # Closing the response sends `request_finished`.
+            if hasattr(result, 'close'):
+                result.close()
+
+        queries = sum(
+            len(connection.queries_log) for connection in connections.all()
+        )
+
+        return Response(statuses[0], content, queries)
+
+
+def parse_query_count(server_timing):
+    """
+    Read the number of queries from a `Server-Timing` header sent by
+    `RequestMetricsMiddleware`, if the server has it turned on.
+    """
+    match = re.search(r'db;[^,]*desc="(\d+) queries"', server_timing or '')
+
+    return int(match.group(1)) if match else None
+
+
+class HTTPClient(object):
+    """Sends requests to a running server, one connection per worker."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https'
+            else http.client.HTTPConnection
+        )
+        self.local = threading.local()
+
+    def start(self):
+        self.local.connection = self.connection_class(self.host)
+
+    def request(self, method, path, data=None, token=None):
+        body = json.dumps(data).encode('utf-8') if data is not None else None
+        headers = {'Content-Type': 'application/json'}
+
+        if token is not None:
+            headers['Authorization'] = 'Token {}'.format(token)
+
+        connection = self.local.connection
+
+        try:
+            connection.request(method, self.prefix + path, body, headers)
+            response = connection.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, OSError):
+            # Reconnect next time.
+            connection.close()
+            raise
+
+        return Response(
+            response.status, content,
+            parse_query_count(response.getheader('Server-Timing'))
+        )
+
+
+def percentile(values, fraction):
+    """The nearest-rank percentile of a sorted list."""
+    if not values:
+        return None
+
+    rank = max(int(math.ceil(fraction * len(values))) - 1, 0)
+
+    return values[rank]
+
+
+class Results(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._queries = defaultdict(list)
+        self._errors = defaultdict(int)
+
+    def record(self, name, latency, response=None):
+        with self._lock:
+            self._latencies[name].append(latency)
+
+            if response is None or response.status >= 400:
+                self._errors[name] += 1
+
+            if response is not None and response.queries is not None:
+                self._queries[name].append(response.queries)
+
+    def _summarize(self, latencies, queries, errors, elapsed):
+        latencies = sorted(latencies)
+
+        def milliseconds(value):
+            return round(value * 1000, 3) if value is not None else None
+
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'rps': round(len(latencies) / elapsed, 2),
+            'p50_ms': milliseconds(percentile(latencies, 0.50)),
+            'p95_ms': milliseconds(percentile(latencies, 0.95)),
+            'p99_ms': milliseconds(percentile(latencies, 0.99)),
+            'max_ms': milliseconds(latencies[-1] if latencies else None),
+            'queries_per_request': (
+                round(float(sum(queries)) / len(queries), 2)
+                if queries else None
+            ),
+        }
+
+    def summarize(self, elapsed):
+        """
+        Returns a dict with the figures for every scenario under
+        `endpoints`, and for all of them together under `total`.
+        """
+        elapsed = max(elapsed, 1e-6)
+
+        with self._lock:
+            endpoints = dict(
+                (name, self._summarize(
+                    self._latencies[name], self._queries[name],
+                    self._errors[name], elapsed
+                ))
+                for name in sorted(self._latencies)
+            )
+            total = self._summarize(
+                [value for values in self._latencies.values()
+                 for value in values],
+                [value for values in self._queries.values()
+                 for value in values],
+                sum(self._errors.values()), elapsed
+            )
+
+        return {'endpoints': endpoints, 'total': total}
+
+
+class Worker(object):
+    def __init__(self, run, index):
+        self.run = run
+        self.client = run.client
+        self.rng = random.Random('{}:{}'.format(run.seed, index))
+        self.username = 'loadtest_{}_{}'.format(run.run_id, index)
+        self.email = '{}@loadtest.invalid'.format(self.username)
+        self.token = None
+
+    def setup(self):
+        response = self.client.request('POST', '/api/users', {'user': {
+            'username': self.username,
+            'email': self.email,
+            'password': PASSWORD,
+        }})
+
+        if response.status != 201:
+            raise RuntimeError('Could not register {}: {} {}'.format(
+                self.username, response.status, response.body[:200]
+            ))
+
+        self.token = response.json()['user']['token']
+
+        # Make sure there is something to read on an empty database.
+        if not self.run.slugs:
+            self.create_article()
+
+        for author in self.rng.sample(
+            self.run.authors, min(3, len(self.run.authors))
+        ):
+            self.client.request(
+                'POST', '/api/profiles/{}/follow'.format(author),
+                token=self.token
+            )
+
+    def pick_slug(self):
+        return self.rng.choice(self.run.slugs) if self.run.slugs else 'none'
+
+    def articles(self):
+        return self.client.request('GET', '/api/articles?limit=20')
+
+    def article(self):
+        return self.client.request(
+            'GET', '/api/articles/{}'.format(self.pick_slug())
+        )
+
+    def feed(self):
+        return self.client.request(
+            'GET', '/api/articles/feed?limit=20', token=self.token
+        )
+
+    def profile(self):
+        author = self.rng.choice(self.run.authors or [self.username])
+
+        return self.client.request(
+            'GET', '/api/profiles/{}'.format(author), token=self.token
+        )
+
+    def comments(self):
+        return self.client.request(
+            'GET', '/api/articles/{}/comments'.format(self.pick_slug())
+        )
+
+    def tags(self):
+        return self.client.request('GET', '/api/tags')
+
+    def login(self):
+        return self.client.request('POST', '/api/users/login', {'user': {
+            'email': self.email,
+            'password': PASSWORD,
+        }})
+
+    def create_article(self):
+        number = self.rng.randint(0, 10 ** 9)
+        response = self.client.request('POST', '/api/articles', {'article': {
+            'title': 'Load test article {}'.format(number),
+            'description': 'Written by the load test.',
+            'body': 'Paragraph {}.\n'.format(number) * 20,
+            'tagList': self.rng.sample(self.run.tag_names, 2),
+        }}, token=self.token)
+
+        if response.status == 201:
+            self.run.slugs.append(response.json()['article']['slug'])
+
+        return response
+
+    def create_comment(self):
+        return self.client.request(
+            'POST', '/api/articles/{}/comments'.format(self.pick_slug()),
+            {'comment': {'body': 'A comment from the load test.'}},
+            token=self.token
+        )
+
+    def work(self):
+        self.client.start()
+        self.setup()
+        self.run.ready.wait()
+
+        names = [scenario[0] for scenario in self.run.scenarios]
+        weights = [scenario[1] for scenario in self.run.scenarios]
+
+        while self.run.take():
+            name = self.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+
+            try:
+                response = getattr(self, name)()
+            except Exception:
+                response = None
+
+            self.run.results.record(
+                name, time.perf_counter() - started, response
+            )
+
+
+class LoadTest(object):
+    def __init__(self, client, concurrency=8, requests=1000, duration=None,
+                 scenarios=None, seed=0):
+        self.client = client
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration = duration
+        self.seed = seed
+        self.run_id = '{:x}'.format(random.Random().getrandbits(32))
+        self.scenarios = [
+            scenario for scenario in SCENARIOS
+            if scenarios is None or scenario[0] in scenarios
+        ]
+        self.results = Results()
+        self.ready = threading.Event()
+        self.workers = []
+
+        self.slugs = []
+        self.authors = []
+        self.tag_names = ['loadtest{}'.format(number) for number in range(20)]
+
+        self._lock = threading.Lock()
+        self._remaining = requests
+        self._deadline = None
+
+    def take(self):
+        """Whether a worker should send another request."""
+        if self._deadline is not None:
+            return time.perf_counter() < self._deadline
+
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+
+            self._remaining -= 1
+
+            return True
+
+    def discover(self):
+        """Find existing articles and authors to read."""
+        self.client.start()
+        response = self.client.request('GET', '/api/articles?limit=100')
+
+        if response.status != 200:
+            raise RuntimeError('Could not list articles: {} {}'.format(
+                response.status, response.body[:200]
+            ))
+
+        articles = response.json()['articles']
+        self.slugs.extend(article['slug'] for article in articles)
+        self.authors.extend(sorted(set(
+            article['author']['username'] for article in articles
+        )))
+
+    def run(self):
+        """Run the load test and return `Results.summarize()`."""
+        self.discover()
+
+        errors = []
+
+        def work(worker):
+            try:
+                worker.work()
+            except Exception as error:
+                errors.append(error)
+                # Let the other workers start anyway.
+                self.ready.set()
+
+        self.workers = [
+            Worker(self, index) for index in range(self.concurrency)
+        ]
+        threads = [
+            threading.Thread(target=work, args=(worker,))
+            for worker in self.workers
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        # Wait for every worker to register before the clock starts.
+        while not all(worker.token for worker in self.workers) and not errors:
+            time.sleep(0.01)
+
+        started = time.perf_counter()
+
+        if self.duration is not None:
+            self._deadline = started + self.duration
+
+        self.ready.set()
+
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+        return self.results.summarize(time.perf_counter() - started)
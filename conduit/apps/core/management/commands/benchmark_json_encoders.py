@@ -0,0 +1,112 @@
+import json
+import random
+import timeit
+
+from collections import OrderedDict
+
+from django.core.management.base import BaseCommand
+
+from conduit.apps.articles.renderers import ArticleJSONRenderer
+from conduit.apps.core.encoders import get_available_encoders
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod '
+    'tempor incididunt ut labore et dolore magna aliqua café naïve résumé '
+    'django rest framework serializer renderer article comment profile'
+).split()
+
+
+def make_article(rng, index):
+    """Build a serialized article shaped like `ArticleSerializer`'s output."""
+    def text(words):
+        return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+    title = text(rng.randint(3, 10))
+
+    return OrderedDict([
+        ('author', OrderedDict([
+            ('username', 'author{}'.format(rng.randint(1, 500))),
+            ('bio', text(rng.randint(0, 30))),
+            ('image', 'https://static.productionready.io/images/smiley-cyrus.jpg'),
+            ('following', rng.random() < 0.2),
+        ])),
+        ('body', text(rng.randint(200, 1200))),
+        ('createdAt', '2017-02-{:02d}T10:11:12.123456+00:00'.format(
+            index % 28 + 1
+        )),
+        ('description', text(rng.randint(10, 30))),
+        ('favorited', rng.random() < 0.1),
+        ('favoritesCount', rng.randint(0, 5000)),
+        ('slug', '-'.join(title.split()) + '-abc123'),
+        ('tagList', [rng.choice(WORDS) for _ in range(rng.randint(0, 6))]),
+        ('title', title),
+        ('updatedAt', '2017-02-{:02d}T10:11:12.123456+00:00'.format(
+            index % 28 + 1
+        )),
+    ])
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the JSON encoders available to ConduitJSONRenderer on '
+        'pages of realistic articles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size', type=int, action='append', dest='page_sizes',
+            help='Articles per page. Can be given more than once. '
+                 'Defaults to 20 and 100.'
+        )
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        iterations = options['iterations']
+
+        for page_size in options['page_sizes'] or [20, 100]:
+            data = OrderedDict([
+                ('count', 100000),
+                ('results', [make_article(rng, i) for i in range(page_size)]),
+            ])
+
+            # What the renderer used to do: build an envelope and encode it
+            # with the standard library in one go. The response encodes the
+            # returned string to bytes afterwards, so we include that here.
+            def render_baseline():
+                return json.dumps({
+                    'articles': data['results'],
+                    'articlesCount': data['count'],
+                }).encode('utf-8')
+
+            candidates = [('json (previous renderer)', render_baseline)]
+
+            for encoder in get_available_encoders():
+                renderer = ArticleJSONRenderer()
+                renderer.encoder = encoder.name
+                candidates.append(
+                    (encoder.name, lambda renderer=renderer: renderer.render(data))
+                )
+
+            size = len(candidates[-1][1]())
+            self.stdout.write('Page of {} articles ({:.1f} KB):'.format(
+                page_size, size / 1024.0
+            ))
+
+            baseline = None
+
+            for name, render in candidates:
+                seconds = min(timeit.repeat(
+                    render, number=iterations, repeat=3
+                )) / iterations
+
+                if baseline is None:
+                    baseline = seconds
+
+                self.stdout.write(
+                    '  {:<26} {:8.3f} ms/page  {:8.1f} MB/s  {:5.2f}x'.format(
+                        name, seconds * 1000, size / seconds / 1024 / 1024,
+                        baseline / seconds
+                    )
+                )
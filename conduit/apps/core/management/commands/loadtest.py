@@ -0,0 +1,139 @@
+import json
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from conduit.apps.authentication.models import User
+from conduit.apps.core.loadtest import (
+    HTTPClient, LoadTest, SCENARIOS, WSGIClient
+)
+
+COLUMNS = (
+    ('requests', 'reqs'), ('errors', 'errors'), ('rps', 'req/s'),
+    ('p50_ms', 'p50 ms'), ('p95_ms', 'p95 ms'), ('p99_ms', 'p99 ms'),
+    ('queries_per_request', 'queries'),
+)
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure latency, throughput and queries per request of the API '
+        'under mixed read and write traffic. Without --url, requests go to '
+        'the WSGI application in this process and write to the configured '
+        'database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Base URL of a running server, e.g. http://localhost:8000. '
+                 'Queries per request are only counted if the server sends '
+                 'Server-Timing headers.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=8,
+            help='Number of concurrent workers.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Total number of requests to send.'
+        )
+        parser.add_argument(
+            '--duration', type=float,
+            help='Send requests for this many seconds instead.'
+        )
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            choices=[scenario[0] for scenario in SCENARIOS],
+            help='Only run this scenario. Can be given more than once.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed for the choices the workers make.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file, or to standard '
+                 'output if it is "-".'
+        )
+        parser.add_argument(
+            '--keep-data', action='store_true',
+            help='Keep the users, articles and comments created by an '
+                 'in-process run.'
+        )
+
+    def handle(self, *args, **options):
+        if options['url']:
+            client = HTTPClient(options['url'])
+        else:
+            from conduit.wsgi import application
+            client = WSGIClient(application)
+
+        load_test = LoadTest(
+            client,
+            concurrency=options['concurrency'],
+            requests=options['requests'],
+            duration=options['duration'],
+            scenarios=options['scenarios'],
+            seed=options['seed'],
+        )
+        started_at = timezone.now()
+
+        try:
+            results = load_test.run()
+        except Exception as error:
+            raise CommandError('Load test failed: {}'.format(error))
+        finally:
+            if not options['url'] and not options['keep_data']:
+                # Deleting the users deletes everything they wrote.
+                User.objects.filter(username__startswith='loadtest_{}_'.format(
+                    load_test.run_id
+                )).delete()
+
+        results['meta'] = {
+            'commit': get_commit(),
+            'started_at': started_at.isoformat(),
+            'mode': 'http' if options['url'] else 'wsgi',
+            'url': options['url'],
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'duration': options['duration'],
+            'seed': options['seed'],
+            'scenarios': [scenario[0] for scenario in load_test.scenarios],
+        }
+
+        if options['output'] == '-':
+            self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+            return
+
+        self.write_table(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+
+    def write_table(self, results):
+        rows = sorted(results['endpoints'].items())
+        rows.append(('total', results['total']))
+
+        self.stdout.write('{:<16}'.format('scenario') + ''.join(
+            '{:>10}'.format(title) for key, title in COLUMNS
+        ))
+
+        for name, figures in rows:
+            self.stdout.write('{:<16}'.format(name) + ''.join(
+                '{:>10}'.format(
+                    '-' if figures[key] is None else figures[key]
+                )
+                for key, title in COLUMNS
+            ))
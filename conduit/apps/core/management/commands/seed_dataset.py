@@ -0,0 +1,71 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from conduit.apps.articles.categories import category_tree
+from conduit.apps.articles.tags import tag_directory
+from conduit.apps.core.seeding import DatasetGenerator, SIZES
+
+# Signals don't run for the generated rows, so everything they would have
+# kept up to date is rebuilt afterwards. Home feeds are left out: they hold
+# up to `FEED_INBOX_SIZE` entries per user, which takes far longer to write
+# than the dataset itself.
+REBUILD_COMMANDS = (
+    'rebuild_profile_statistics',
+    'reconcile_rating_aggregates',
+    'rebuild_search_index',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a large, skewed synthetic dataset of users, articles, '
+        'tags, comments, follows, favorites, ratings and activity. The same '
+        'seed on an empty database always generates the same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', choices=list(SIZES), default='small',
+            help='How much data to generate. "large" has a million '
+                 'articles.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed for the random generators.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Number of rows to insert at a time.'
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Do not rebuild statistics, rating aggregates and the '
+                 'search index afterwards.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.time()
+        generator = DatasetGenerator(
+            size=options['size'],
+            seed=options['seed'],
+            chunk_size=options['chunk_size'],
+            log=self.stdout.write,
+        )
+        created = generator.generate()
+
+        tag_directory.invalidate()
+        category_tree.invalidate()
+
+        if not options['skip_rebuild']:
+            for name in REBUILD_COMMANDS:
+                self.stdout.write('Running {}.'.format(name))
+                call_command(name, stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Created {} rows in {:.0f} seconds. Run rebuild_feeds to '
+            'materialize home feeds.'.format(
+                sum(created.values()), time.time() - started
+            )
+        ))
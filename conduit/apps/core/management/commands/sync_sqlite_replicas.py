@@ -0,0 +1,101 @@
+import os
+import shutil
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from conduit.apps.core.routers import get_replicas
+
+
+def copy_database(source, target):
+    """
+    Copy the SQLite database `source` to `target` as of one moment, even
+    while it is being written to. The copy replaces `target` in one step, so
+    connections that have it open keep reading the old copy until they
+    reconnect.
+    """
+    temporary = '{}.{}.tmp'.format(target, os.getpid())
+    primary = sqlite3.connect(source)
+
+    try:
+        if hasattr(primary, 'backup'):
+            copy = sqlite3.connect(temporary)
+
+            try:
+                primary.backup(copy)
+            finally:
+                copy.close()
+        else:
+            # Without the backup API, hold off writers while copying. Move
+            # anything in the write-ahead log into the file first.
+            primary.execute('PRAGMA wal_checkpoint(FULL)')
+            primary.execute('BEGIN IMMEDIATE')
+
+            try:
+                shutil.copyfile(source, temporary)
+            finally:
+                primary.rollback()
+    finally:
+        primary.close()
+
+    os.replace(temporary, target)
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database over the SQLite read replicas in '
+        '`DATABASE_REPLICAS`, once or every few seconds. Meant for trying '
+        'replica routing locally.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append', dest='databases',
+            help='Only sync this replica. Can be given more than once.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Keep syncing, waiting this many seconds in between. The '
+                 'replicas then lag behind by up to this long.'
+        )
+
+    def handle(self, *args, **options):
+        source = settings.DATABASES[DEFAULT_DB_ALIAS]
+        aliases = options['databases'] or get_replicas()
+
+        if not source['ENGINE'].endswith('sqlite3'):
+            raise CommandError('The primary database is not SQLite.')
+
+        for alias in aliases:
+            if alias not in get_replicas():
+                raise CommandError('{} is not a replica.'.format(alias))
+
+            if not settings.DATABASES[alias]['ENGINE'].endswith('sqlite3'):
+                raise CommandError('{} is not SQLite.'.format(alias))
+
+        if not aliases:
+            self.stdout.write(
+                'There are no replicas. List their files in '
+                'CONDUIT_SQLITE_REPLICAS.'
+            )
+            return
+
+        while True:
+            for alias in aliases:
+                started = time.time()
+                target = settings.DATABASES[alias]['NAME']
+
+                connections[alias].close()
+                copy_database(source['NAME'], target)
+
+                self.stdout.write('Synced {} to {} in {:.2f}s.'.format(
+                    alias, target, time.time() - started
+                ))
+
+            if options['interval'] is None:
+                return
+
+            time.sleep(options['interval'])
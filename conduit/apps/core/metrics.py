@@ -0,0 +1,259 @@
+"""
+Per-request metrics: wall time, database queries and time, serializer time
+and response size, aggregated per view.
+
+`RequestMetricsMiddleware` starts a `RequestMetrics` for each request and
+makes it current for the thread handling it. Database cursors are wrapped
+so that every query adds to the current metrics, and serializers using
+`TimedSerializerMixin` add the time they spend building representations.
+Work done outside a request, or on another thread, is not counted.
+
+When the request is done its metrics are added to `view_stats`, which keeps
+a latency histogram and running totals for every view. Recording a request
+takes one lock and a handful of additions, so it can stay on in production.
+"""
+import bisect
+import threading
+import time
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.utils import CursorWrapper
+
+# The upper bounds, in milliseconds, of the latency histogram buckets. The
+# last bucket holds everything slower.
+HISTOGRAM_BUCKETS = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000,
+)
+
+_local = threading.local()
+
+
+def is_enabled():
+    return getattr(settings, 'REQUEST_METRICS_ENABLED', True)
+
+
+class RequestMetrics(object):
+    __slots__ = (
+        'started', 'queries', 'db_time', 'serializer_time', 'serializing',
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def start_request():
+    _local.metrics = RequestMetrics()
+    instrument_connections()
+
+    return _local.metrics
+
+
+def finish_request():
+    _local.metrics = None
+
+
+def get_current_metrics():
+    """The `RequestMetrics` of the request this thread is handling, if any."""
+    return getattr(_local, 'metrics', None)
+
+
+class TimedCursorWrapper(CursorWrapper):
+    """Adds every query to the current request's metrics."""
+
+    def _timed(self, method, *args):
+        metrics = get_current_metrics()
+
+        if metrics is None:
+            return method(*args)
+
+        started = time.perf_counter()
+
+        try:
+            return method(*args)
+        finally:
+            metrics.queries += 1
+            metrics.db_time += time.perf_counter() - started
+
+    def callproc(self, procname, params=None):
+        return self._timed(self.cursor.callproc, procname, params)
+
+    def execute(self, sql, params=None):
+        return self._timed(self.cursor.execute, sql, params)
+
+    def executemany(self, sql, param_list):
+        return self._timed(self.cursor.executemany, sql, param_list)
+
+
+def instrument_connections():
+    """
+    Wrap the cursors of this thread's database connections, whether or not
+    queries are being logged. Connections only need wrapping once.
+    """
+    for connection in connections.all():
+        if getattr(connection, '_metrics_instrumented', False):
+            continue
+
+        def wrap(make_cursor, connection=connection):
+            return lambda cursor: TimedCursorWrapper(
+                make_cursor(cursor), connection
+            )
+
+        connection.make_cursor = wrap(connection.make_cursor)
+        connection.make_debug_cursor = wrap(connection.make_debug_cursor)
+        connection._metrics_instrumented = True
+
+
+class TimedSerializerMixin(object):
+    """
+    Adds the time spent in `to_representation` to the current request's
+    metrics. Nested serializers are only counted once, as part of the
+    outermost one. This includes any queries run while serializing.
+    """
+
+    def to_representation(self, instance):
+        metrics = get_current_metrics()
+
+        if metrics is None or metrics.serializing:
+            return super(TimedSerializerMixin, self).to_representation(
+                instance
+            )
+
+        metrics.serializing = True
+        started = time.perf_counter()
+
+        try:
+            return super(TimedSerializerMixin, self).to_representation(
+                instance
+            )
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics.serializing = False
+
+
+def get_view_name(view_func, method):
+    """
+    Name a view after its class and, for viewsets, the action handling the
+    method, e.g. "ArticleViewSet.list" or "ArticlesFeedAPIView.get".
+    """
+    view_class = getattr(view_func, 'cls', None) or getattr(
+        view_func, 'view_class', None
+    )
+    method = method.lower()
+
+    if view_class is None:
+        return '{}.{}'.format(view_func.__module__, view_func.__name__)
+
+    actions = getattr(view_func, 'actions', None) or {}
+
+    return '{}.{}'.format(view_class.__name__, actions.get(method, method))
+
+
+class _ViewStatistics(object):
+    __slots__ = (
+        'count', 'errors', 'time', 'max_time', 'queries', 'db_time',
+        'serializer_time', 'size', 'buckets',
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.time = 0.0
+        self.max_time = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.size = 0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    def percentile(self, fraction):
+        """The upper bound of the bucket holding the given percentile."""
+        rank = fraction * self.count
+        seen = 0
+
+        for index, count in enumerate(self.buckets):
+            seen += count
+
+            if seen >= rank and count:
+                if index < len(HISTOGRAM_BUCKETS):
+                    return HISTOGRAM_BUCKETS[index]
+
+                return round(self.max_time * 1000, 3)
+
+        return None
+
+    def as_dict(self):
+        count = max(self.count, 1)
+
+        def milliseconds(value):
+            return round(value * 1000, 3)
+
+        return OrderedDict([
+            ('count', self.count),
+            ('errors', self.errors),
+            ('mean_ms', milliseconds(self.time / count)),
+            ('p50_ms', self.percentile(0.50)),
+            ('p95_ms', self.percentile(0.95)),
+            ('p99_ms', self.percentile(0.99)),
+            ('max_ms', milliseconds(self.max_time)),
+            ('mean_queries', round(float(self.queries) / count, 2)),
+            ('mean_db_ms', milliseconds(self.db_time / count)),
+            ('mean_serializer_ms', milliseconds(self.serializer_time / count)),
+            ('mean_size', self.size // count),
+            ('histogram', OrderedDict(
+                [('le_{}ms'.format(bound), self.buckets[index])
+                 for index, bound in enumerate(HISTOGRAM_BUCKETS)] +
+                [('slower', self.buckets[-1])]
+            )),
+        ])
+
+
+class ViewStats(object):
+    """Latency histograms and totals per view, for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, metrics, elapsed, status_code, size):
+        bucket = bisect.bisect_left(HISTOGRAM_BUCKETS, elapsed * 1000)
+
+        with self._lock:
+            stats = self._views.get(view_name)
+
+            if stats is None:
+                stats = self._views[view_name] = _ViewStatistics()
+
+            stats.count += 1
+            stats.errors += status_code >= 500
+            stats.time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.queries += metrics.queries
+            stats.db_time += metrics.db_time
+            stats.serializer_time += metrics.serializer_time
+            stats.size += size
+            stats.buckets[bucket] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return OrderedDict(
+                (name, self._views[name].as_dict())
+                for name in sorted(self._views)
+            )
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+
+view_stats = ViewStats()
@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import routers
+from .metrics import (
+    finish_request, get_view_name, is_enabled, start_request, view_stats
+)
+
+# Requests that did not reach a view, e.g. because no url matched.
+UNRESOLVED = '<unresolved>'
+
+
+def format_server_timing(view_name, metrics, elapsed, size):
+    def milliseconds(value):
+        return '{:.1f}'.format(value * 1000)
+
+    return ', '.join([
+        'total;dur={}'.format(milliseconds(elapsed)),
+        'db;dur={};desc="{} queries"'.format(
+            milliseconds(metrics.db_time), metrics.queries
+        ),
+        'serializer;dur={}'.format(milliseconds(metrics.serializer_time)),
+        'view;desc="{}"'.format(view_name),
+        'size;desc="{} bytes"'.format(size),
+    ])
+
+
+class RequestMetricsMiddleware(object):
+    """
+    Measures every request and adds it to the per-view statistics in
+    `conduit.apps.core.metrics.view_stats`. With
+    `REQUEST_METRICS_SERVER_TIMING` on, the measurements are also sent back
+    in a `Server-Timing` header.
+
+    This should come first in `MIDDLEWARE`, so that the time spent in the
+    other middleware is counted too.
+    """
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.server_timing = getattr(
+            settings, 'REQUEST_METRICS_SERVER_TIMING', False
+        )
+
+    def __call__(self, request):
+        metrics = start_request()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            finish_request()
+
+        elapsed = metrics.elapsed
+        view_name = getattr(request, '_metrics_view_name', UNRESOLVED)
+
+        # The length of a streaming response is not known without consuming
+        # it.
+        size = 0 if response.streaming else len(response.content)
+
+        view_stats.record(
+            view_name, metrics, elapsed, response.status_code, size
+        )
+
+        if self.server_timing:
+            response['Server-Timing'] = format_server_timing(
+                view_name, metrics, elapsed, size
+            )
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view_name = get_view_name(view_func, request.method)
+
+
+class ReplicaPinningMiddleware(object):
+    """
+    Lets `conduit.apps.core.routers.ReplicaRouter` send the reads of safe
+    requests to a replica. Clients that wrote something in the last
+    `REPLICA_PIN_SECONDS` read from the primary instead, until the replicas
+    have caught up.
+    """
+
+    def __init__(self, get_response):
+        if not routers.get_replicas():
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+
+    def __call__(self, request):
+        replica = None
+
+        if (request.method in routers.SAFE_METHODS and
+                routers.PIN_COOKIE_NAME not in request.COOKIES):
+            replica = routers.choose_replica()
+
+        routers.start_request(replica)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.finish_request()
+
+        if wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE_NAME, '1', max_age=self.pin_seconds,
+                httponly=True
+            )
+
+        return response
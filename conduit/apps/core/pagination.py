@@ -0,0 +1,148 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination with an opt-in keyset (cursor) mode.
+
+    Offset pagination needs a `COUNT(*)` on every request and gets slower the
+    deeper the client pages. Clients that send a `cursor` query parameter
+    (empty for the first page) are instead paginated on `(created_at, id)`,
+    which matches the default ordering of `TimestampedModel`. Every page then
+    costs the same indexed range scan, and the response carries opaque
+    `next_cursor` and `previous_cursor` values instead of offsets.
+
+    In cursor mode the count is an estimate: it is cached for
+    `CURSOR_PAGINATION_COUNT_TIMEOUT` seconds, or left out entirely if that
+    setting is `None`.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+
+        if not self.cursor_mode:
+            return super(LimitOffsetOrCursorPagination, self).paginate_queryset(
+                queryset, request, view
+            )
+
+        self.limit = self.get_limit(request)
+        self.count = self.get_estimated_count(queryset)
+
+        position = self.decode_cursor(request)
+
+        if position is None:
+            is_reversed = False
+            queryset = queryset.order_by('-created_at', '-pk')
+        else:
+            created_at, pk, is_reversed = position
+
+            # `created_at <= x AND NOT (created_at = x AND id >= y)` selects
+            # the same rows as `(created_at, id) < (x, y)`, but lets the
+            # database do a range scan on the `(created_at, id)` index.
+            if is_reversed:
+                queryset = queryset.filter(
+                    Q(created_at__gte=created_at) &
+                    ~Q(created_at=created_at, pk__lte=pk)
+                ).order_by('created_at', 'pk')
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lte=created_at) &
+                    ~Q(created_at=created_at, pk__gte=pk)
+                ).order_by('-created_at', '-pk')
+
+        # Fetch one extra row so we know whether there is another page in the
+        # direction we are moving without having to run a second query.
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+
+        if is_reversed:
+            results.reverse()
+
+        self.next_cursor = None
+        self.previous_cursor = None
+
+        if results:
+            if has_more or is_reversed:
+                self.next_cursor = self.encode_cursor(results[-1], False)
+
+            if (has_more and is_reversed) or (
+                    position is not None and not is_reversed):
+                self.previous_cursor = self.encode_cursor(results[0], True)
+
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super(
+                LimitOffsetOrCursorPagination, self
+            ).get_paginated_response(data)
+
+        response_data = OrderedDict([
+            ('results', data),
+            ('next_cursor', self.next_cursor),
+            ('previous_cursor', self.previous_cursor),
+        ])
+
+        if self.count is not None:
+            response_data['count'] = self.count
+
+        return Response(response_data)
+
+    def get_estimated_count(self, queryset):
+        timeout = getattr(settings, 'CURSOR_PAGINATION_COUNT_TIMEOUT', 60)
+
+        if timeout is None:
+            return None
+
+        sql = str(queryset.order_by().query).encode('utf-8')
+        key = 'pagination:count:{}'.format(hashlib.md5(sql).hexdigest())
+        count = cache.get(key)
+
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, timeout)
+
+        return count
+
+    def encode_cursor(self, instance, is_reversed):
+        position = json.dumps([
+            instance.created_at.isoformat(), instance.pk, int(is_reversed)
+        ])
+
+        return base64.urlsafe_b64encode(position.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param, '')
+
+        if not encoded:
+            return None
+
+        try:
+            position = base64.urlsafe_b64decode(encoded.encode('ascii'))
+            created_at, pk, is_reversed = json.loads(position.decode('utf-8'))
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return created_at, pk, bool(is_reversed)
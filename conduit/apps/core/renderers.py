@@ -1,20 +1,27 @@
-import json
+import io
 
 from rest_framework.renderers import JSONRenderer
 
+from .encoders import get_encoder
+
 
 class ConduitJSONRenderer(JSONRenderer):
     charset = 'utf-8'
     object_label = 'object'
     pagination_object_label = 'objects'
     pagination_object_count = 'count'
+    pagination_next_cursor_label = 'nextCursor'
+    pagination_previous_cursor_label = 'prevCursor'
+
+    # The name of the encoder from `conduit.apps.core.encoders` to use, or
+    # `None` to use the one chosen by the `CONDUIT_JSON_ENCODER` setting.
+    encoder = None
 
     def render(self, data, media_type=None, renderer_context=None):
+        encoder = get_encoder(self.encoder)
+
         if data.get('results', None) is not None:
-            return json.dumps({
-                self.pagination_object_label: data['results'],
-                self.pagination_count_label: data['count']
-            })
+            return self.render_paginated(encoder, data)
 
         # If the view throws an error (such as the user can't be authenticated
         # or something similar), `data` will contain an `errors` key. We want
@@ -24,6 +31,44 @@ class ConduitJSONRenderer(JSONRenderer):
             return super(ConduitJSONRenderer, self).render(data)
 
         else:
-            return json.dumps({
-                self.object_label: data
-            })
+            return b''.join([
+                b'{', encoder.dumps(self.object_label), b':',
+                encoder.dumps(data), b'}'
+            ])
+
+    def render_paginated(self, encoder, data):
+        # List pages can be large, so the results are encoded and written
+        # straight into one buffer together with the labels, instead of
+        # first building another dictionary around them and encoding that.
+        # Encoding the results in a single call is faster than encoding each
+        # object separately with every encoder we support.
+        buffer = io.BytesIO()
+        buffer.write(b'{')
+        buffer.write(encoder.dumps(self.pagination_object_label))
+        buffer.write(b':')
+        buffer.write(encoder.dumps(data['results']))
+
+        extra = []
+
+        # Cursor paginated responses only include a count when an estimate
+        # is available, and carry cursors instead of offsets.
+        if data.get('count', None) is not None:
+            extra.append((self.pagination_count_label, data['count']))
+
+        if 'next_cursor' in data:
+            extra.append(
+                (self.pagination_next_cursor_label, data['next_cursor'])
+            )
+            extra.append(
+                (self.pagination_previous_cursor_label, data['previous_cursor'])
+            )
+
+        for label, value in extra:
+            buffer.write(b',')
+            buffer.write(encoder.dumps(label))
+            buffer.write(b':')
+            buffer.write(encoder.dumps(value))
+
+        buffer.write(b'}')
+
+        return buffer.getvalue()
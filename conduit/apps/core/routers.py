@@ -0,0 +1,195 @@
+"""
+Sends the reads of safe requests to read replicas and everything else to
+the primary database.
+
+`ReplicaPinningMiddleware` picks a replica for each GET, HEAD or OPTIONS
+request, from the aliases in `DATABASE_REPLICAS` that are no more than
+`REPLICA_MAX_LAG_SECONDS` behind. `ReplicaRouter` then sends the request's
+reads there, until the request writes something: from then on it is pinned
+to the primary, so it reads its own writes. Reads inside a transaction, in
+requests that change things, and outside requests altogether (management
+commands, signals fired from them) always use the primary, and so does code
+that fills caches shared between requests, inside `use_primary()`.
+
+After a request writes, the client is also pinned to the primary for
+`REPLICA_PIN_SECONDS` with a cookie, so the next pages it loads don't miss
+the write while the replicas catch up.
+
+Only SQLite replicas report how far behind they are, from the modification
+times of their files and the primary's. Others are assumed to be current.
+"""
+import os
+import random
+import threading
+import time
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE_NAME = 'conduit_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_local = threading.local()
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def _modified(path):
+    """When a SQLite file, or its write-ahead log, last changed."""
+    times = [
+        os.path.getmtime(name) for name in (path, path + '-wal')
+        if os.path.exists(name)
+    ]
+
+    return max(times) if times else None
+
+
+def get_sqlite_lag(primary_path, replica_path):
+    """
+    How many seconds the SQLite copy at `replica_path` may be behind the
+    database at `primary_path`, or None if there is no copy.
+    """
+    replica_modified = _modified(replica_path)
+
+    if replica_modified is None:
+        return None
+
+    # A copy made after the last write is current. Otherwise it has been
+    # missing writes for at most as long as it has existed.
+    if (_modified(primary_path) or 0) <= replica_modified:
+        return 0
+
+    return max(time.time() - replica_modified, 0)
+
+
+def get_replica_lag(alias):
+    """
+    How many seconds the replica `alias` may be behind the primary, or None
+    if it can't be used at all.
+    """
+    replica = settings.DATABASES[alias]
+
+    if not replica['ENGINE'].endswith('sqlite3'):
+        return 0
+
+    return get_sqlite_lag(
+        settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'], replica['NAME']
+    )
+
+
+def choose_replica():
+    """A random replica that is not too far behind, or None."""
+    max_lag = getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 5)
+    replicas = get_replicas()
+    random.shuffle(replicas)
+
+    for alias in replicas:
+        lag = get_replica_lag(alias)
+
+        if lag is not None and lag <= max_lag:
+            return alias
+
+    return None
+
+
+def start_request(replica=None):
+    _local.replica = replica
+    _local.wrote = False
+    _local.primary_depth = 0
+
+    # Tests run every request inside a transaction of their own, so only
+    # transactions opened during the request count. See `in_transaction`.
+    connection = connections[DEFAULT_DB_ALIAS]
+    _local.outer_atomic = connection.in_atomic_block
+    _local.outer_savepoints = len(connection.savepoint_ids)
+
+
+def finish_request():
+    """Returns whether the request wrote to the primary."""
+    wrote = getattr(_local, 'wrote', False)
+    _local.replica = None
+    _local.wrote = False
+
+    return wrote
+
+
+def pin_to_primary():
+    """Send the rest of the current request's reads to the primary."""
+    _local.wrote = True
+
+
+@contextmanager
+def use_primary():
+    """
+    Read from the primary inside the block. Anything that fills a cache
+    shared with other requests has to, or it could store what a lagging
+    replica returned under a version that says it is current.
+    """
+    _local.primary_depth = getattr(_local, 'primary_depth', 0) + 1
+
+    try:
+        yield
+    finally:
+        _local.primary_depth -= 1
+
+
+def in_transaction():
+    """Whether the current request opened a transaction on the primary."""
+    connection = connections[DEFAULT_DB_ALIAS]
+
+    if not connection.in_atomic_block:
+        return False
+
+    return not getattr(_local, 'outer_atomic', False) or (
+        len(connection.savepoint_ids) > getattr(_local, 'outer_savepoints', 0)
+    )
+
+
+def get_read_replica():
+    """The replica the current thread reads from, or None for the primary."""
+    replica = getattr(_local, 'replica', None)
+
+    if (replica is None or getattr(_local, 'wrote', False) or
+            getattr(_local, 'primary_depth', 0)):
+        return None
+
+    # A transaction on the primary has to see its own changes.
+    if in_transaction():
+        return None
+
+    return replica
+
+
+class ReplicaRouter(object):
+    def db_for_read(self, model, **hints):
+        # Related objects of an instance read from the primary come from the
+        # primary too.
+        instance = hints.get('instance')
+
+        if instance is not None and instance._state.db == DEFAULT_DB_ALIAS:
+            return DEFAULT_DB_ALIAS
+
+        return get_read_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary.
+        databases = set([DEFAULT_DB_ALIAS] + get_replicas())
+
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, schema and all.
+        return db not in get_replicas()
@@ -0,0 +1,413 @@
+"""
+Generates large synthetic datasets for reproducing scaling problems.
+
+Rows are built in memory a chunk at a time and written with `bulk_create`,
+including the through tables of follows, favorites and tags, so no signals
+run. Primary keys are assigned up front, which lets later tables refer to
+earlier ones without reading anything back.
+
+The data is skewed the way real data is: a few authors write most of the
+articles and have most of the followers, a few articles get most of the
+comments, favorites and ratings, and a few tags are on most articles. Every
+table draws from its own random generator derived from the seed, so the
+same seed on an empty database always produces the same data.
+"""
+import datetime
+import json
+import random
+import time
+
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+
+from conduit.apps.articles.models import Article, ArticleRating, Comment, Tag
+from conduit.apps.authentication.models import User, UserActivityLog
+from conduit.apps.profiles.models import Profile
+
+Follow = Profile.follows.through
+Favorite = Profile.favorites.through
+ArticleTag = Article.tags.through
+
+# `follows`, `favorites` and `ratings` are averages per user. The others are
+# totals.
+SIZES = OrderedDict([
+    ('small', {
+        'users': 1000, 'articles': 10000, 'tags': 100, 'comments': 30000,
+        'follows': 20, 'favorites': 10, 'ratings': 5, 'activity': 20000,
+    }),
+    ('medium', {
+        'users': 10000, 'articles': 100000, 'tags': 500,
+        'comments': 300000, 'follows': 30, 'favorites': 20, 'ratings': 10,
+        'activity': 200000,
+    }),
+    ('large', {
+        'users': 100000, 'articles': 1000000, 'tags': 2000,
+        'comments': 3000000, 'follows': 40, 'favorites': 30, 'ratings': 10,
+        'activity': 2000000,
+    }),
+])
+
+# Articles are spread evenly over this period, oldest first.
+START = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+PERIOD = datetime.timedelta(days=730)
+
+PASSWORD = 'password'
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod '
+    'tempor incididunt ut labore et dolore magna aliqua enim ad minim '
+    'veniam quis nostrud exercitation ullamco laboris nisi aliquip ex ea '
+    'commodo consequat duis aute irure in reprehenderit voluptate velit'
+).split()
+
+SCORE_WEIGHTS = (5, 10, 20, 35, 30)
+
+ACTIVITY_WEIGHTS = (
+    ('article_view', 70), ('login', 15), ('article_create', 5),
+    ('article_edit', 5), ('profile_update', 3), ('logout', 2),
+)
+
+
+def skewed(rng, n, exponent):
+    """
+    A random index below `n`. Small indexes are picked far more often than
+    large ones, the more so the larger `exponent` is; 1 is uniform.
+    """
+    return min(int(n * rng.random() ** exponent), n - 1)
+
+
+def skewed_count(rng, average, maximum):
+    """A Pareto distributed count with roughly the given average."""
+    alpha = 1.5
+    count = int(rng.paretovariate(alpha) * average * (alpha - 1) / alpha)
+
+    return min(count, maximum)
+
+
+def text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Make `auto_now` and `auto_now_add` fields of `models` keep the values
+    they are given, so that generated rows can be spread out over time.
+    This changes the fields for the whole process while it is active.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or
+        getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+class DatasetGenerator(object):
+    def __init__(self, size='small', seed=0, chunk_size=5000, log=None,
+                 counts=None):
+        # `counts` overrides some of the figures of `size`.
+        self.counts = dict(SIZES[size], **(counts or {}))
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.log = log or (lambda message: None)
+        self.created = Counter()
+
+        self.user_start = self._next_pk(User)
+        self.profile_start = self._next_pk(Profile)
+        self.article_start = self._next_pk(Article)
+        self.comment_start = self._next_pk(Comment)
+        self.tag_ids = []
+
+    def _next_pk(self, model):
+        return (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+
+    def _rng(self, name):
+        return random.Random('{}:{}'.format(self.seed, name))
+
+    def _insert(self, model, rows, name=None):
+        name = name or model._meta.db_table
+        started = time.time()
+        batch = []
+
+        for row in rows:
+            batch.append(row)
+
+            if len(batch) >= self.chunk_size:
+                model.objects.bulk_create(batch)
+                self.created[name] += len(batch)
+                batch = []
+
+        if batch:
+            model.objects.bulk_create(batch)
+            self.created[name] += len(batch)
+
+        elapsed = max(time.time() - started, 1e-6)
+        self.log('Created {} {} ({:.0f} rows/s).'.format(
+            self.created[name], name, self.created[name] / elapsed
+        ))
+
+    def _profile_id(self, index):
+        return self.profile_start + index
+
+    def _article_id(self, index):
+        return self.article_start + index
+
+    def _user_time(self, index):
+        return START + PERIOD * index / max(self.counts['users'], 1)
+
+    def _article_time(self, index):
+        return START + PERIOD * index / max(self.counts['articles'], 1)
+
+    def generate(self):
+        """Generate the whole dataset. Returns the rows created per table."""
+        with explicit_timestamps(User, Profile, Article, Comment,
+                                 ArticleRating):
+            self.create_users()
+            self.create_tags()
+            self.create_articles()
+            self.create_comments()
+            self.create_follows()
+            self.create_favorites()
+            self.create_ratings()
+            self.create_activity()
+
+        self.reset_sequences()
+
+        return self.created
+
+    def create_users(self):
+        rng = self._rng('users')
+        password = make_password(PASSWORD)
+
+        def users():
+            for index in range(self.counts['users']):
+                pk = self.user_start + index
+                joined = self._user_time(index)
+
+                yield User(
+                    pk=pk, username='seed{}'.format(pk),
+                    email='seed{}@example.com'.format(pk),
+                    password=password, created_at=joined, updated_at=joined
+                )
+
+        def profiles():
+            for index in range(self.counts['users']):
+                yield Profile(
+                    pk=self._profile_id(index),
+                    user_id=self.user_start + index,
+                    bio=text(rng, rng.randint(0, 20)),
+                    created_at=self._user_time(index),
+                    updated_at=self._user_time(index)
+                )
+
+        self._insert(User, users())
+        self._insert(Profile, profiles())
+
+    def create_tags(self):
+        names = [
+            'topic{}'.format(index) for index in range(self.counts['tags'])
+        ]
+        self.tag_ids = [
+            tag.pk for tag in Tag.objects.get_or_create_many(names)
+        ]
+        self.created['tags'] += len(self.tag_ids)
+
+    def create_articles(self):
+        rng = self._rng('articles')
+        users = self.counts['users']
+
+        def articles():
+            for index in range(self.counts['articles']):
+                pk = self._article_id(index)
+                created_at = self._article_time(index)
+
+                yield Article(
+                    pk=pk, slug='seed-article-{}'.format(pk),
+                    title=text(rng, rng.randint(3, 10)).capitalize(),
+                    description=text(rng, rng.randint(10, 30)),
+                    body='\n\n'.join(
+                        text(rng, rng.randint(20, 80))
+                        for _ in range(rng.randint(1, 6))
+                    ),
+                    author_id=self._profile_id(skewed(rng, users, 2)),
+                    view_count=skewed_count(rng, 100, 10 ** 6),
+                    created_at=created_at, updated_at=created_at
+                )
+
+        def article_tags():
+            tags = len(self.tag_ids)
+
+            for index in range(self.counts['articles']):
+                for tag_index in set(
+                    skewed(rng, tags, 3) for _ in range(rng.randint(0, 5))
+                ):
+                    yield ArticleTag(
+                        article_id=self._article_id(index),
+                        tag_id=self.tag_ids[tag_index]
+                    )
+
+        self._insert(Article, articles())
+
+        if self.tag_ids:
+            self._insert(ArticleTag, article_tags())
+
+    def create_comments(self):
+        rng = self._rng('comments')
+        articles = self.counts['articles']
+        users = self.counts['users']
+
+        # The latest comment on each article, for replies.
+        latest = {}
+
+        def comments():
+            for index in range(self.counts['comments']):
+                pk = self.comment_start + index
+                article_index = skewed(rng, articles, 3)
+                created_at = self._article_time(article_index) + (
+                    datetime.timedelta(days=30) * rng.random()
+                )
+                parent_id = None
+
+                if article_index in latest and rng.random() < 0.3:
+                    parent_id = latest[article_index]
+
+                latest[article_index] = pk
+
+                yield Comment(
+                    pk=pk, article_id=self._article_id(article_index),
+                    author_id=self._profile_id(rng.randrange(users)),
+                    parent_id=parent_id, body=text(rng, rng.randint(5, 60)),
+                    created_at=created_at, updated_at=created_at
+                )
+
+        if articles and users:
+            self._insert(Comment, comments())
+
+    def _pairs(self, rng, average, targets, exponent, exclude_self=False):
+        """
+        For each profile index, yields it with a skewed number of distinct,
+        skewed target indexes below `targets`.
+        """
+        maximum = max(targets - 1, 0)
+
+        for index in range(self.counts['users']):
+            count = skewed_count(rng, average, maximum)
+            chosen = set()
+
+            # Popular targets come up again and again, so give up on the
+            # count rather than drawing until a rare one turns up.
+            for _ in range(count * 4):
+                if len(chosen) >= count:
+                    break
+
+                target = skewed(rng, targets, exponent)
+
+                if not (exclude_self and target == index):
+                    chosen.add(target)
+
+            for target in sorted(chosen):
+                yield index, target
+
+    def create_follows(self):
+        rng = self._rng('follows')
+        users = self.counts['users']
+
+        self._insert(Follow, (
+            Follow(
+                from_profile_id=self._profile_id(follower),
+                to_profile_id=self._profile_id(followee)
+            )
+            for follower, followee in self._pairs(
+                rng, self.counts['follows'], users, 3, exclude_self=True
+            )
+        ), name='follows')
+
+    def create_favorites(self):
+        rng = self._rng('favorites')
+
+        self._insert(Favorite, (
+            Favorite(
+                profile_id=self._profile_id(profile),
+                article_id=self._article_id(article)
+            )
+            for profile, article in self._pairs(
+                rng, self.counts['favorites'], self.counts['articles'], 3
+            )
+        ), name='favorites')
+
+    def create_ratings(self):
+        rng = self._rng('ratings')
+
+        def ratings():
+            for profile, article in self._pairs(
+                rng, self.counts['ratings'], self.counts['articles'], 3
+            ):
+                created_at = self._article_time(article) + (
+                    datetime.timedelta(days=60) * rng.random()
+                )
+
+                yield ArticleRating(
+                    article_id=self._article_id(article),
+                    profile_id=self._profile_id(profile),
+                    score=rng.choices(range(1, 6), SCORE_WEIGHTS)[0],
+                    created_at=created_at, updated_at=created_at
+                )
+
+        self._insert(ArticleRating, ratings())
+
+    def create_activity(self):
+        rng = self._rng('activity')
+        types = [name for name, weight in ACTIVITY_WEIGHTS]
+        weights = [weight for name, weight in ACTIVITY_WEIGHTS]
+        users = self.counts['users']
+        articles = self.counts['articles']
+
+        def events():
+            for index in range(self.counts['activity']):
+                activity_type = rng.choices(types, weights)[0]
+                metadata = {}
+
+                if activity_type.startswith('article_') and articles:
+                    metadata['article_id'] = self._article_id(
+                        skewed(rng, articles, 3)
+                    )
+
+                yield UserActivityLog(
+                    user_id=self.user_start + skewed(rng, users, 1.5),
+                    activity_type=activity_type,
+                    metadata=json.dumps(metadata) if metadata else '',
+                    created_at=START + PERIOD * rng.random()
+                )
+
+        if users:
+            self._insert(UserActivityLog, events())
+
+    def reset_sequences(self):
+        """
+        Inserting explicit primary keys does not advance the sequences that
+        some databases use to pick the next one, so move them past the new
+        rows.
+        """
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Profile, Article, Comment]
+        )
+
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,254 @@
+"""
+Query and memory budgets for API routes.
+
+A `RouteBudget` declares the most queries, and the most memory in KiB, that
+one request to a route may take. `QueryBudgetTestCase.assertWithinBudget`
+requests the route at each of its page sizes, with cold caches, and fails if
+any request goes over budget or if the number of queries grows with the
+page size, which is what an N+1 query looks like.
+
+Failures list the queries of the largest page grouped by the line of
+project code that ran them, so the culprit is easy to find.
+"""
+import os
+import re
+import sys
+import tracemalloc
+
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.utils import CursorWrapper
+from django.test import TestCase
+
+import conduit
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(conduit.__file__))
+
+# Frames in these files are never reported as call sites.
+IGNORED_FILES = (
+    os.path.join(PROJECT_ROOT, 'apps', 'core', 'metrics.py'),
+    os.path.abspath(__file__),
+)
+
+RecordedQuery = namedtuple('RecordedQuery', ('sql', 'call_site'))
+
+Measurement = namedtuple('Measurement', (
+    'page_size', 'status_code', 'queries', 'peak_kib',
+))
+
+
+class RouteBudget(namedtuple('RouteBudget', (
+    'path', 'max_queries', 'max_kib', 'page_sizes', 'authenticated',
+))):
+    """
+    `path` may contain "{limit}", which is filled in with each of
+    `page_sizes` in turn. Routes without pages leave `page_sizes` empty.
+    """
+
+    def __new__(cls, path, max_queries, max_kib, page_sizes=(),
+                authenticated=False):
+        return super(RouteBudget, cls).__new__(
+            cls, path, max_queries, max_kib, tuple(page_sizes),
+            authenticated
+        )
+
+
+def get_call_site():
+    """The innermost frame of project code that is not this harness."""
+    # Walk the frames rather than using `traceback`, which reads the source
+    # of every file on the stack and would count towards the memory used.
+    frame = sys._getframe(1)
+
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+
+        if filename.startswith(PROJECT_ROOT) and filename not in IGNORED_FILES:
+            return '{}:{} in {}'.format(
+                os.path.relpath(filename, os.path.dirname(PROJECT_ROOT)),
+                frame.f_lineno, frame.f_code.co_name
+            )
+
+        frame = frame.f_back
+
+    return '<outside the project>'
+
+
+class RecordingCursorWrapper(CursorWrapper):
+    def __init__(self, cursor, db, queries):
+        super(RecordingCursorWrapper, self).__init__(cursor, db)
+        self.queries = queries
+
+    def _record(self, sql):
+        self.queries.append(RecordedQuery(sql, get_call_site()))
+
+    def callproc(self, procname, params=None):
+        self._record('CALL {}'.format(procname))
+        return self.cursor.callproc(procname, params)
+
+    def execute(self, sql, params=None):
+        self._record(sql)
+        return self.cursor.execute(sql, params)
+
+    def executemany(self, sql, param_list):
+        self._record(sql)
+        return self.cursor.executemany(sql, param_list)
+
+
+@contextmanager
+def record_queries():
+    """
+    Collects a `RecordedQuery` for every query run on this thread's
+    connections while the block runs.
+    """
+    queries = []
+    saved = []
+
+    for connection in connections.all():
+        saved.append((
+            connection, connection.make_cursor, connection.make_debug_cursor
+        ))
+
+        def wrap(make_cursor, connection=connection):
+            return lambda cursor: RecordingCursorWrapper(
+                make_cursor(cursor), connection, queries
+            )
+
+        connection.make_cursor = wrap(connection.make_cursor)
+        connection.make_debug_cursor = wrap(connection.make_debug_cursor)
+
+    try:
+        yield queries
+    finally:
+        for connection, make_cursor, make_debug_cursor in saved:
+            connection.make_cursor = make_cursor
+            connection.make_debug_cursor = make_debug_cursor
+
+
+def group_by_call_site(queries):
+    """
+    Returns an ordered dict of call site to an ordered dict of SQL to the
+    number of times it ran there, busiest call site first.
+    """
+    groups = OrderedDict()
+
+    for query in queries:
+        # Collapse `IN (%s, %s, ...)` so that the same query with different
+        # numbers of parameters is grouped together.
+        sql = re.sub(r'\((?:%s, )+%s\)', '(%s, ...)', query.sql)
+        statements = groups.setdefault(query.call_site, OrderedDict())
+        statements[sql] = statements.get(sql, 0) + 1
+
+    return OrderedDict(sorted(
+        groups.items(), key=lambda item: -sum(item[1].values())
+    ))
+
+
+def format_queries(queries):
+    lines = []
+
+    for call_site, statements in group_by_call_site(queries).items():
+        lines.append('  {} ({} queries)'.format(
+            call_site, sum(statements.values())
+        ))
+
+        for sql, count in statements.items():
+            lines.append('    {}x {}'.format(count, sql))
+
+    return '\n'.join(lines)
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Subclasses seed their data in `setUpTestData` and set `token` to the JWT
+    of the user that authenticated routes are requested as.
+    """
+
+    token = None
+
+    def request_route(self, path, authenticated=False):
+        headers = {}
+
+        if authenticated:
+            headers['HTTP_AUTHORIZATION'] = 'Token {}'.format(self.token)
+
+        return self.client.get(path, **headers)
+
+    def measure(self, budget, page_size=None):
+        path = budget.path.format(limit=page_size)
+
+        # Start every request from empty caches, so that cached results
+        # don't hide queries.
+        for cache in caches.all():
+            cache.clear()
+
+        tracemalloc.start()
+
+        try:
+            with record_queries() as queries:
+                response = self.request_route(path, budget.authenticated)
+
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return Measurement(page_size, response.status_code, queries,
+                           peak // 1024)
+
+    def assertWithinBudget(self, budget):
+        page_sizes = budget.page_sizes or [None]
+
+        # Authentication results are cached in memory for a while, and some
+        # modules are only imported by the first request that needs them.
+        # Get both out of the way so that only the route itself is measured.
+        for page_size in page_sizes:
+            self.request_route(
+                budget.path.format(limit=page_size), budget.authenticated
+            )
+
+        measurements = [
+            self.measure(budget, page_size)
+            for page_size in page_sizes
+        ]
+        largest = measurements[-1]
+        problems = []
+
+        for measurement in measurements:
+            label = budget.path.format(limit=measurement.page_size)
+
+            if measurement.status_code != 200:
+                problems.append('{} returned {}.'.format(
+                    label, measurement.status_code
+                ))
+
+            if len(measurement.queries) > budget.max_queries:
+                problems.append('{} ran {} queries, the budget is {}.'.format(
+                    label, len(measurement.queries), budget.max_queries
+                ))
+
+            if measurement.peak_kib > budget.max_kib:
+                problems.append('{} used {} KiB, the budget is {}.'.format(
+                    label, measurement.peak_kib, budget.max_kib
+                ))
+
+        counts = [len(measurement.queries) for measurement in measurements]
+
+        if max(counts) > counts[0]:
+            problems.append(
+                'The number of queries changes with the page size: {}.'.format(
+                    ', '.join(
+                        'limit={}: {}'.format(measurement.page_size, count)
+                        for measurement, count in zip(measurements, counts)
+                    )
+                )
+            )
+
+        if problems:
+            self.fail('\n'.join(problems + [
+                'Queries for {}:'.format(
+                    budget.path.format(limit=largest.page_size)
+                ),
+                format_queries(largest.queries),
+            ]))
@@ -0,0 +1,123 @@
+import io
+
+from django.core.management import call_command
+from django.db.models import Count
+
+from conduit.apps.articles.categories import category_tree
+from conduit.apps.articles.models import Article, Category
+from conduit.apps.articles.tags import tag_directory
+from conduit.apps.authentication.models import User
+from conduit.apps.core.seeding import DatasetGenerator
+from conduit.apps.core.testing import QueryBudgetTestCase, RouteBudget
+
+PAGE_SIZES = (1, 10, 30)
+
+# Enough rows for the largest page of every list, and a few authors with
+# many followers, articles and comments, like the real data.
+DATASET = {
+    'users': 40, 'articles': 120, 'tags': 15, 'comments': 400,
+    'follows': 8, 'favorites': 5, 'ratings': 3, 'activity': 0,
+}
+
+REBUILD_COMMANDS = (
+    'rebuild_profile_statistics', 'reconcile_rating_aggregates',
+    'rebuild_search_index', 'rebuild_feeds',
+)
+
+
+class RouteBudgetTests(QueryBudgetTestCase):
+    """
+    The query and memory budgets of the read-heavy routes. Raise a budget
+    only together with the change that needs it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetGenerator(seed=0, counts=DATASET).generate()
+
+        parent = Category.objects.create(name='Parent', slug='parent')
+        child = Category.objects.create(
+            name='Child', slug='child', parent=parent
+        )
+        Article.objects.filter(pk__in=list(
+            Article.objects.order_by('pk').values_list('pk', flat=True)[:60]
+        )).update(category=child)
+
+        for name in REBUILD_COMMANDS:
+            call_command(name, stdout=io.StringIO())
+
+        tag_directory.invalidate()
+        category_tree.invalidate()
+
+        user = User.objects.annotate(
+            follows=Count('profile__follows')
+        ).order_by('-follows', 'pk').first()
+        cls.token = user.token
+        cls.username = user.username
+        cls.slug = Article.objects.annotate(
+            comment_count=Count('comments')
+        ).order_by('-comment_count', 'pk').values_list('slug', flat=True)[0]
+
+    def test_articles(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/articles?limit={limit}', 5, 1000, PAGE_SIZES
+        ))
+
+    def test_articles_authenticated(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/articles?limit={limit}', 7, 1000, PAGE_SIZES,
+            authenticated=True
+        ))
+
+    def test_articles_by_category(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/articles?category=parent&limit={limit}', 7, 1000,
+            PAGE_SIZES
+        ))
+
+    def test_feed(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/articles/feed?limit={limit}', 8, 1000, PAGE_SIZES,
+            authenticated=True
+        ))
+
+    def test_search(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/articles/search?q=lorem&limit={limit}', 6, 1000, PAGE_SIZES
+        ))
+
+    def test_top_rated(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/articles/top-rated?limit={limit}', 6, 1000, PAGE_SIZES
+        ))
+
+    def test_article(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/articles/{}'.format(self.slug), 6, 250, authenticated=True
+        ))
+
+    def test_comments(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/articles/%s/comments?limit={limit}' % self.slug, 4, 500,
+            PAGE_SIZES, authenticated=True
+        ))
+
+    def test_comment_threads(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/articles/%s/comments?threaded=true&limit={limit}' %
+            self.slug, 4, 500, PAGE_SIZES, authenticated=True
+        ))
+
+    def test_profile(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/profiles/{}'.format(self.username), 3, 150,
+            authenticated=True
+        ))
+
+    def test_tags(self):
+        self.assertWithinBudget(RouteBudget(
+            '/api/tags?limit={limit}', 2, 150, PAGE_SIZES
+        ))
+
+    def test_categories(self):
+        self.assertWithinBudget(RouteBudget('/api/categories', 3, 150))
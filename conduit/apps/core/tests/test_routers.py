@@ -0,0 +1,268 @@
+import os
+import tempfile
+import time
+
+from unittest import mock
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.articles import cache as article_cache
+from conduit.apps.articles.categories import category_tree
+from conduit.apps.articles.feeds import get_pull_author_ids
+from conduit.apps.articles.models import (
+    Article, Category, FeedPullAuthor, Tag
+)
+from conduit.apps.articles.serializers import ArticleSerializer
+from conduit.apps.articles.tags import tag_directory
+from conduit.apps.authentication import cache as auth_cache
+from conduit.apps.authentication.models import User
+from conduit.apps.authentication.notifications import get_unread_count
+from conduit.apps.core import routers
+from conduit.apps.core.middleware import ReplicaPinningMiddleware
+
+# Never connected to: every test fails if a query is sent there.
+REPLICA = 'replica1'
+
+router = routers.ReplicaRouter()
+
+
+class SQLiteLagTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.primary = os.path.join(directory, 'primary.sqlite3')
+        self.replica = os.path.join(directory, 'replica.sqlite3')
+
+        open(self.primary, 'w').close()
+
+    def touch(self, path, modified):
+        if not os.path.exists(path):
+            open(path, 'w').close()
+
+        os.utime(path, (modified, modified))
+
+    def test_missing_copy_is_unusable(self):
+        self.assertIsNone(routers.get_sqlite_lag(self.primary, self.replica))
+
+    def test_copy_made_after_the_last_write_is_current(self):
+        now = time.time()
+        self.touch(self.primary, now - 60)
+        self.touch(self.replica, now - 30)
+
+        self.assertEqual(routers.get_sqlite_lag(self.primary, self.replica), 0)
+
+    def test_copy_older_than_the_last_write_lags_since_it_was_made(self):
+        now = time.time()
+        self.touch(self.replica, now - 30)
+        self.touch(self.primary, now - 10)
+
+        lag = routers.get_sqlite_lag(self.primary, self.replica)
+
+        self.assertGreaterEqual(lag, 30)
+        self.assertLess(lag, 40)
+
+    def test_write_ahead_log_counts_as_a_write(self):
+        now = time.time()
+        self.touch(self.primary, now - 60)
+        self.touch(self.replica, now - 30)
+        self.touch(self.primary + '-wal', now - 10)
+
+        self.assertGreaterEqual(
+            routers.get_sqlite_lag(self.primary, self.replica), 30
+        )
+
+
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        routers.start_request(REPLICA)
+        self.addCleanup(routers.finish_request)
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(router.db_for_read(Article), REPLICA)
+
+    def test_reads_outside_requests_go_to_the_primary(self):
+        routers.finish_request()
+
+        self.assertEqual(router.db_for_read(Article), DEFAULT_DB_ALIAS)
+
+    def test_a_write_pins_the_rest_of_the_request(self):
+        self.assertEqual(router.db_for_write(Article), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_read(Article), DEFAULT_DB_ALIAS)
+        self.assertTrue(routers.finish_request())
+
+    def test_the_next_request_starts_unpinned(self):
+        router.db_for_write(Article)
+        routers.finish_request()
+        routers.start_request(REPLICA)
+
+        self.assertEqual(router.db_for_read(Article), REPLICA)
+        self.assertFalse(routers.finish_request())
+
+    def test_transactions_read_from_the_primary(self):
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Article), DEFAULT_DB_ALIAS)
+
+        self.assertEqual(router.db_for_read(Article), REPLICA)
+
+    def test_use_primary(self):
+        with routers.use_primary():
+            with routers.use_primary():
+                pass
+
+            self.assertEqual(router.db_for_read(Article), DEFAULT_DB_ALIAS)
+
+        self.assertEqual(router.db_for_read(Article), REPLICA)
+
+    def test_relations_of_primary_instances_are_read_from_the_primary(self):
+        article = Article(pk=1)
+        article._state.db = DEFAULT_DB_ALIAS
+
+        self.assertEqual(
+            router.db_for_read(Tag, instance=article), DEFAULT_DB_ALIAS
+        )
+
+    @override_settings(DATABASE_REPLICAS=[REPLICA])
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(router.allow_migrate(REPLICA, 'articles'))
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, 'articles'))
+
+
+class SharedCacheTests(TestCase):
+    """Caches shared between requests are never filled from a replica."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('jake', 'jake@jake.jake', 'password')
+        cls.user = user
+        cls.article = Article.objects.create(
+            author=user.profile, slug='title', title='Title',
+            description='Description', body='Body'
+        )
+        cls.article.tags.add(Tag.objects.create(tag='dragons', slug='dragons'))
+        Category.objects.create(name='Fiction', slug='fiction')
+
+    def setUp(self):
+        routers.start_request(REPLICA)
+        self.addCleanup(routers.finish_request)
+
+    def test_tag_directory(self):
+        tag_directory.invalidate()
+
+        self.assertEqual(
+            [entry.slug for entry in tag_directory.get_tags()], ['dragons']
+        )
+
+    def test_category_tree(self):
+        category_tree.invalidate()
+
+        self.assertEqual(category_tree.get_category('fiction').name, 'Fiction')
+
+    def test_pull_authors(self):
+        FeedPullAuthor.objects.create(
+            profile=self.user.profile, since=self.article.created_at
+        )
+        cache.clear()
+        # The write pinned this request. Start a fresh one.
+        routers.start_request(REPLICA)
+
+        self.assertEqual(
+            get_pull_author_ids(), set([self.user.profile.pk])
+        )
+
+    def test_users(self):
+        auth_cache.invalidate_user(self.user.pk)
+
+        self.assertEqual(auth_cache.get_user(self.user.pk).username, 'jake')
+
+    def test_unread_counts(self):
+        cache.clear()
+
+        self.assertEqual(get_unread_count(self.user), 0)
+
+    @override_settings(
+        DATABASE_REPLICAS=[REPLICA],
+        ARTICLE_REPRESENTATION_CACHE_ALIAS='default'
+    )
+    def test_article_representations_come_from_the_primary(self):
+        article_cache.invalidate_articles([self.article.pk])
+
+        # An article read from a replica that has not seen a new title yet.
+        stale = Article.objects.using(DEFAULT_DB_ALIAS).select_related(
+            'author', 'author__user'
+        ).get(pk=self.article.pk)
+        stale.title = 'Old title'
+        stale._state.db = REPLICA
+
+        data = ArticleSerializer(stale).data
+        cached, keys = article_cache.get_representations([stale])
+
+        self.assertEqual(data['title'], 'Title')
+        self.assertEqual(data['tagList'], ['dragons'])
+        self.assertEqual(cached[self.article.pk]['title'], 'Title')
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_PIN_SECONDS=30)
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.reads = []
+
+        patcher = mock.patch.object(
+            routers, 'choose_replica', return_value=REPLICA
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def handle(self, request, write=False):
+        def get_response(request):
+            self.reads.append(router.db_for_read(Article))
+
+            if write:
+                router.db_for_write(Article)
+                self.reads.append(router.db_for_read(Article))
+
+            return HttpResponse()
+
+        return ReplicaPinningMiddleware(get_response)(request)
+
+    def test_safe_requests_read_from_a_replica(self):
+        response = self.handle(self.factory.get('/api/articles'))
+
+        self.assertEqual(self.reads, [REPLICA])
+        self.assertNotIn(routers.PIN_COOKIE_NAME, response.cookies)
+
+    def test_a_write_pins_the_request_and_the_client(self):
+        response = self.handle(self.factory.get('/api/articles'), write=True)
+        cookie = response.cookies[routers.PIN_COOKIE_NAME]
+
+        self.assertEqual(self.reads, [REPLICA, DEFAULT_DB_ALIAS])
+        self.assertEqual(cookie['max-age'], 30)
+        self.assertTrue(cookie['httponly'])
+
+    def test_pinned_clients_read_from_the_primary(self):
+        request = self.factory.get('/api/articles')
+        request.COOKIES[routers.PIN_COOKIE_NAME] = '1'
+
+        self.handle(request)
+
+        self.assertEqual(self.reads, [DEFAULT_DB_ALIAS])
+
+    def test_unsafe_requests_read_from_the_primary(self):
+        response = self.handle(self.factory.post('/api/articles'), write=True)
+
+        self.assertEqual(self.reads, [DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS])
+        self.assertIn(routers.PIN_COOKIE_NAME, response.cookies)
+
+    def test_nothing_is_left_behind_for_the_next_request(self):
+        self.handle(self.factory.get('/api/articles'), write=True)
+
+        self.assertEqual(router.db_for_read(Article), DEFAULT_DB_ALIAS)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_unused_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaPinningMiddleware(lambda request: HttpResponse())
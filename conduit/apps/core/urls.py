@@ -0,0 +1,7 @@
+from django.conf.urls import url
+
+from .views import RequestMetricsAPIView
+
+urlpatterns = [
+    url(r'^metrics/?$', RequestMetricsAPIView.as_view()),
+]
@@ -1,7 +1,18 @@
 import random
 import string
 
+from django.db import DEFAULT_DB_ALIAS, connections
+
 DEFAULT_CHAR_STRING = string.ascii_lowercase + string.digits
 
 def generate_random_string(chars=DEFAULT_CHAR_STRING, size=6):
     return ''.join(random.choice(chars) for _ in range(size))
+
+
+def get_database_name(alias=DEFAULT_DB_ALIAS):
+    """
+    The name of the database that `alias` currently points at. The test
+    runner swaps in a test database and switches back when it is destroyed,
+    so writes buffered during tests can tell that their database is gone.
+    """
+    return connections[alias].settings_dict['NAME']
@@ -0,0 +1,22 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import view_stats
+
+
+class RequestMetricsAPIView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        # Every process keeps its own statistics, so this only covers the
+        # requests handled by the process serving this one.
+        return Response({
+            'views': view_stats.snapshot()
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        view_stats.reset()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
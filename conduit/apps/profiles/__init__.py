@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class ProfilesAppConfig(AppConfig):
+    name = 'conduit.apps.profiles'
+    label = 'profiles'
+    verbose_name = 'Profiles'
+
+    def ready(self):
+        import conduit.apps.profiles.signals
+
+default_app_config = 'conduit.apps.profiles.ProfilesAppConfig'
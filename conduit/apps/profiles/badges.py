@@ -0,0 +1,117 @@
+"""
+Awards badges in bulk.
+
+Rather than checking a profile's badges every time one of its counters
+changes, `evaluate_badges` is run periodically (see the `evaluate_badges`
+management command). For each active badge it runs one query that compares
+the badge's thresholds against `ProfileStatistics` and leaves out profiles
+that already have the badge, then inserts all the new awards together.
+
+In incremental mode only profiles whose statistics changed since the last
+run are looked at. The time of the last run is stored in `BadgeEvaluation`,
+in the same transaction as the badges it awarded, so a run that fails
+leaves it where it was. `last_updated` is stamped before the change commits,
+so a change that commits after a run started can carry an earlier time. Each
+incremental run therefore also looks at the `BADGE_WATERMARK_MARGIN` seconds
+before the last run. A full run is needed after adding a badge or lowering
+its thresholds.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Badge, BadgeEvaluation, ProfileBadge, ProfileStatistics
+
+# The primary key of the only `BadgeEvaluation` row.
+EVALUATION_ID = 1
+
+
+def get_last_run():
+    return BadgeEvaluation.objects.filter(pk=EVALUATION_ID).values_list(
+        'last_run', flat=True
+    ).first()
+
+
+def get_eligible_profile_ids(badge, since=None):
+    """
+    Returns a queryset of the ids of profiles that meet the requirements of
+    `badge` but haven't earned it yet.
+    """
+    statistics = ProfileStatistics.objects.filter(
+        total_articles__gte=badge.required_articles,
+        total_followers__gte=badge.required_followers,
+        total_comments__gte=badge.required_comments,
+    ).exclude(
+        profile_id__in=ProfileBadge.objects.filter(
+            badge=badge
+        ).values('profile_id')
+    )
+
+    if since is not None:
+        margin = getattr(settings, 'BADGE_WATERMARK_MARGIN', 5 * 60)
+        statistics = statistics.filter(
+            last_updated__gte=since - timedelta(seconds=margin)
+        )
+
+    return statistics.values_list('profile_id', flat=True)
+
+
+def _award(awards, batch_size):
+    """
+    Insert `awards` and return a `Counter` of badge id to how many of them
+    were new.
+    """
+    try:
+        with transaction.atomic():
+            ProfileBadge.objects.bulk_create(awards, batch_size=batch_size)
+    except IntegrityError:
+        # Another run awarded some of these badges in the meantime. Django
+        # has no `bulk_create(ignore_conflicts=True)` before 2.2, so skip the
+        # ones that exist one by one.
+        created = Counter()
+
+        for award in awards:
+            award, was_created = ProfileBadge.objects.get_or_create(
+                profile_id=award.profile_id, badge_id=award.badge_id
+            )
+            created[award.badge_id] += was_created
+
+        return created
+
+    return Counter(award.badge_id for award in awards)
+
+
+def evaluate_badges(incremental=False, since=None, batch_size=1000):
+    """
+    Award every active badge to the profiles that have earned it.
+
+    With `incremental=True` only profiles whose statistics changed since the
+    last run (or since `since`, if it is given) are considered. Returns a
+    dict of badge name to the number of profiles that were awarded it.
+    """
+    started_at = timezone.now()
+
+    if incremental and since is None:
+        since = get_last_run()
+
+    badges = list(Badge.objects.filter(is_active=True))
+    awards = []
+
+    for badge in badges:
+        awards.extend(
+            ProfileBadge(profile_id=profile_id, badge=badge)
+            for profile_id in get_eligible_profile_ids(badge, since)
+        )
+
+    with transaction.atomic():
+        created = _award(awards, batch_size) if awards else Counter()
+
+        # Anything that changes while we run is looked at again next time.
+        BadgeEvaluation.objects.update_or_create(
+            pk=EVALUATION_ID, defaults={'last_run': started_at}
+        )
+
+    return dict((badge.name, created[badge.pk]) for badge in badges)
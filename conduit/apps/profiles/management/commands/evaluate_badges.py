@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from conduit.apps.profiles.badges import evaluate_badges, get_last_run
+
+
+class Command(BaseCommand):
+    help = 'Award badges to every profile that meets their requirements.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Only evaluate profiles whose statistics changed since the '
+                 'last run.'
+        )
+        parser.add_argument(
+            '--since',
+            help='Only evaluate profiles whose statistics changed since this '
+                 'ISO 8601 date and time.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of badges to insert per query.'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+
+        if options['since']:
+            since = parse_datetime(options['since'])
+
+            if since is None:
+                raise CommandError(
+                    'Invalid date and time: {}'.format(options['since'])
+                )
+
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        incremental = options['incremental'] or since is not None
+
+        if incremental and since is None and get_last_run() is None:
+            self.stdout.write(
+                'No previous run found, evaluating every profile.'
+            )
+
+        awarded = evaluate_badges(
+            incremental=incremental, since=since,
+            batch_size=options['batch_size']
+        )
+
+        for name, count in sorted(awarded.items()):
+            self.stdout.write('{}: {} new'.format(name, count))
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from conduit.apps.profiles.models import Profile
+from conduit.apps.profiles.statistics import rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute profile statistics from articles, comments, follows and '
+        'favorites, creating any that are missing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Only rebuild the statistics of these users.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of profiles to rebuild per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.order_by('pk')
+
+        if options['usernames']:
+            profiles = profiles.filter(
+                user__username__in=options['usernames']
+            )
+
+        chunk_size = options['chunk_size']
+        last_pk = 0
+        rebuilt = 0
+
+        # Each chunk costs a handful of grouped queries, however many
+        # profiles it holds.
+        while True:
+            profile_ids = list(profiles.filter(
+                pk__gt=last_pk
+            ).values_list('pk', flat=True)[:chunk_size])
+
+            if not profile_ids:
+                break
+
+            rebuild_statistics(profile_ids)
+
+            last_pk = profile_ids[-1]
+            rebuilt += len(profile_ids)
+            self.stdout.write('Rebuilt statistics of {} profiles.'.format(
+                rebuilt
+            ))
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,20 @@
+# Generated migration for profile models
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_add_social_features'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BadgeEvaluation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_run', models.DateTimeField()),
+            ],
+        ),
+    ]
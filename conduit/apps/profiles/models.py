@@ -57,6 +57,12 @@ class Profile(TimestampedModel):
         """Returns True if `profile` is following us; False otherwise."""
         return self.followed_by.filter(pk=profile.pk).exists()
 
+    def get_following_ids(self, profiles):
+        """Returns the set of ids in `profiles` that we are following."""
+        return set(self.follows.filter(
+            pk__in=[profile.pk for profile in profiles]
+        ).values_list('pk', flat=True))
+
     def favorite(self, article):
         """Favorite `article` if we haven't already favorited it."""
         self.favorites.add(article)
@@ -69,6 +75,12 @@ class Profile(TimestampedModel):
         """Returns True if we have favorited `article`; else False."""
         return self.favorites.filter(pk=article.pk).exists()
 
+    def get_favorited_ids(self, articles):
+        """Returns the set of ids in `articles` that we have favorited."""
+        return set(self.favorites.filter(
+            pk__in=[article.pk for article in articles]
+        ).values_list('pk', flat=True))
+
 
 class ProfileStatistics(models.Model):
     """Cache profile statistics for performance."""
@@ -173,6 +185,14 @@ class ProfileBadge(models.Model):
         return f"{self.profile.user.username} - {self.badge.name}"
 
 
+class BadgeEvaluation(models.Model):
+    """When badges were last evaluated. There is only ever one row."""
+    last_run = models.DateTimeField()
+
+    def __str__(self):
+        return f"Badges evaluated at {self.last_run}"
+
+
 class UserBlocking(models.Model):
     """Allow users to block other users."""
     blocker = models.ForeignKey(
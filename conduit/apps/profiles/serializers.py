@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from conduit.apps.core.metrics import TimedSerializerMixin
+
 from .models import Profile
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(source='user.username')
     bio = serializers.CharField(allow_blank=True, required=False)
     image = serializers.SerializerMethodField()
@@ -29,6 +31,14 @@ class ProfileSerializer(serializers.ModelSerializer):
         if not request.user.is_authenticated():
             return False
 
+        # List views look up who the current user is following for the whole
+        # page in one query and pass the result in as `following`. When it is
+        # present we can answer without going back to the database.
+        following = self.context.get('following', None)
+
+        if following is not None:
+            return instance.pk in following
+
         follower = request.user.profile
         followee = instance
 
@@ -0,0 +1,166 @@
+from django.db.models import Count
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from conduit.apps.articles.models import Article, Comment
+
+from .models import Profile, ProfileStatistics
+from .statistics import (
+    Favorite, Follow, count_articles_by_author, update_statistics,
+    update_statistics_by_count
+)
+
+
+@receiver(post_save, sender=Profile)
+def create_profile_statistics(sender, instance, created, *args, **kwargs):
+    if instance and created:
+        ProfileStatistics.objects.create(profile=instance)
+
+
+@receiver(post_save, sender=Article)
+def count_created_article(sender, instance, created, *args, **kwargs):
+    if created:
+        update_statistics([instance.author_id], total_articles=1)
+
+
+@receiver(pre_delete, sender=Article)
+def count_deleted_article_favorites(sender, instance, *args, **kwargs):
+    # The article's favorites are deleted along with it without sending
+    # `m2m_changed`, so count them while they are still there. Views are
+    # added with `QuerySet.update`, so the instance's `view_count` may be
+    # out of date as well.
+    instance._statistics_deleted = Article.objects.filter(
+        pk=instance.pk
+    ).annotate(
+        favorites_count=Count('favorited_by')
+    ).values_list('view_count', 'favorites_count').first()
+
+
+@receiver(post_delete, sender=Article)
+def count_deleted_article(sender, instance, *args, **kwargs):
+    view_count, favorites_count = instance.__dict__.pop(
+        '_statistics_deleted', None
+    ) or (instance.view_count, 0)
+
+    update_statistics(
+        [instance.author_id],
+        total_articles=-1,
+        total_article_views=-view_count,
+        total_likes_received=-favorites_count
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(sender, instance, created, *args, **kwargs):
+    if created:
+        update_statistics([instance.author_id], total_comments=1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, *args, **kwargs):
+    update_statistics([instance.author_id], total_comments=-1)
+
+
+@receiver(pre_delete, sender=Profile)
+def count_deleted_profile_relations(sender, instance, *args, **kwargs):
+    # A deleted profile's follows and favorites are deleted along with it
+    # without sending `m2m_changed`.
+    update_statistics(
+        instance.follows.values_list('pk', flat=True), total_followers=-1
+    )
+    update_statistics(
+        instance.followed_by.values_list('pk', flat=True), total_following=-1
+    )
+    counts = count_articles_by_author(
+        instance.favorites.values_list('pk', flat=True)
+    )
+    update_statistics_by_count(
+        dict((author_id, -count) for author_id, count in counts.items()),
+        'total_likes_received'
+    )
+
+
+def _get_removed_ids(instance, action, pk_set, through, source, target):
+    """
+    `remove()` sends every id it was given, whether or not it was related,
+    and `clear()` sends none at all. Look up the ids that will really be
+    removed before they are, and hand them on to the `post_` action.
+    """
+    if action == 'pre_remove':
+        instance._statistics_removed_ids = set(through.objects.filter(**{
+            source: instance.pk, target + '__in': pk_set
+        }).values_list(target, flat=True))
+
+    elif action == 'pre_clear':
+        instance._statistics_removed_ids = set(through.objects.filter(**{
+            source: instance.pk
+        }).values_list(target, flat=True))
+
+    elif action in ('post_remove', 'post_clear'):
+        return instance.__dict__.pop('_statistics_removed_ids', set())
+
+    elif action == 'post_add':
+        # `add()` only sends the ids that were not related yet.
+        return pk_set
+
+    return None
+
+
+@receiver(m2m_changed, sender=Follow)
+def count_follows(sender, instance, action, reverse, pk_set, *args, **kwargs):
+    # `follower.follows.add(followee)` sends `instance=follower` and the
+    # followees in `pk_set`. `followee.followed_by.add(follower)` sends them
+    # the other way around.
+    if reverse:
+        source, target = 'to_profile_id', 'from_profile_id'
+    else:
+        source, target = 'from_profile_id', 'to_profile_id'
+
+    pk_set = _get_removed_ids(instance, action, pk_set, Follow, source, target)
+
+    if not pk_set:
+        return
+
+    sign = 1 if action == 'post_add' else -1
+
+    if reverse:
+        update_statistics([instance.pk], total_followers=sign * len(pk_set))
+        update_statistics(pk_set, total_following=sign)
+    else:
+        update_statistics([instance.pk], total_following=sign * len(pk_set))
+        update_statistics(pk_set, total_followers=sign)
+
+
+@receiver(m2m_changed, sender=Favorite)
+def count_favorites(sender, instance, action, reverse, pk_set, *args,
+                    **kwargs):
+    # `profile.favorites.add(article)` sends `instance=profile` and article
+    # ids. `article.favorited_by.add(profile)` sends `instance=article` and
+    # profile ids.
+    if reverse:
+        source, target = 'article_id', 'profile_id'
+    else:
+        source, target = 'profile_id', 'article_id'
+
+    pk_set = _get_removed_ids(
+        instance, action, pk_set, Favorite, source, target
+    )
+
+    if not pk_set:
+        return
+
+    sign = 1 if action == 'post_add' else -1
+
+    if reverse:
+        update_statistics(
+            [instance.author_id], total_likes_received=sign * len(pk_set)
+        )
+    else:
+        counts = count_articles_by_author(pk_set)
+        update_statistics_by_count(
+            dict((author_id, sign * count)
+                 for author_id, count in counts.items()),
+            'total_likes_received'
+        )
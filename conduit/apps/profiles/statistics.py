@@ -0,0 +1,137 @@
+"""
+Keeps `ProfileStatistics` up to date.
+
+The counters are changed incrementally by the signal receivers in
+`conduit.apps.profiles.signals` (and by the article view counter), using
+`F()` expressions so that concurrent changes don't overwrite each other.
+Every new profile gets a statistics row when it is created.
+
+Profiles created before this existed have no row, and anything that bypasses
+signals (raw SQL, `QuerySet.update`, ...) can make the counters drift. The
+`rebuild_profile_statistics` command recomputes the rows from the source
+tables, creating the ones that are missing.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from conduit.apps.articles.models import Article, Comment
+
+from .models import Profile, ProfileStatistics
+
+Follow = Profile.follows.through
+Favorite = Profile.favorites.through
+
+
+def _grouped(queryset, group_by, aggregate):
+    # Clear any default ordering, which would otherwise be added to the
+    # GROUP BY clause.
+    return dict(
+        queryset.order_by().values(group_by).annotate(
+            value=aggregate
+        ).values_list(group_by, 'value')
+    )
+
+
+def compute_statistics(profile_ids):
+    """
+    Returns new, unsaved `ProfileStatistics` for the given profiles, computed
+    with one grouped query per counter.
+    """
+    profile_ids = list(profile_ids)
+
+    articles = Article.objects.filter(
+        author_id__in=profile_ids
+    ).order_by().values('author_id').annotate(
+        count=Count('id'), views=Sum('view_count')
+    ).values_list('author_id', 'count', 'views')
+
+    total_articles = {}
+    total_article_views = {}
+
+    for author_id, count, views in articles:
+        total_articles[author_id] = count
+        total_article_views[author_id] = views or 0
+
+    total_comments = _grouped(
+        Comment.objects.filter(author_id__in=profile_ids),
+        'author_id', Count('id')
+    )
+    total_followers = _grouped(
+        Follow.objects.filter(to_profile_id__in=profile_ids),
+        'to_profile_id', Count('id')
+    )
+    total_following = _grouped(
+        Follow.objects.filter(from_profile_id__in=profile_ids),
+        'from_profile_id', Count('id')
+    )
+    total_likes_received = _grouped(
+        Favorite.objects.filter(article__author_id__in=profile_ids),
+        'article__author_id', Count('id')
+    )
+
+    return [
+        ProfileStatistics(
+            profile_id=profile_id,
+            total_articles=total_articles.get(profile_id, 0),
+            total_comments=total_comments.get(profile_id, 0),
+            total_followers=total_followers.get(profile_id, 0),
+            total_following=total_following.get(profile_id, 0),
+            total_article_views=total_article_views.get(profile_id, 0),
+            total_likes_received=total_likes_received.get(profile_id, 0),
+        )
+        for profile_id in profile_ids
+    ]
+
+
+def rebuild_statistics(profile_ids):
+    """Replace the statistics of the given profiles with fresh ones."""
+    profile_ids = list(profile_ids)
+
+    with transaction.atomic():
+        ProfileStatistics.objects.filter(profile_id__in=profile_ids).delete()
+        ProfileStatistics.objects.bulk_create(compute_statistics(profile_ids))
+
+
+def update_statistics(profile_ids, **deltas):
+    """
+    Add `deltas` (counter name to amount) to the statistics of every profile
+    in `profile_ids`.
+    """
+    profile_ids = list(profile_ids)
+    updates = dict(
+        (field, F(field) + delta) for field, delta in deltas.items() if delta
+    )
+
+    if not profile_ids or not updates:
+        return
+
+    # `QuerySet.update` does not touch `auto_now` fields.
+    updates['last_updated'] = timezone.now()
+
+    ProfileStatistics.objects.filter(
+        profile_id__in=profile_ids
+    ).update(**updates)
+
+
+def update_statistics_by_count(counts, field):
+    """
+    Add `counts` (a dict of profile id to amount) to `field`, with one
+    UPDATE per distinct amount rather than one per profile.
+    """
+    profile_ids_by_count = defaultdict(list)
+
+    for profile_id, count in counts.items():
+        profile_ids_by_count[count].append(profile_id)
+
+    for count, profile_ids in profile_ids_by_count.items():
+        update_statistics(profile_ids, **{field: count})
+
+
+def count_articles_by_author(article_ids):
+    """Returns a `Counter` of author id to how many of `article_ids` they wrote."""
+    return Counter(Article.objects.filter(
+        pk__in=list(article_ids)
+    ).values_list('author_id', flat=True))
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from conduit.apps.authentication.models import User
+from conduit.apps.profiles import badges
+from conduit.apps.profiles.models import Badge, ProfileStatistics
+
+
+class EvaluateBadgesTests(TestCase):
+    def setUp(self):
+        self.badge = Badge.objects.create(
+            name='Writer', description='Wrote an article', icon='pen',
+            required_articles=1
+        )
+
+    def create_statistics(self, username, total_articles):
+        profile = User.objects.create_user(
+            username, '{}@example.com'.format(username), 'password'
+        ).profile
+        statistics, _ = ProfileStatistics.objects.get_or_create(
+            profile=profile
+        )
+        statistics.total_articles = total_articles
+        statistics.save()
+
+        return statistics
+
+    def test_awards_badges_and_records_the_run(self):
+        self.create_statistics('jake', 1)
+        self.create_statistics('jane', 0)
+
+        self.assertIsNone(badges.get_last_run())
+        self.assertEqual(badges.evaluate_badges(), {'Writer': 1})
+        self.assertIsNotNone(badges.get_last_run())
+
+    def test_incremental_runs_only_look_at_changed_profiles(self):
+        statistics = self.create_statistics('jake', 0)
+        badges.evaluate_badges()
+
+        statistics.total_articles = 1
+        statistics.save()
+
+        self.assertEqual(
+            badges.evaluate_badges(incremental=True), {'Writer': 1}
+        )
+        self.assertEqual(
+            badges.evaluate_badges(incremental=True), {'Writer': 0}
+        )
+
+    @override_settings(BADGE_WATERMARK_MARGIN=60)
+    def test_changes_committed_during_a_run_are_picked_up(self):
+        statistics = self.create_statistics('jake', 0)
+        badges.evaluate_badges()
+
+        # Stamped before the last run started, but committed after it.
+        statistics.total_articles = 1
+        statistics.save()
+        ProfileStatistics.objects.filter(pk=statistics.pk).update(
+            last_updated=badges.get_last_run() - timedelta(seconds=30)
+        )
+
+        self.assertEqual(
+            badges.evaluate_badges(incremental=True), {'Writer': 1}
+        )
+
+    def test_a_failed_run_keeps_the_last_run(self):
+        self.create_statistics('jake', 0)
+        badges.evaluate_badges()
+        last_run = badges.get_last_run()
+        self.create_statistics('jane', 1)
+
+        with mock.patch.object(
+            badges, '_award', side_effect=IntegrityError
+        ), self.assertRaises(IntegrityError):
+            badges.evaluate_badges(incremental=True)
+
+        self.assertEqual(badges.get_last_run(), last_run)
@@ -0,0 +1,158 @@
+from django.test import TestCase
+
+from conduit.apps.articles.counters import write_view_counts
+from conduit.apps.articles.models import Article, Comment
+from conduit.apps.authentication.models import User
+from conduit.apps.profiles.models import Profile, ProfileStatistics
+from conduit.apps.profiles.statistics import (
+    compute_statistics, rebuild_statistics
+)
+
+FIELDS = (
+    'total_articles', 'total_comments', 'total_followers', 'total_following',
+    'total_article_views', 'total_likes_received',
+)
+
+
+class ProfileStatisticsTests(TestCase):
+    def setUp(self):
+        self.jake, self.jane, self.bob, self.carol = [
+            User.objects.create_user(
+                username, '{}@example.com'.format(username), 'password'
+            ).profile
+            for username in ('jake', 'jane', 'bob', 'carol')
+        ]
+        self.first = self.create_article(self.jake, 'First')
+        self.second = self.create_article(self.jake, 'Second')
+        self.other = self.create_article(self.jane, 'Other')
+
+    def create_article(self, author, title):
+        return Article.objects.create(
+            author=author, title=title, description='Description',
+            body='Body'
+        )
+
+    def get_values(self, statistics):
+        return dict((field, getattr(statistics, field)) for field in FIELDS)
+
+    def assertMatchesRebuild(self):
+        """The stored counters equal ones computed from scratch."""
+        profile_ids = list(Profile.objects.values_list('pk', flat=True))
+        stored = dict(
+            (statistics.profile_id, self.get_values(statistics))
+            for statistics in ProfileStatistics.objects.filter(
+                profile_id__in=profile_ids
+            )
+        )
+        computed = dict(
+            (statistics.profile_id, self.get_values(statistics))
+            for statistics in compute_statistics(profile_ids)
+        )
+
+        self.assertEqual(stored, computed)
+
+    def test_articles_comments_and_views(self):
+        comment = Comment.objects.create(
+            article=self.first, author=self.jane, body='Nice'
+        )
+        Comment.objects.create(
+            article=self.first, author=self.bob, body='Agreed',
+            parent=comment
+        )
+        write_view_counts({self.first.pk: 3, self.other.pk: 2})
+        self.assertMatchesRebuild()
+
+        comment.delete()
+        self.second.delete()
+        self.assertMatchesRebuild()
+
+    def test_follows(self):
+        self.bob.follow(self.jake)
+        self.bob.follow(self.jane)
+        self.carol.follow(self.jake)
+        # Already followed, so nothing is added.
+        self.bob.follow(self.jake)
+        self.assertMatchesRebuild()
+
+        # Jane is not followed by Carol, so only Jake is removed.
+        self.carol.follows.remove(self.jake, self.jane)
+        self.assertMatchesRebuild()
+
+        self.bob.follows.clear()
+        self.assertMatchesRebuild()
+
+    def test_follows_from_the_reverse_side(self):
+        self.jake.followed_by.add(self.bob, self.carol)
+        self.jane.followed_by.add(self.bob)
+        self.assertMatchesRebuild()
+
+        self.jake.followed_by.remove(self.bob, self.jane)
+        self.assertMatchesRebuild()
+
+        self.jake.followed_by.clear()
+        self.assertMatchesRebuild()
+
+    def test_favorites(self):
+        self.bob.favorites.add(self.first, self.second, self.other)
+        self.carol.favorite(self.first)
+        self.assertMatchesRebuild()
+
+        # The second article is not one of Carol's favorites.
+        self.carol.favorites.remove(self.first, self.second)
+        self.assertMatchesRebuild()
+
+        self.bob.favorites.clear()
+        self.assertMatchesRebuild()
+
+    def test_favorites_from_the_reverse_side(self):
+        self.first.favorited_by.add(self.bob, self.carol)
+        self.other.favorited_by.add(self.bob)
+        self.assertMatchesRebuild()
+
+        self.first.favorited_by.remove(self.bob, self.jane)
+        self.assertMatchesRebuild()
+
+        self.first.favorited_by.clear()
+        self.assertMatchesRebuild()
+
+    def test_deleting_an_article(self):
+        self.bob.favorite(self.first)
+        self.carol.favorite(self.first)
+        write_view_counts({self.first.pk: 5})
+
+        self.first.delete()
+        self.assertMatchesRebuild()
+
+    def test_deleting_a_profile(self):
+        self.bob.follow(self.jake)
+        self.bob.follow(self.jane)
+        self.jake.follow(self.bob)
+        self.bob.favorites.add(self.first, self.other)
+        self.carol.favorite(self.first)
+        Comment.objects.create(
+            article=self.other, author=self.bob, body='Nice'
+        )
+        Comment.objects.create(
+            article=self.first, author=self.jane, body='Nice'
+        )
+
+        self.bob.user.delete()
+        self.assertMatchesRebuild()
+
+        self.jake.user.delete()
+        self.assertMatchesRebuild()
+
+    def test_rebuild_statistics(self):
+        self.bob.follow(self.jake)
+        self.bob.favorite(self.first)
+        ProfileStatistics.objects.update(total_followers=10)
+        ProfileStatistics.objects.filter(profile=self.carol).delete()
+
+        rebuild_statistics(
+            Profile.objects.values_list('pk', flat=True)
+        )
+
+        self.assertMatchesRebuild()
+        self.assertTrue(
+            ProfileStatistics.objects.filter(profile=self.carol).exists()
+        )
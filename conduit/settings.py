@@ -49,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'conduit.apps.core.middleware.RequestMetricsMiddleware',
+    'conduit.apps.core.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -90,6 +92,39 @@ DATABASES = {
     }
 }
 
+# Read replicas, as a comma separated list of SQLite files in
+# `CONDUIT_SQLITE_REPLICAS`, e.g. "db.replica1.sqlite3,db.replica2.sqlite3".
+# Keep them up to date with `manage.py sync_sqlite_replicas`. Under test they
+# mirror the primary's test database instead of getting their own.
+DATABASE_REPLICAS = []
+
+for index, name in enumerate(filter(None, (
+    name.strip() for name in
+    os.environ.get('CONDUIT_SQLITE_REPLICAS', '').split(',')
+))):
+    alias = 'replica{}'.format(index + 1)
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, name),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['conduit.apps.core.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/1.10/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/1.10/ref/settings/#auth-password-validators
@@ -147,6 +182,122 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'conduit.apps.authentication.backends.JWTAuthentication',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'conduit.apps.core.pagination.LimitOffsetOrCursorPagination',
     'PAGE_SIZE': 20,
 }
+
+# In cursor pagination mode the total count is only an estimate, cached for
+# this many seconds. Set this to `None` to leave the count out entirely.
+CURSOR_PAGINATION_COUNT_TIMEOUT = 60
+
+# Home feeds are materialized when an article is published. Authors with at
+# least `FEED_FANOUT_MAX_FOLLOWERS` followers are merged into feeds when they
+# are read instead, and their followers are not notified of new articles. `FEED_INBOX_SIZE` is how many of an author's latest
+# articles are copied into a feed when someone starts following them.
+FEED_FANOUT_MAX_FOLLOWERS = 10000
+FEED_INBOX_SIZE = 1000
+FEED_BATCH_SIZE = 1000
+FEED_PULL_AUTHORS_TIMEOUT = 300
+
+# Article data is cached in `ARTICLE_CACHE_ALIAS`. The viewer-independent
+# part of serialized articles is cached for `ARTICLE_CACHE_TIMEOUT` seconds in
+# `ARTICLE_REPRESENTATION_CACHE_ALIAS`, which must be one of `CACHES` that all
+# processes share, such as memcached. It is not cached at all when this is
+# `None`.
+ARTICLE_CACHE_ALIAS = 'default'
+ARTICLE_CACHE_TIMEOUT = 60 * 60
+ARTICLE_REPRESENTATION_CACHE_ALIAS = None
+
+# Every process keeps the tag directory and the category tree in memory.
+# Changes are announced through `ARTICLE_CACHE_ALIAS`, which processes only
+# see if that cache is shared, so each copy is also rebuilt after
+# `TAG_DIRECTORY_MAX_AGE` and `CATEGORY_TREE_MAX_AGE` seconds. `None` keeps
+# it until the next change this process hears about.
+TAG_DIRECTORY_MAX_AGE = 60
+CATEGORY_TREE_MAX_AGE = 60
+
+# `JWTAuthentication` caches decoded tokens and the users they belong to in
+# a per-process LRU cache for `JWT_AUTH_CACHE_TIMEOUT` seconds. Set
+# `JWT_AUTH_SHARED_CACHE_ALIAS` to one of `CACHES` to share them between
+# processes as well.
+JWT_AUTH_CACHE_SIZE = 10000
+JWT_AUTH_CACHE_TIMEOUT = 30
+JWT_AUTH_SHARED_CACHE_ALIAS = None
+JWT_AUTH_SHARED_CACHE_TIMEOUT = 300
+
+# Dotted path to the article search backend. `None` picks the SQLite FTS5
+# index on SQLite and a plain `icontains` search everywhere else.
+ARTICLE_SEARCH_BACKEND = None
+
+# Article views are buffered in memory and written out every
+# `ARTICLE_VIEW_FLUSH_INTERVAL` seconds, or once `ARTICLE_VIEW_MAX_PENDING`
+# views are waiting. A crash loses at most that many views per process. An
+# interval of 0 writes every view straight away.
+ARTICLE_VIEW_FLUSH_INTERVAL = 10
+ARTICLE_VIEW_MAX_PENDING = 1000
+
+# The JSON encoder used to render API responses: 'orjson', 'ujson', 'json'
+# (the standard library) or 'auto' for the fastest one that is installed.
+CONDUIT_JSON_ENCODER = 'auto'
+
+# Activity log events are queued in memory and written in batches of
+# `ACTIVITY_LOG_BATCH_SIZE` by a background thread every
+# `ACTIVITY_LOG_FLUSH_INTERVAL` seconds (0 writes every event straight away).
+# When `ACTIVITY_LOG_MAX_QUEUE` events are waiting, new ones wait up to
+# `ACTIVITY_LOG_BLOCK_TIMEOUT` seconds for room and are then dropped. With
+# `ACTIVITY_LOG_SPOOL_DIR` set, batches go to files in that directory and are
+# loaded by the `flush_activity_spool` command.
+ACTIVITY_LOG_ENABLED = True
+ACTIVITY_LOG_BATCH_SIZE = 500
+ACTIVITY_LOG_FLUSH_INTERVAL = 2
+ACTIVITY_LOG_MAX_QUEUE = 10000
+ACTIVITY_LOG_BLOCK_TIMEOUT = 0
+ACTIVITY_LOG_SPOOL_DIR = None
+
+# Notifications are inserted `NOTIFICATION_BATCH_SIZE` at a time. Each user's
+# unread count is kept in `NOTIFICATION_CACHE_ALIAS` for
+# `NOTIFICATION_UNREAD_TIMEOUT` seconds before it is counted again.
+NOTIFICATION_BATCH_SIZE = 1000
+NOTIFICATION_CACHE_ALIAS = 'default'
+NOTIFICATION_UNREAD_TIMEOUT = 60 * 60 * 24
+
+# In threaded mode (`?threaded=true`), comment lists show at most
+# `COMMENT_REPLY_PREVIEW_SIZE` replies under each comment, and nest replies
+# at most `COMMENT_THREAD_MAX_DEPTH` levels deep.
+COMMENT_REPLY_PREVIEW_SIZE = 3
+COMMENT_THREAD_MAX_DEPTH = 10
+
+# Article revisions store a full snapshot every
+# `ARTICLE_REVISION_SNAPSHOT_INTERVAL` versions and a delta against the
+# previous version otherwise. Rebuilt versions are cached for
+# `ARTICLE_REVISION_CACHE_TIMEOUT` seconds.
+ARTICLE_REVISION_SNAPSHOT_INTERVAL = 10
+ARTICLE_REVISION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Articles are ranked by their average rating pulled towards
+# `ARTICLE_RATING_PRIOR_MEAN` as if they had `ARTICLE_RATING_PRIOR_WEIGHT`
+# extra ratings of that score. Run `reconcile_rating_aggregates` after
+# changing these.
+ARTICLE_RATING_PRIOR_MEAN = 3.0
+ARTICLE_RATING_PRIOR_WEIGHT = 5
+
+# `RequestMetricsMiddleware` records the time, database queries and
+# serializer time of every request per view. The statistics are served to
+# admins at `/api/metrics`. With `REQUEST_METRICS_SERVER_TIMING` on, every
+# response also carries them in a `Server-Timing` header. This exposes view
+# names and timings, so it is best left off for public traffic.
+REQUEST_METRICS_ENABLED = True
+REQUEST_METRICS_SERVER_TIMING = False
+
+# With replicas in `DATABASE_REPLICAS`, the reads of GET requests go to one
+# that is at most `REPLICA_MAX_LAG_SECONDS` behind the primary. A client that
+# wrote something reads from the primary for the next `REPLICA_PIN_SECONDS`,
+# which should be longer than the replicas usually take to catch up.
+REPLICA_MAX_LAG_SECONDS = 5
+REPLICA_PIN_SECONDS = 10
+
+# Incremental `evaluate_badges` runs look at profiles whose statistics changed
+# since `BADGE_WATERMARK_MARGIN` seconds before the last run. This covers
+# changes still being committed when it ran, so it should be longer than the
+# longest transaction.
+BADGE_WATERMARK_MARGIN = 5 * 60